@@ -1,4 +1,6 @@
 from .interpolator import *
+from .jit_curve import *
+from .curve_adjoint import *
 from .discount_curve import *
 from .discount_curve_flat import *
 from .discount_curve_ns import *
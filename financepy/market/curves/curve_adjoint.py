@@ -0,0 +1,150 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+from ...utils.error import FinError
+from ...utils.date import Date
+from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.global_vars import gSmall
+from .interpolator import InterpTypes
+
+###############################################################################
+# For the flat forward, linear zero rate and cubic spline schemes the log of
+# an interpolated discount factor is a fixed linear function of the values at
+# the pillars. This lets the curve solvers find all of the pillars together
+# and lets the gradient of a price with respect to the pillar discount
+# factors be found in one backward sweep. The adjoint of each discount factor
+# read from the curve is mapped onto the pillars with one matrix product.
+###############################################################################
+
+
+def _interp_weights(times, eval_times, interp_type):
+    """ Return the matrix which maps the pillar unknowns onto the rate or log
+    discount factor at each evaluation time together with the multiplier of
+    this which gives minus the log discount factor. The unknowns are minus
+    the log discount factors for the log discount schemes and zero rates for
+    the zero rate schemes. The value at time zero is not an unknown. """
+
+    num_times = len(eval_times)
+    num_pts = len(times)
+
+    if interp_type == InterpTypes.FLAT_FWD_RATES or \
+            interp_type == InterpTypes.LINEAR_ZERO_RATES:
+
+        # This follows the interval search in _uinterpolate
+        weights = np.zeros((num_times, num_pts))
+        indices = np.searchsorted(times, eval_times, side='left')
+
+        for k in range(0, num_times):
+            t = eval_times[k]
+            i = indices[k]
+
+            if i == 0:
+                continue
+
+            if interp_type == InterpTypes.LINEAR_ZERO_RATES:
+                if i == 1:
+                    weights[k, 1] = 1.0
+                    continue
+                elif i == num_pts:
+                    weights[k, num_pts - 1] = 1.0
+                    continue
+
+            if i == num_pts:
+                i = num_pts - 1
+
+            dt = times[i] - times[i - 1]
+            weights[k, i - 1] = (times[i] - t) / dt
+            weights[k, i] = (t - times[i - 1]) / dt
+
+    elif interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT or \
+            interp_type == InterpTypes.NATCUBIC_ZERO_RATES:
+
+        # Splines are linear in their values so we fit one to each pillar
+        spline = CubicSpline(times, np.eye(num_pts), bc_type='natural')
+        weights = spline(eval_times)
+
+    elif interp_type == InterpTypes.FINCUBIC_ZERO_RATES:
+
+        zero = np.zeros(num_pts)
+        spline = CubicSpline(times, np.eye(num_pts),
+                             bc_type=((2, zero), (1, zero)))
+        weights = spline(eval_times)
+
+    else:
+        raise FinError("Global solver does not support " + str(interp_type))
+
+    if interp_type == InterpTypes.FLAT_FWD_RATES or \
+            interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT:
+        scale = np.ones(num_times)
+    else:
+        scale = np.array(eval_times, dtype=np.float64)
+
+    # The zero rate splines set the first zero rate equal to the second
+    if interp_type == InterpTypes.FINCUBIC_ZERO_RATES or \
+            interp_type == InterpTypes.NATCUBIC_ZERO_RATES:
+        weights[:, 1] += weights[:, 0]
+
+    weights = np.ascontiguousarray(weights[:, 1:], dtype=np.float64)
+
+    return weights, scale
+
+###############################################################################
+
+
+def _pillar_scale(times, interp_type):
+    """ Return the multiplier of the unknown at each pillar excluding time
+    zero which gives minus the log of its discount factor. """
+
+    if interp_type == InterpTypes.FLAT_FWD_RATES or \
+            interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT:
+        return np.ones(len(times) - 1)
+    elif interp_type == InterpTypes.LINEAR_ZERO_RATES:
+        return times[1:]
+    else:
+        return times[1:] + gSmall
+
+###############################################################################
+
+
+def df_adjoint(curve,
+               dts: list,
+               df_bars: np.ndarray):
+    """ Return the gradient of sum(df_bars[i] * curve.df(dts[i])) with
+    respect to the pillar discount factors of an interpolated curve excluding
+    the one at time zero. The adjoints df_bars are the derivatives of a price
+    with respect to the discount factors it reads from the curve on the dates
+    dts. The dates are converted to times as in the df method of the curve. """
+
+    times = np.array(curve._times, dtype=np.float64)
+    pillar_dfs = np.array(curve._dfs, dtype=np.float64)
+
+    if times[0] != 0.0 or pillar_dfs[0] != 1.0:
+        raise FinError("Curve must start with a discount factor of one.")
+
+    num_pillars = len(times) - 1
+
+    if len(dts) == 0:
+        return np.zeros(num_pillars)
+
+    if isinstance(dts[0], Date):
+        day_counter = DayCount(DayCountTypes.ACT_ACT_ISDA)
+        eval_times = day_counter.year_fracs(curve._value_dt, dts)[0]
+    else:
+        eval_times = np.array(dts, dtype=np.float64)
+
+    weights, scale = _interp_weights(times, eval_times, curve._interp_type)
+
+    dfs = np.array(curve._df(eval_times), dtype=np.float64).reshape(-1)
+
+    # The chain rule through df = exp(-scale * weights @ u) and through the
+    # unknowns u = -log(pillar_df) / pillar_scale
+    u_bar = np.dot(-np.asarray(df_bars) * dfs * scale, weights)
+    ps = _pillar_scale(times, curve._interp_type)
+
+    return -u_bar / (ps * pillar_dfs[1:])
+
+###############################################################################
@@ -6,8 +6,9 @@
 import numpy as np
 
 from .interpolator import Interpolator, InterpTypes, interpolate
+from .jit_curve import JitCurveTypes, make_jit_curve, curve_fwds
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.error import FinError
 from ...utils.global_vars import gDaysInYear, gSmall
 from ...utils.frequency import annual_frequency, FrequencyTypes
@@ -282,11 +283,12 @@ class DiscountCurve:
     ###########################################################################
 
     def df(self,
-           dt: (list, Date),
+           dt: (list, Date, DateArray),
            day_count=DayCountTypes.ACT_ACT_ISDA):
         ''' Function to calculate a discount factor from a date or a
-        vector of dates. The day count determines how dates get converted to
-        years. I allow this to default to ACT_ACT_ISDA unless specified. '''
+        vector of dates, which can be a list of Dates or a DateArray. The day
+        count determines how dates get converted to years. I allow this to
+        default to ACT_ACT_ISDA unless specified. '''
 
         times = times_from_dates(dt, self._value_dt, day_count)
         dfs = self._df(times)
@@ -333,47 +335,47 @@ class DiscountCurve:
     ###########################################################################
 
     def fwd(self,
-            dts: Date):
-        """ Calculate the continuously compounded forward rate at the forward
-        Date provided. This is done by perturbing the time by one day only
-        and measuring the change in the log of the discount factor divided by
-        the time increment dt. I am assuming continuous compounding over the
-        one date. """
+            dts: (list, Date, DateArray),
+            day_count=DayCountTypes.ACT_ACT_ISDA):
+        """ Calculate the continuously compounded instantaneous forward rate at
+        a date or a vector of dates, which can be a list of Dates or a
+        DateArray. The day count converts the dates to times in the same way
+        as the df function. The forward is found in closed form from the
+        interpolation scheme or functional form of the curve. """
 
-        if isinstance(dts, Date):
-            dts_plus_one_days = [dts.add_days(1)]
-        else:
-            dts_plus_one_days = []
-            for dt in dts:
-                dts_plus_one_day = dt.add_days(1)
-                dts_plus_one_days.append(dts_plus_one_day)
-
-        df1 = self.df(dts)
-        df2 = self.df(dts_plus_one_days)
-        dt = 1.0 / gDaysInYear
-        fwd = np.log(df1 / df2) / (1.0 * dt)
+        times = times_from_dates(dts, self._value_dt, day_count)
+        fwds = self._fwd(times)
 
         if isinstance(dts, Date):
-            return fwd[0]
+            return fwds[0]
         else:
-            return np.array(fwd)
+            return np.array(fwds)
 
     ###########################################################################
 
     def _fwd(self,
              times: (np.ndarray, float)):
-        """ Calculate the continuously compounded forward rate at the forward
-        time provided. This is done by perturbing the time by a small amount
-        and measuring the change in the log of the discount factor divided by
-        the time increment dt."""
+        """ Calculate the continuously compounded instantaneous forward rate
+        at a time or vector of times. This is minus the slope of the log of
+        the discount factor which is calculated in closed form by curve_fwd.
+        Discourage usage in favour of passing in dates. """
 
-        dt = 1e-6
-        times = np.maximum(times, dt)
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+        fwds = curve_fwds(self.jit_curve(), times)
+        return fwds
+
+    ###########################################################################
 
-        df1 = self._df(times - dt)
-        df2 = self._df(times + dt)
-        fwd = np.log(df1 / df2) / (2.0 * dt)
-        return fwd
+    def jit_curve(self):
+        """ Return an immutable JitCurve record of this curve that can be
+        passed into numba kernels which value it with curve_df and curve_fwd.
+        Times are those used by the _df method of the curve. """
+
+        return make_jit_curve(JitCurveTypes.INTERPOLATED,
+                              times=self._times,
+                              values=self._dfs,
+                              interp_type=self._interp_type,
+                              interpolator=self._interpolator)
 
     ###########################################################################
 
@@ -401,46 +403,55 @@ class DiscountCurve:
     ###########################################################################
 
     def fwd_rate(self,
-                 start_dt: (list, Date),
-                 date_or_tenor: (Date, str),
+                 start_dt: (list, Date, DateArray),
+                 date_or_tenor: (list, Date, DateArray, str),
                  dc_type: DayCountTypes = DayCountTypes.ACT_360):
         """ Calculate the forward rate between two forward dates according to
         the specified day count convention. This defaults to Actual 360. The
         first date is specified and the second is given as a date or as a tenor
-        which is added to the first date. """
-
-        if isinstance(start_dt, Date):
-            start_dts = []
-            start_dts.append(start_dt)
-        elif isinstance(start_dt, list):
-            start_dts = start_dt
-        else:
-            raise FinError("Start date and end date must be same types.")
+        which is added to the first date. The start dates can also be a list
+        or a DateArray and the end dates a tenor, a date or a list or DateArray
+        of the same length. All of the forward rates are then calculated
+        together as one vector of year fractions and discount factors. """
 
         day_count = DayCount(dc_type)
 
-        num_dts = len(start_dts)
-        fwd_rates = []
-        for i in range(0, num_dts):
-            dt1 = start_dts[i]
+        if isinstance(start_dt, Date):
 
             if isinstance(date_or_tenor, str):
-                dt2 = dt1.add_tenor(date_or_tenor)
+                end_dt = start_dt.add_tenor(date_or_tenor)
             elif isinstance(date_or_tenor, Date):
-                dt2 = date_or_tenor
-            elif isinstance(date_or_tenor, list):
-                dt2 = date_or_tenor[i]
+                end_dt = date_or_tenor
+            else:
+                raise FinError("Start date and end date must be same types.")
 
-            year_frac = day_count.year_frac(dt1, dt2)[0]
-            df1 = self.df(dt1)
-            df2 = self.df(dt2)
+            year_frac = day_count.year_frac(start_dt, end_dt)[0]
+            df1 = self.df(start_dt)
+            df2 = self.df(end_dt)
             fwd_rate = (df1 / df2 - 1.0) / year_frac
-            fwd_rates.append(fwd_rate)
+            return fwd_rate
 
-        if isinstance(start_dt, Date):
-            return fwd_rates[0]
+        elif isinstance(start_dt, (list, DateArray)):
+            start_dts = DateArray(start_dt)
         else:
-            return np.array(fwd_rates)
+            raise FinError("Start date and end date must be same types.")
+
+        if isinstance(date_or_tenor, str):
+            end_dts = start_dts.add_tenor(date_or_tenor)
+        elif isinstance(date_or_tenor, Date):
+            end_dts = date_or_tenor
+        elif isinstance(date_or_tenor, (list, DateArray)):
+            if len(date_or_tenor) != len(start_dts):
+                raise FinError("Start and end dates have different lengths.")
+            end_dts = DateArray(date_or_tenor)
+        else:
+            raise FinError("End date must be a Date, tenor or list of Dates.")
+
+        year_fracs = day_count.year_fracs(start_dts, end_dts)[0]
+        df1 = self.df(start_dts)
+        df2 = self.df(end_dts)
+        fwd_rates = (df1 / df2 - 1.0) / year_fracs
+        return np.array(fwd_rates)
 
     ###########################################################################
 
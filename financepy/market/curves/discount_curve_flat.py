@@ -13,6 +13,7 @@ from ...utils.frequency import FrequencyTypes
 from ...utils.helpers import label_to_string
 from ...utils.helpers import check_argument_types
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.curves.jit_curve import JitCurveTypes, make_jit_curve
 from ...utils.helpers import times_from_dates
 from ...market.curves.interpolator import InterpTypes
 
@@ -100,6 +101,26 @@ class DiscountCurveFlat(DiscountCurve):
         else:
             return np.array(dfs)
 
+###############################################################################
+
+    def fwd(self,
+            dts: (list, Date)):
+        """ Return the continuously compounded instantaneous forward rate at a
+        date or a vector of dates. The dates are converted to times using the
+        curve day count as in the df function. """
+
+        return DiscountCurve.fwd(self, dts, self._dc_type)
+
+###############################################################################
+
+    def jit_curve(self):
+        """ Return a JitCurve record for use inside numba kernels. A flat
+        curve is a polynomial zero rate curve of degree zero. """
+
+        return make_jit_curve(JitCurveTypes.POLYNOMIAL,
+                              params=[self._flat_rate],
+                              freq_type=self._freq_type)
+
 ###############################################################################
 
     def __repr__(self):
@@ -9,6 +9,7 @@ from ...utils.frequency import FrequencyTypes
 from ...utils.global_vars import gSmall
 from ...utils.error import FinError
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.curves.jit_curve import JitCurveTypes, make_jit_curve
 from ...utils.helpers import check_argument_types
 from ...utils.helpers import label_to_string
 from ...utils.day_count import DayCountTypes
@@ -140,6 +141,28 @@ class DiscountCurveNS(DiscountCurve):
 
     ###########################################################################
 
+    def fwd(self,
+            dts: (list, Date)):
+        """ Return the continuously compounded instantaneous forward rate at a
+        date or a vector of dates. The dates are converted to times using the
+        curve day count as in the df function. """
+
+        return DiscountCurve.fwd(self, dts, self._dc_type)
+
+    ###########################################################################
+
+    def jit_curve(self):
+        """ Return a JitCurve record for use inside numba kernels. Times
+        must use the curve day count. """
+
+        params = [self._beta_0, self._beta_1, self._beta_2, self._tau]
+
+        return make_jit_curve(JitCurveTypes.NELSON_SIEGEL,
+                              params=params,
+                              freq_type=self._freq_type)
+
+    ###########################################################################
+
     def __repr__(self):
 
         s = label_to_string("OBJECT TYPE", type(self).__name__)
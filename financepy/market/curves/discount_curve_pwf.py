@@ -14,6 +14,7 @@ from ...utils.helpers import check_argument_types
 from ...utils.day_count import DayCountTypes
 from ...utils.helpers import times_from_dates
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.curves.jit_curve import JitCurveTypes, make_jit_curve
 
 
 ###############################################################################
@@ -97,29 +98,6 @@ class DiscountCurvePWF(DiscountCurve):
 
     ###########################################################################
 
-    def _fwd(self,
-             times: (np.ndarray, list)):
-        """ Calculate the continuously compounded forward rate at the forward
-        time provided. This is done by perturbing the time by a small amount
-        and measuring the change in the log of the discount factor divided by
-        the time increment dt."""
-
-        dt = 1e-6
-        times = np.maximum(times, dt)
-
-        df1 = self._df(times - dt)
-        df2 = self._df(times + dt)
-        fwd = np.log(df1 / df2) / (2.0 * dt)
-
-        # Prevent the discontinuous spikes by capping them at the sum of short
-        # plus the long end zero rate !
-        cap = (self._zero_rates[0] + self._zero_rates[-1])
-        fwd = np.minimum(fwd, cap)
-
-        return fwd
-
-    ###########################################################################
-
     def df(self,
            dates: (Date, list)):
         """ Return discount factors given a single or vector of dates. The
@@ -145,6 +123,27 @@ class DiscountCurvePWF(DiscountCurve):
 
     ###########################################################################
 
+    def fwd(self,
+            dts: (list, Date)):
+        """ Return the continuously compounded instantaneous forward rate at a
+        date or a vector of dates. The dates are converted to times using the
+        curve day count as in the df function. """
+
+        return DiscountCurve.fwd(self, dts, self._dc_type)
+
+    ###########################################################################
+
+    def jit_curve(self):
+        """ Return a JitCurve record for use inside numba kernels. Times
+        must use the curve day count. """
+
+        return make_jit_curve(JitCurveTypes.PIECEWISE_FLAT,
+                              times=self._times,
+                              values=self._zero_rates,
+                              freq_type=self._freq_type)
+
+    ###########################################################################
+
     def __repr__(self):
 
         s = label_to_string("OBJECT TYPE", type(self).__name__)
@@ -13,6 +13,7 @@ from ...utils.helpers import check_argument_types
 from ...utils.day_count import DayCountTypes
 from ...utils.helpers import times_from_dates
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.curves.jit_curve import JitCurveTypes, make_jit_curve
 
 
 ###############################################################################
@@ -137,6 +138,27 @@ class DiscountCurvePWL(DiscountCurve):
 
     ###########################################################################
 
+    def fwd(self,
+            dts: (list, Date)):
+        """ Return the continuously compounded instantaneous forward rate at a
+        date or a vector of dates. The dates are converted to times using the
+        curve day count as in the df function. """
+
+        return DiscountCurve.fwd(self, dts, self._dc_type)
+
+    ###########################################################################
+
+    def jit_curve(self):
+        """ Return a JitCurve record for use inside numba kernels. Times
+        must use the curve day count. """
+
+        return make_jit_curve(JitCurveTypes.PIECEWISE_LINEAR,
+                              times=self._times,
+                              values=self._zero_rates,
+                              freq_type=self._freq_type)
+
+    ###########################################################################
+
     def __repr__(self):
 
         s = label_to_string("OBJECT TYPE", type(self).__name__)
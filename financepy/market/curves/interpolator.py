@@ -28,6 +28,13 @@ class InterpTypes(Enum):
 
 # LINEAR_SWAP_RATES = 3
 
+# Schemes that are fitted to a piecewise cubic
+g_spline_types = (InterpTypes.FINCUBIC_ZERO_RATES.value,
+                  InterpTypes.NATCUBIC_LOG_DISCOUNT.value,
+                  InterpTypes.NATCUBIC_ZERO_RATES.value,
+                  InterpTypes.PCHIP_ZERO_RATES.value,
+                  InterpTypes.PCHIP_LOG_DISCOUNT.value)
+
 ###############################################################################
 # TODO: GET RID OF THIS FUNCTION !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 ###############################################################################
@@ -191,6 +198,223 @@ def _vinterpolate(xValues,
     return yvalues
 
 
+###############################################################################
+# The spline schemes are fitted once with scipy and then held as the
+# breakpoints and coefficients of a piecewise cubic. The kernels below
+# evaluate these for every InterpTypes so that they can also be called from
+# inside other jitted functions.
+###############################################################################
+
+
+@njit(int64(float64, float64[:]), fastmath=True, cache=True, nogil=True)
+def _ppoly_index(t, breaks):
+    """ Find the piece i such that breaks[i] <= t < breaks[i+1]. Outside the
+    breakpoints the end pieces are extended. """
+
+    num_intervals = breaks.size - 1
+
+    if t <= breaks[0]:
+        return 0
+    elif t >= breaks[num_intervals]:
+        return num_intervals - 1
+
+    lo = 0
+    hi = num_intervals
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if t < breaks[mid]:
+            hi = mid
+        else:
+            lo = mid
+
+    return lo
+
+###############################################################################
+
+
+@njit(float64(float64, float64[:], float64[:, :]),
+      fastmath=True, cache=True, nogil=True)
+def _uppoly(t, breaks, coeffs):
+    """ Evaluate a piecewise polynomial with coefficients in the layout used
+    by scipy's PPoly. Outside the breakpoints the end pieces are extended. """
+
+    i = _ppoly_index(t, breaks)
+    s = t - breaks[i]
+    order = coeffs.shape[0]
+
+    y = 0.0
+    z = 1.0
+    for k in range(0, order):
+        y = y + coeffs[order - k - 1, i] * z
+        z = z * s
+
+    return y
+
+###############################################################################
+
+
+@njit(float64(float64, float64[:], float64[:], float64[:], float64[:, :],
+              int64), fastmath=True, cache=True, nogil=True)
+def _uinterpolate_df(t, times, dfs, breaks, coeffs, method):
+    """ Return the discount factor at time t for any of the interpolation
+    schemes. The linear schemes interpolate the times and discount factors
+    while the spline schemes evaluate their fitted coefficients. """
+
+    if method == InterpTypes.PCHIP_LOG_DISCOUNT.value or \
+            method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value:
+
+        return np.exp(_uppoly(t, breaks, coeffs))
+
+    elif method == InterpTypes.PCHIP_ZERO_RATES.value or \
+            method == InterpTypes.FINCUBIC_ZERO_RATES.value or \
+            method == InterpTypes.NATCUBIC_ZERO_RATES.value:
+
+        return np.exp(-t * _uppoly(t, breaks, coeffs))
+
+    else:
+
+        return _uinterpolate(t, times, dfs, method)
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:], float64[:], float64[:],
+                 float64[:, :], int64), fastmath=True, cache=True, nogil=True)
+def _vinterpolate_df(tvalues, times, dfs, breaks, coeffs, method):
+    """ Vectorised version of _uinterpolate_df for an array of times. The
+    scheme is checked once outside the loop over times. """
+
+    n = tvalues.size
+    yvalues = np.empty(n)
+
+    if method == InterpTypes.PCHIP_LOG_DISCOUNT.value or \
+            method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value:
+
+        for i in range(0, n):
+            yvalues[i] = np.exp(_uppoly(tvalues[i], breaks, coeffs))
+
+    elif method == InterpTypes.PCHIP_ZERO_RATES.value or \
+            method == InterpTypes.FINCUBIC_ZERO_RATES.value or \
+            method == InterpTypes.NATCUBIC_ZERO_RATES.value:
+
+        for i in range(0, n):
+            t = tvalues[i]
+            yvalues[i] = np.exp(-t * _uppoly(t, breaks, coeffs))
+
+    else:
+
+        yvalues = _vinterpolate(tvalues, times, dfs, method)
+
+    return yvalues
+
+###############################################################################
+
+
+@njit(float64(float64, float64[:], float64[:, :]),
+      fastmath=True, cache=True, nogil=True)
+def _uppoly_slope(t, breaks, coeffs):
+    """ Evaluate the first derivative of a piecewise polynomial with
+    coefficients in the layout used by scipy's PPoly. """
+
+    i = _ppoly_index(t, breaks)
+    s = t - breaks[i]
+    order = coeffs.shape[0]
+
+    dy = 0.0
+    z = 1.0
+    for k in range(1, order):
+        dy = dy + k * coeffs[order - k - 1, i] * z
+        z = z * s
+
+    return dy
+
+###############################################################################
+
+
+@njit(float64(float64, float64[:], float64[:], float64[:], float64[:, :],
+              int64), fastmath=True, cache=True, nogil=True)
+def _uinterpolate_fwd(t, times, dfs, breaks, coeffs, method):
+    """ Return the continuously compounded instantaneous forward rate at time
+    t which is minus the slope of the log of the discount factor. This is
+    found in closed form for each of the interpolation schemes. At a grid time
+    the forward of the interval starting there is returned. """
+
+    if method == InterpTypes.PCHIP_LOG_DISCOUNT.value or \
+            method == InterpTypes.NATCUBIC_LOG_DISCOUNT.value:
+
+        return -_uppoly_slope(t, breaks, coeffs)
+
+    elif method == InterpTypes.PCHIP_ZERO_RATES.value or \
+            method == InterpTypes.FINCUBIC_ZERO_RATES.value or \
+            method == InterpTypes.NATCUBIC_ZERO_RATES.value:
+
+        return _uppoly(t, breaks, coeffs) + t * _uppoly_slope(t, breaks,
+                                                                coeffs)
+
+    small = 1e-10
+    num_points = times.size
+
+    # Find i such that times[i-1] <= t < times[i] or i = num_points if t is
+    # on or beyond the last time
+    i = 1
+    while i < num_points and times[i] <= t:
+        i = i + 1
+
+    if method == InterpTypes.LINEAR_ZERO_RATES.value:
+
+        if i == 1:
+            return -np.log(dfs[i]) / times[i]
+        elif i < num_points:
+            r1 = -np.log(dfs[i - 1]) / times[i - 1]
+            r2 = -np.log(dfs[i]) / times[i]
+            dt = times[i] - times[i - 1]
+            rvalue = ((times[i] - t) * r1 + (t - times[i - 1]) * r2) / dt
+            return rvalue + t * (r2 - r1) / dt
+        else:
+            return -np.log(dfs[i - 1]) / times[i - 1]
+
+    elif method == InterpTypes.FLAT_FWD_RATES.value:
+
+        if i == num_points:
+            i = num_points - 1
+
+        dt = times[i] - times[i - 1]
+        return np.log(dfs[i - 1] / dfs[i]) / dt
+
+    elif method == InterpTypes.LINEAR_FWD_RATES.value:
+
+        if i == 1:
+            return -np.log(dfs[i] + small) / (times[i] + small)
+        elif i < num_points:
+            fwd1 = -np.log(dfs[i - 1] / dfs[i - 2]) / \
+                (times[i - 1] - times[i - 2])
+            fwd2 = -np.log(dfs[i] / dfs[i - 1]) / (times[i] - times[i - 1])
+            dt = times[i] - times[i - 1]
+            fwd = ((times[i] - t) * fwd1 + (t - times[i - 1]) * fwd2) / dt
+            return fwd + (t - times[i - 1]) * (fwd2 - fwd1) / dt
+        else:
+            return -np.log(dfs[i - 1] / dfs[i - 2]) / \
+                (times[i - 1] - times[i - 2])
+
+    else:
+        raise FinError("Invalid interpolation scheme.")
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:], float64[:], float64[:],
+                 float64[:, :], int64), fastmath=True, cache=True, nogil=True)
+def _vinterpolate_fwd(tvalues, times, dfs, breaks, coeffs, method):
+    """ Vectorised version of _uinterpolate_fwd for an array of times. """
+
+    n = tvalues.size
+    yvalues = np.empty(n)
+    for i in range(0, n):
+        yvalues[i] = _uinterpolate_fwd(tvalues[i], times, dfs, breaks, coeffs,
+                                       method)
+
+    return yvalues
+
 ###############################################################################
 
 
@@ -203,6 +427,8 @@ class Interpolator():
         self._interp_fn = None
         self._times = None
         self._dfs = None
+        self._breaks = np.zeros(0)
+        self._coeffs = np.zeros((0, 0))
         self._refit_curve = False
 
     ###########################################################################
@@ -213,6 +439,9 @@ class Interpolator():
 
         self._times = times
         self._dfs = dfs
+        self._interp_fn = None
+        self._breaks = np.zeros(0)
+        self._coeffs = np.zeros((0, 0))
 
         if len(times) == 1:
             return
@@ -272,6 +501,13 @@ class Interpolator():
             self._interp_fn = CubicSpline(self._times, zero_rates,
                                           bc_type='natural')
 
+        # Splines are evaluated from their coefficients and not through scipy
+        if self._interp_fn is not None:
+            self._breaks = np.ascontiguousarray(self._interp_fn.x,
+                                                dtype=np.float64)
+            self._coeffs = np.ascontiguousarray(self._interp_fn.c,
+                                                dtype=np.float64)
+
     #        elif self._interp_type  == InterpTypes.LINEAR_LOG_DISCOUNT:
     #
     #            log_dfs = np.log(self._dfs)
@@ -311,38 +547,13 @@ class Interpolator():
         else:
             raise FinError("t is not a recognized type")
 
-        if self._interp_type == InterpTypes.PCHIP_LOG_DISCOUNT:
-
-            out = np.exp(self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.PCHIP_ZERO_RATES:
-
-            out = np.exp(-tvec * self._interp_fn(tvec))
-
-        # if self._interp_type == InterpTypes.FINCUBIC_LOG_DISCOUNT:
-
-        #     out = np.exp(self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.FINCUBIC_ZERO_RATES:
-
-            out = np.exp(-tvec * self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.NATCUBIC_LOG_DISCOUNT:
-
-            out = np.exp(self._interp_fn(tvec))
-
-        elif self._interp_type == InterpTypes.NATCUBIC_ZERO_RATES:
-
-            out = np.exp(-tvec * self._interp_fn(tvec))
-
-        #        elif self._interp_type == InterpTypes.LINEAR_LOG_DISCOUNT:
-        #
-        #            out = np.exp(self._interp_fn(tvec))
-
-        else:
+        if self._interp_type.value in g_spline_types and \
+                len(self._breaks) == 0:
+            raise FinError("Spline interpolation needs at least two points")
 
-            out = _vinterpolate(tvec, self._times, self._dfs,
-                                self._interp_type.value)
+        out = _vinterpolate_df(tvec, self._times, self._dfs,
+                               self._breaks, self._coeffs,
+                               self._interp_type.value)
 
         if isinstance(t, (float, np.float64)):
             return out[0]
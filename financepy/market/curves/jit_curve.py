@@ -0,0 +1,275 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from collections import namedtuple
+from enum import Enum
+
+import numpy as np
+from numba import njit
+
+from .interpolator import InterpTypes, g_spline_types
+from .interpolator import _uinterpolate_df, _uinterpolate_fwd
+from ...utils.error import FinError
+from ...utils.global_vars import gSmall
+from ...utils.frequency import FrequencyTypes, annual_frequency
+
+###############################################################################
+# A DiscountCurve is a Python object and so cannot be passed into a numba
+# kernel. Each curve can instead export the immutable JitCurve record below
+# which holds everything needed to value the curve at a time t. Kernels then
+# call curve_df(curve, t) and curve_fwd(curve, t) on it.
+###############################################################################
+
+
+class JitCurveTypes(Enum):
+    INTERPOLATED = 1
+    NELSON_SIEGEL = 2
+    NELSON_SIEGEL_SVENSSON = 3
+    POLYNOMIAL = 4
+    PIECEWISE_FLAT = 5
+    PIECEWISE_LINEAR = 6
+
+
+JitCurve = namedtuple("JitCurve",
+                      "curve_type interp_type freq times values breaks "
+                      "coeffs params")
+
+###############################################################################
+
+
+def make_jit_curve(curve_type: JitCurveTypes,
+                   times: np.ndarray = None,
+                   values: np.ndarray = None,
+                   params: np.ndarray = None,
+                   freq_type: FrequencyTypes = FrequencyTypes.CONTINUOUS,
+                   interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES,
+                   interpolator=None):
+    """ Create a JitCurve record. Interpolated curves pass their times,
+    discount factors and interpolation type together with the fitted
+    Interpolator if the type is a spline. Curves defined by zero rates pass
+    the zero rate times and values or the parameters of their functional form
+    together with the compounding frequency of the zero rates. """
+
+    if freq_type == FrequencyTypes.CONTINUOUS:
+        freq = -1.0
+    elif freq_type == FrequencyTypes.SIMPLE:
+        freq = 0.0
+    elif freq_type == FrequencyTypes.ANNUAL or \
+            freq_type == FrequencyTypes.SEMI_ANNUAL or \
+            freq_type == FrequencyTypes.QUARTERLY or \
+            freq_type == FrequencyTypes.MONTHLY:
+        freq = float(annual_frequency(freq_type))
+    else:
+        raise FinError("Unknown Frequency type")
+
+    def to_array(x):
+        if x is None:
+            return np.zeros(0)
+        return np.ascontiguousarray(x, dtype=np.float64).reshape(-1)
+
+    breaks = np.zeros(0)
+    coeffs = np.zeros((0, 0))
+
+    if curve_type == JitCurveTypes.INTERPOLATED and \
+            interp_type.value in g_spline_types:
+
+        if interpolator is None or len(interpolator._breaks) == 0:
+            raise FinError("Spline interpolation needs at least two points")
+
+        breaks = np.ascontiguousarray(interpolator._breaks)
+        coeffs = np.ascontiguousarray(interpolator._coeffs)
+
+    return JitCurve(curve_type.value,
+                    interp_type.value,
+                    freq,
+                    to_array(times),
+                    to_array(values),
+                    breaks,
+                    coeffs,
+                    to_array(params))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def flat_fwd_curve(times, values):
+    """ Create a JitCurve record inside or outside a numba kernel which
+    interpolates discount factors or survival probabilities at the given
+    times using flat forward rates. The arrays are not copied and so a
+    change to the values is seen by the record. """
+
+    return JitCurve(JitCurveTypes.INTERPOLATED.value,
+                    InterpTypes.FLAT_FWD_RATES.value,
+                    -1.0,
+                    times,
+                    values,
+                    np.zeros(0),
+                    np.zeros((0, 0)),
+                    np.zeros(0))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _zero_to_df(r, t, freq):
+    """ Discount factor from a zero rate with compounding frequency freq where
+    a negative value means continuous and zero means simple compounding. """
+
+    t = max(t, gSmall)
+
+    if freq < 0.0:
+        return np.exp(-r * t)
+    elif freq == 0.0:
+        return 1.0 / (1.0 + r * t)
+    else:
+        return 1.0 / np.power(1.0 + r / freq, freq * t)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _piecewise_index(times, t):
+    """ Index of the last time below or equal to t with the first section
+    extended to the left. Returns -1 if t is beyond the last time. """
+
+    num_times = times.size
+    for i in range(1, num_times):
+        if times[i] > t:
+            return i - 1
+
+    return -1
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _zero_rate_slope(curve, t):
+    """ Zero rate at time t and its slope for a curve defined by its zero
+    rates. """
+
+    curve_type = curve.curve_type
+    p = curve.params
+
+    if curve_type == JitCurveTypes.NELSON_SIEGEL.value:
+
+        tt = max(t, gSmall)
+        theta = tt / p[3]
+        e = np.exp(-theta)
+        g = (1.0 - e) / theta
+        dg = (e - g) / theta
+        r = p[0] + p[1] * g + p[2] * (g - e)
+        dr = (p[1] * dg + p[2] * (dg + e)) / p[3]
+
+    elif curve_type == JitCurveTypes.NELSON_SIEGEL_SVENSSON.value:
+
+        tt = max(t, gSmall)
+        theta_1 = tt / p[4]
+        theta_2 = tt / p[5]
+        e_1 = np.exp(-theta_1)
+        e_2 = np.exp(-theta_2)
+        g_1 = (1.0 - e_1) / theta_1
+        g_2 = (1.0 - e_2) / theta_2
+        dg_1 = (e_1 - g_1) / theta_1
+        dg_2 = (e_2 - g_2) / theta_2
+        r = p[0] + p[1] * g_1 + p[2] * (g_1 - e_1) + p[3] * (g_2 - e_2)
+        dr = (p[1] * dg_1 + p[2] * (dg_1 + e_1)) / p[4]
+        dr += p[3] * (dg_2 + e_2) / p[5]
+
+    elif curve_type == JitCurveTypes.POLYNOMIAL.value:
+
+        tt = max(t, gSmall)
+        r = 0.0
+        dr = 0.0
+        for n in range(0, p.size):
+            r += p[n] * np.power(tt, n)
+            if n > 0:
+                dr += n * p[n] * np.power(tt, n - 1)
+
+    elif curve_type == JitCurveTypes.PIECEWISE_FLAT.value:
+
+        i = _piecewise_index(curve.times, max(t, gSmall))
+        r = curve.values[i]
+        dr = 0.0
+
+    elif curve_type == JitCurveTypes.PIECEWISE_LINEAR.value:
+
+        tt = max(t, 1e-6)
+        i = _piecewise_index(curve.times, tt)
+
+        if i == -1:
+            r = curve.values[-1]
+            dr = 0.0
+        else:
+            t0 = curve.times[i]
+            r0 = curve.values[i]
+            t1 = curve.times[i + 1]
+            r1 = curve.values[i + 1]
+            r = ((t1 - tt) * r0 + (tt - t0) * r1) / (t1 - t0)
+            dr = (r1 - r0) / (t1 - t0)
+
+    else:
+        raise FinError("Unknown curve type")
+
+    return r, dr
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def curve_df(curve, t):
+    """ Return the discount factor at time t from a JitCurve record. This
+    agrees with the df method of the curve which exported the record when t
+    is measured using the day count of that curve. """
+
+    if curve.curve_type == JitCurveTypes.INTERPOLATED.value:
+
+        if curve.breaks.size > 0 and np.abs(t) < gSmall:
+            return 1.0
+
+        return _uinterpolate_df(t, curve.times, curve.values, curve.breaks,
+                                curve.coeffs, curve.interp_type)
+
+    r, _ = _zero_rate_slope(curve, t)
+    return _zero_to_df(r, t, curve.freq)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def curve_fwd(curve, t):
+    """ Return the continuously compounded instantaneous forward rate at time
+    t from a JitCurve record. This is minus the slope of the log of the
+    discount factor and is calculated in closed form. """
+
+    if curve.curve_type == JitCurveTypes.INTERPOLATED.value:
+
+        return _uinterpolate_fwd(t, curve.times, curve.values, curve.breaks,
+                                 curve.coeffs, curve.interp_type)
+
+    r, dr = _zero_rate_slope(curve, t)
+    t = max(t, gSmall)
+    freq = curve.freq
+
+    if freq < 0.0:
+        return r + t * dr
+    elif freq == 0.0:
+        return (r + t * dr) / (1.0 + r * t)
+    else:
+        return freq * np.log(1.0 + r / freq) + t * dr / (1.0 + r / freq)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def curve_fwds(curve, times):
+    """ Vectorised version of curve_fwd for an array of times. """
+
+    n = times.size
+    fwds = np.empty(n)
+    for i in range(0, n):
+        fwds[i] = curve_fwd(curve, times[i])
+
+    return fwds
+
+###############################################################################
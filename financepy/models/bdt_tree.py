@@ -2,6 +2,7 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from numba import njit, float64, int64
 
@@ -11,6 +12,7 @@ from ..market.curves.interpolator import InterpTypes, _uinterpolate
 from ..utils.helpers import label_to_string
 from ..utils.global_types import FinExerciseTypes
 from ..utils.global_vars import gSmall
+from .tree_cache import TreeCache
 
 INTERP_TYPE = InterpTypes.FLAT_FWD_RATES.value
 
@@ -94,32 +96,16 @@ def search_root(x0, m, q_matrix, rt, df_end, dt, sigma):
 
 
 @njit(fastmath=True, cache=True)
-def bermudan_swaption_tree_fast(t_exp, t_mat,
-                                strike_price,
-                                face_amount,
-                                cpn_times,
-                                cpn_flows,
-                                exercise_type_int,
-                                _df_times,
-                                _df_values,
-                                _tree_times,
-                                _Q, _rt, _dt):
-    """ Option to enter into a swap that can be exercised on coupon payment
-    dates after the start of the exercise period. Due to non-analytical bond
-    price we need to extend tree out to bond maturity and take into account
-    cash flows through time. """
-
-    pu = 0.50
-    pd = 0.50
-
-    ###########################################################################
-
-    num_time_steps, num_nodes = _Q.shape
-    expiry_step = int(t_exp/_dt + 0.50)
+def _swaption_flows_on_tree(t_exp, t_mat, strike_price, face_amount,
+                            cpn_times, cpn_flows, _df_times, _df_values,
+                            _tree_times, _dt):
+    """ Map the fixed leg flows of the swap underlying a swaption onto the
+    tree time steps and find the value of the floating leg and the accrued
+    interest on the fixed leg at each step. """
+
+    num_time_steps = len(_tree_times)
     maturity_step = int(t_mat/_dt + 0.50)
 
-    ###########################################################################
-
     fixed_leg_flows = np.zeros(num_time_steps)
     float_leg_values = np.zeros(num_time_steps)
     num_cpns = len(cpn_times)
@@ -167,7 +153,44 @@ def bermudan_swaption_tree_fast(t_exp, t_mat,
         if fixed_leg_flows[m] > gSmall:
             accrued[m] = fixed_leg_flows[m] * face_amount
 
-    #######################################################################
+    return fixed_leg_flows, float_leg_values, accrued
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudan_swaption_tree_fast(t_exp, t_mat,
+                                strike_price,
+                                face_amount,
+                                cpn_times,
+                                cpn_flows,
+                                exercise_type_int,
+                                _df_times,
+                                _df_values,
+                                _tree_times,
+                                _Q, _rt, _dt):
+    """ Option to enter into a swap that can be exercised on coupon payment
+    dates after the start of the exercise period. Due to non-analytical bond
+    price we need to extend tree out to bond maturity and take into account
+    cash flows through time. """
+
+    pu = 0.50
+    pd = 0.50
+
+    ###########################################################################
+
+    num_time_steps, num_nodes = _Q.shape
+    expiry_step = int(t_exp/_dt + 0.50)
+    maturity_step = int(t_mat/_dt + 0.50)
+
+    ###########################################################################
+
+    fixed_leg_flows, float_leg_values, accrued = \
+        _swaption_flows_on_tree(t_exp, t_mat, strike_price, face_amount,
+                                cpn_times, cpn_flows, _df_times, _df_values,
+                                _tree_times, _dt)
+
+    ###########################################################################
 
     # The value of the swap at each time and node. Principal is exchanged.
     fixed_leg_values = np.zeros(shape=(num_time_steps, num_nodes))
@@ -246,6 +269,81 @@ def bermudan_swaption_tree_fast(t_exp, t_mat,
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True, nogil=True)
+def bermudan_swaptions_tree_fast(maturity_steps, faces, fixed_leg_flows,
+                                 float_leg_values, accrued, exercise_masks,
+                                 _Q, _rt, _dt):
+    """ Value a book of swaptions in one sweep back through the tree. Row i of
+    the flow, floating leg, accrued and exercise mask arrays holds trade i at
+    each time step. The values at each node are held for all of the trades
+    together so that each step of the tree is read once for the whole book
+    and only the values at two time steps are kept. """
+
+    pu = 0.50
+    pd = 0.50
+
+    num_time_steps, num_nodes = _Q.shape
+    num_trades = len(faces)
+    last_step = np.max(maturity_steps)
+
+    # The values of all trades at the next and the current time step
+    fixed_next = np.zeros(shape=(num_nodes, num_trades))
+    pay_next = np.zeros(shape=(num_nodes, num_trades))
+    rec_next = np.zeros(shape=(num_nodes, num_trades))
+    fixed_now = np.zeros(shape=(num_nodes, num_trades))
+    pay_now = np.zeros(shape=(num_nodes, num_trades))
+    rec_now = np.zeros(shape=(num_nodes, num_trades))
+
+    for m in range(last_step-1, -1, -1):
+
+        # A trade starts with the value of its fixed leg at maturity
+        for i in range(0, num_trades):
+            if maturity_steps[i] == m + 1:
+                flow = (1.0 + fixed_leg_flows[i, m+1]) * faces[i]
+                for k in range(0, num_nodes):
+                    fixed_next[k, i] = flow
+
+        for k in range(0, m+1):
+            df = np.exp(-_rt[m, k] * _dt)
+
+            for i in range(0, num_trades):
+
+                # Trades that have matured have no value
+                if m >= maturity_steps[i]:
+                    continue
+
+                flow = fixed_leg_flows[i, m] * faces[i]
+
+                v_fixed = (pu*fixed_next[k+1, i] + pd*fixed_next[k, i]) * df
+                v_fixed += flow
+                v_pay = (pu*pay_next[k+1, i] + pd*pay_next[k, i]) * df
+                v_rec = (pu*rec_next[k+1, i] + pd*rec_next[k, i]) * df
+
+                if exercise_masks[i, m]:
+
+                    # The floating value is clean and so must be the fixed
+                    fixed_leg_value = v_fixed - accrued[i, m]
+                    float_leg_value = float_leg_values[i, m]
+
+                    pay_exercise = max(float_leg_value - fixed_leg_value, 0.0)
+                    rec_exercise = max(fixed_leg_value - float_leg_value, 0.0)
+
+                    v_pay = max(pay_exercise, v_pay)
+                    v_rec = max(rec_exercise, v_rec)
+
+                fixed_now[k, i] = v_fixed
+                pay_now[k, i] = v_pay
+                rec_now[k, i] = v_rec
+
+        fixed_next, fixed_now = fixed_now, fixed_next
+        pay_next, pay_now = pay_now, pay_next
+        rec_next, rec_now = rec_now, rec_next
+
+    return pay_next[0, :], rec_next[0, :]
+
+###############################################################################
+
+
 @njit(fastmath=True, cache=True)
 def american_bond_option_tree_fast(t_exp, t_mat,
                                    strike_price, face_amount,
@@ -671,10 +769,29 @@ class BDTTree():
         self._pu = 0.50
         self._pd = 0.50
         self._discount_curve = None
+        self._tree_cache = None
+        self._min_tree_mat = 0.0
+
+###############################################################################
+
+    def cache_trees(self,
+                    max_size: int = 8,
+                    tree_maturity: float = 0.0):
+        """ Keep the trees made by build_tree so that trades valued on the
+        same curve with the same model parameters share a tree rather than
+        building their own. Trees are built out to at least tree_maturity
+        years so that all trades that mature before it use the same tree. The
+        cache is returned so that the number of trees reused can be seen. """
+
+        self._tree_cache = TreeCache(max_size)
+        self._min_tree_mat = tree_maturity
+        return self._tree_cache
 
 ###############################################################################
 
     def build_tree(self, treeMat, df_times, df_values):
+        """ Build the binomial tree. If trees are being cached then a tree
+        built earlier on the same curve is reused. """
 
         if isinstance(df_times, np.ndarray) is False:
             raise FinError("DF TIMES must be a numpy vector")
@@ -682,6 +799,20 @@ class BDTTree():
         if isinstance(df_values, np.ndarray) is False:
             raise FinError("DF VALUES must be a numpy vector")
 
+        key = None
+
+        if self._tree_cache is not None:
+            treeMat = max(treeMat, self._min_tree_mat)
+            params = (self._sigma,)
+            key = self._tree_cache.key(df_times, df_values, params,
+                                       treeMat, self._num_time_steps)
+            tree = self._tree_cache.get(key)
+            if tree is not None:
+                self._tree_times, self._Q, self._rt, self._dt = tree
+                self._df_times = df_times
+                self._dfs = df_values
+                return
+
         interp = InterpTypes.FLAT_FWD_RATES.value
 
         treeMaturity = treeMat * (self._num_time_steps+1)/self._num_time_steps
@@ -702,6 +833,10 @@ class BDTTree():
             = build_tree_fast(self._sigma,
                               tree_times, self._num_time_steps, dfTree)
 
+        if key is not None:
+            self._tree_cache.add(key, (tree_times, self._Q, self._rt,
+                                       self._dt))
+
         return
 
 ###############################################################################
@@ -767,6 +902,91 @@ class BDTTree():
 
         return {'pay': payValue, 'rec': recValue}
 
+###############################################################################
+
+    def bermudan_swaptions(self, t_exps, strikes, face_amounts,
+                           cpn_times, cpn_flows, exercise_types,
+                           num_threads=1):
+        """ Value a book of swaptions on the tree that has been built. Each
+        trade has an expiry time, strike, face amount and exercise type and
+        the lists cpn_times and cpn_flows hold an array of the fixed flows of
+        each trade as used by bermudan_swaption. The tree must extend to the
+        last maturity. All of the trades are valued in one sweep back through
+        the tree and arrays of the payer and receiver values are returned.
+        The trades can be split into blocks which are rolled back on
+        num_threads threads. """
+
+        if num_threads < 1:
+            raise FinError("Number of threads must be at least one.")
+
+        num_trades = len(t_exps)
+        num_time_steps = len(self._tree_times)
+        steps = np.arange(0, num_time_steps)
+
+        fixed_leg_flows = np.zeros(shape=(num_trades, num_time_steps))
+        float_leg_values = np.zeros(shape=(num_trades, num_time_steps))
+        accrued = np.zeros(shape=(num_trades, num_time_steps))
+        exercise_masks = np.zeros(shape=(num_trades, num_time_steps),
+                                  dtype=np.bool_)
+        maturity_steps = np.zeros(num_trades, dtype=np.int64)
+        faces = np.array(face_amounts, dtype=np.float64)
+
+        for i in range(0, num_trades):
+
+            exercise_type_int = option_exercise_types_to_int(exercise_types[i])
+
+            t_exp = t_exps[i]
+            t_mat = cpn_times[i][-1]
+
+            if t_exp > t_mat:
+                raise FinError("Option expiry after bond matures.")
+
+            if t_exp < 0.0:
+                raise FinError("Option expiry time negative.")
+
+            if exercise_type_int == 3:
+                raise FinError("American optionality not allowed.")
+
+            maturity_steps[i] = int(t_mat/self._dt + 0.50)
+
+            if maturity_steps[i] >= num_time_steps - 1:
+                raise FinError("Tree does not extend to the swap maturity.")
+
+            fixed_leg_flows[i], float_leg_values[i], accrued[i] \
+                = _swaption_flows_on_tree(t_exp, t_mat, strikes[i], faces[i],
+                                          cpn_times[i], cpn_flows[i],
+                                          self._df_times, self._dfs,
+                                          self._tree_times, self._dt)
+
+            expiry_step = int(t_exp/self._dt + 0.50)
+            exercise_masks[i] = steps == expiry_step
+
+            # Bermudans can also be exercised on the later coupon dates
+            if exercise_type_int == 2:
+                is_cpn = fixed_leg_flows[i] * faces[i] > gSmall
+                exercise_masks[i] |= is_cpn & (steps > expiry_step)
+
+        trades = (maturity_steps, faces, fixed_leg_flows, float_leg_values,
+                  accrued, exercise_masks)
+        tree = (self._Q, self._rt, self._dt)
+
+        if num_threads == 1:
+            pay_values, rec_values \
+                = bermudan_swaptions_tree_fast(*trades, *tree)
+        else:
+            num_blocks = min(num_threads, num_trades)
+            bounds = np.linspace(0, num_trades, num_blocks + 1).astype(int)
+            with ThreadPoolExecutor(max_workers=num_blocks) as executor:
+                jobs = [executor.submit(bermudan_swaptions_tree_fast,
+                                        *[x[bounds[k]:bounds[k + 1]]
+                                          for x in trades], *tree)
+                        for k in range(0, num_blocks)]
+                values = [job.result() for job in jobs]
+            pay_values = np.concatenate([v[0] for v in values])
+            rec_values = np.concatenate([v[1] for v in values])
+
+        return {'pay': pay_values, 'rec': rec_values}
+
 ###############################################################################
 
     def callable_puttable_bond_tree(self,
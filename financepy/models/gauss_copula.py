@@ -2,41 +2,60 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-# TODO: Use Numba to speed this up more.
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
+from numba import njit
 
+from ..utils.error import FinError
 from ..utils.math import N
 from ..utils.helpers import uniform_to_default_time
 
 ###############################################################################
-# TODO:
+# The default times are generated in blocks of trials so that the memory used
+# is bounded whatever the number of trials. For each block the correlated
+# Gaussians are drawn, either with the Cholesky factor of a full correlation
+# matrix or with a one factor model given by a vector of betas, and are then
+# mapped onto default times using the survival curves of the credits in one
+# compiled call which releases the GIL. Each block draws from its own seeded
+# stream and so the blocks can be generated on many threads at once with the
+# same results. The results depend on the block size.
 ###############################################################################
 
 
-def default_times_gc(issuer_curves,
-                     correlation_matrix,
-                     num_trials,
-                     seed):
-    """ Generate a matrix of default times by credit and trial using a
-    Gaussian copula model using a full rank correlation matrix. """
+@njit(fastmath=True, cache=True, nogil=True)
+def _gaussian_to_uniform_numba(y):
+    """ Map a matrix of standard Gaussians onto the uniforms 1 - N(y). """
+
+    num_credits, num_trials = y.shape
+    u = np.empty((num_credits, num_trials))
+
+    for i_credit in range(0, num_credits):
+        for i_trial in range(0, num_trials):
+            u[i_credit, i_trial] = 1.0 - N(y[i_credit, i_trial])
+
+    return u
+
+###############################################################################
+
 
-    np.random.seed(seed)
-    num_credits = len(issuer_curves)
-    x = np.random.normal(0.0, 1.0, size=(num_credits, num_trials))
-    c = np.linalg.cholesky(correlation_matrix)
-    y = np.dot(c, x)
+@njit(fastmath=True, cache=True, nogil=True)
+def _default_times_numba(u, curve_ptr, curve_times, curve_values):
+    """ Map a matrix of uniforms by credit and trial onto default times using
+    the survival curve of each credit. The times for the antithetic uniforms
+    1 - u are held in the second half of the columns. """
 
-    corr_times = np.empty(shape=(num_credits, 2 * num_trials))
+    num_credits, num_trials = u.shape
+    corr_times = np.empty((num_credits, 2 * num_trials))
 
     for i_credit in range(0, num_credits):
-        issuer_curve = issuer_curves[i_credit]
+
+        times = curve_times[curve_ptr[i_credit]:curve_ptr[i_credit + 1]]
+        values = curve_values[curve_ptr[i_credit]:curve_ptr[i_credit + 1]]
+
         for i_trial in range(0, num_trials):
-            g = y[i_credit, i_trial]
-            u1 = 1.0 - N(g)
+            u1 = u[i_credit, i_trial]
             u2 = 1.0 - u1
-            times = issuer_curve._times
-            values = issuer_curve._values
             t1 = uniform_to_default_time(u1, times, values)
             t2 = uniform_to_default_time(u2, times, values)
             corr_times[i_credit, i_trial] = t1
@@ -44,4 +63,153 @@ def default_times_gc(issuer_curves,
 
     return corr_times
 
+###############################################################################
+
+
+def _flatten_curves(issuer_curves):
+    """ Hold the times and survival probabilities of the issuer curves in two
+    arrays with a pointer to the start of each curve. """
+
+    curve_ptr = np.zeros(len(issuer_curves) + 1, dtype=np.int64)
+
+    for i, issuer_curve in enumerate(issuer_curves):
+        curve_ptr[i + 1] = curve_ptr[i] + len(issuer_curve._times)
+
+    curve_times = np.concatenate([np.array(c._times, dtype=np.float64)
+                                  for c in issuer_curves])
+    curve_values = np.concatenate([np.array(c._values, dtype=np.float64)
+                                   for c in issuer_curves])
+
+    return curve_ptr, curve_times, curve_values
+
+###############################################################################
+
+
+def _block_random_state(seed, i_block):
+    """ The random state of block i_block. The first block uses the seed
+    itself so that a single block of all of the trials draws the same
+    numbers as a RandomState with this seed. Every later block has its own
+    stream from the seed sequence of the seed and the block number. """
+
+    if i_block == 0:
+        return np.random.RandomState(seed)
+
+    seed_seq = np.random.SeedSequence([seed, i_block])
+    return np.random.RandomState(np.random.MT19937(seed_seq))
+
+###############################################################################
+
+
+def _correlated_gaussian_blocks(num_credits,
+                                num_trials,
+                                seed,
+                                correlation_matrix,
+                                beta_vector,
+                                block_size,
+                                block_fn,
+                                num_threads=1):
+    """ Draw blocks of correlated standard Gaussians with one row per credit
+    and one column per trial and yield the result of block_fn called with
+    the Gaussians, the random state of the block and its number of trials.
+    Exactly one of the correlation matrix and the beta vector of a one
+    factor model must be given. The blocks are made num_threads at a time
+    on a ThreadPoolExecutor and are yielded in order. """
+
+    if (correlation_matrix is None) == (beta_vector is None):
+        raise FinError("Pass a correlation matrix or a beta vector.")
+
+    if block_size < 1:
+        raise FinError("Block size must be at least one.")
+
+    if num_threads < 1:
+        raise FinError("Number of threads must be at least one.")
+
+    if correlation_matrix is not None:
+        chol = np.linalg.cholesky(correlation_matrix)
+        if chol.shape[0] != num_credits:
+            raise FinError("Correlation matrix does not match credits.")
+    else:
+        betas = np.array(beta_vector, dtype=np.float64)
+        if len(betas) != num_credits:
+            raise FinError("Beta vector does not match credits.")
+        if np.any(np.abs(betas) > 1.0):
+            raise FinError("Betas must be between -1 and 1.")
+        idios = np.sqrt(1.0 - betas * betas)
+
+    def run_block(i_block):
+
+        n = min(block_size, num_trials - i_block * block_size)
+        rng = _block_random_state(seed, i_block)
+
+        if correlation_matrix is not None:
+            x = rng.normal(0.0, 1.0, size=(num_credits, n))
+            y = np.dot(chol, x)
+        else:
+            z = rng.normal(0.0, 1.0, size=n)
+            x = rng.normal(0.0, 1.0, size=(num_credits, n))
+            y = betas[:, None] * z[None, :] + idios[:, None] * x
+
+        return block_fn(y, rng, n)
+
+    num_blocks = (num_trials + block_size - 1) // block_size
+
+    if num_threads == 1:
+        for i_block in range(0, num_blocks):
+            yield run_block(i_block)
+        return
+
+    # Only num_threads blocks are held in memory at any one time
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        for first in range(0, num_blocks, num_threads):
+            last = min(first + num_threads, num_blocks)
+            jobs = [executor.submit(run_block, i_block)
+                    for i_block in range(first, last)]
+            for job in jobs:
+                yield job.result()
+
+###############################################################################
+
+
+def default_time_blocks_gc(issuer_curves,
+                           num_trials,
+                           seed,
+                           correlation_matrix=None,
+                           beta_vector=None,
+                           block_size=10000,
+                           num_threads=1):
+    """ Generate the default times of a Gaussian copula model in blocks of
+    at most block_size trials. Each block is a matrix by credit and trial
+    with the antithetic trials in the second half of the columns. Either a
+    full rank correlation matrix or a beta vector for a one factor model
+    which avoids the Cholesky factorisation must be given. The blocks are
+    generated num_threads at a time and do not depend on num_threads. """
+
+    curve_ptr, curve_times, curve_values = _flatten_curves(issuer_curves)
+
+    def block_fn(y, rng, n):
+        u = _gaussian_to_uniform_numba(y)
+        return _default_times_numba(u, curve_ptr, curve_times, curve_values)
+
+    yield from _correlated_gaussian_blocks(len(issuer_curves), num_trials,
+                                           seed, correlation_matrix,
+                                           beta_vector, block_size,
+                                           block_fn, num_threads)
+
+###############################################################################
+
+
+def default_times_gc(issuer_curves,
+                     correlation_matrix,
+                     num_trials,
+                     seed):
+    """ Generate a matrix of default times by credit and trial using a
+    Gaussian copula model using a full rank correlation matrix. """
+
+    blocks = default_time_blocks_gc(issuer_curves, num_trials, seed,
+                                    correlation_matrix=correlation_matrix,
+                                    block_size=max(num_trials, 1))
+
+    # There are no blocks if there are no trials
+    return next(blocks, np.zeros((len(issuer_curves), 0)))
+
 ##########################################################################
@@ -3,6 +3,7 @@
 ##############################################################################
 
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from scipy import optimize
 from numba import njit
@@ -11,9 +12,11 @@ from math import ceil
 from ..utils.error import FinError
 from ..utils.math import N, accrued_interpolator
 from ..market.curves.interpolator import InterpTypes, _uinterpolate
+from ..market.curves.jit_curve import curve_df, flat_fwd_curve
 from ..utils.helpers import label_to_string
 from ..utils.global_types import FinExerciseTypes
 from ..utils.global_vars import gSmall
+from .tree_cache import TreeCache
 
 interp = InterpTypes.FLAT_FWD_RATES.value
 
@@ -79,8 +82,9 @@ def p_fast(t, T, r_t, delta, pt, ptd, pT, _sigma, _a):
 
 
 @njit(fastmath=True, cache=True)
-def build_tree_fast(a, sigma, tree_times, num_time_steps, discount_factors):
-    """ Fast tree construction using Numba. """
+def build_tree_fast(a, sigma, tree_times, num_time_steps, curve):
+    """ Fast tree construction using Numba. The tree is fitted to the
+    discount factors of the JitCurve record curve at the tree times. """
     treeMaturity = tree_times[-1]
     dt = treeMaturity / (num_time_steps+1)
     dR = sigma * np.sqrt(3.0 * dt)
@@ -132,7 +136,7 @@ def build_tree_fast(a, sigma, tree_times, num_time_steps, discount_factors):
         for j in range(-nm, nm+1):
             rdt = j*dR*dt
             sumQZ += Q[m, j+N] * np.exp(-rdt)
-        alpha[m] = np.log(sumQZ/discount_factors[m+1]) / dt
+        alpha[m] = np.log(sumQZ/curve_df(curve, tree_times[m+1])) / dt
 
         for j in range(-nm, nm+1):
             jN = j + N
@@ -411,23 +415,16 @@ def american_bond_option_tree_fast(t_exp,
 
 
 @njit(fastmath=True, cache=True)
-def bermudan_swaption_tree_fast(t_exp, t_mat, strike_price, face_amount,
-                                cpn_times, cpn_flows,
-                                exercise_typeInt,
-                                _df_times, _df_values,
-                                _tree_times, _Q, _pu, _pm, _pd, _r_t, _dt, _a):
-    """ Option to enter into a swap that can be exercised on coupon payment
-    dates after the star_t of the exercise period. Due to multiple exercise
-    times we need to extend tree out to bond maturity and take into account
-    cash flows through time. """
-
-    num_time_steps, num_nodes = _Q.shape
-    j_max = ceil(0.1835/(_a * _dt))
-    expiry_step = int(t_exp/_dt + 0.50)
+def _swaption_flows_on_tree(t_exp, t_mat, strike_price, face_amount,
+                            cpn_times, cpn_flows, _df_times, _df_values,
+                            _tree_times, _dt):
+    """ Map the fixed leg flows of the swap underlying a swaption onto the
+    tree time steps and find the value of the floating leg and the accrued
+    interest on the fixed leg at each step. """
+
+    num_time_steps = len(_tree_times)
     maturityStep = int(t_mat/_dt + 0.50)
 
-    ###########################################################################
-
     fixed_leg_flows = np.zeros(num_time_steps)
     float_leg_values = np.zeros(num_time_steps)
     num_cpns = len(cpn_times)
@@ -475,6 +472,34 @@ def bermudan_swaption_tree_fast(t_exp, t_mat, strike_price, face_amount,
         if fixed_leg_flows[m] > gSmall:
             accrued[m] = fixed_leg_flows[m] * face_amount
 
+    return fixed_leg_flows, float_leg_values, accrued
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudan_swaption_tree_fast(t_exp, t_mat, strike_price, face_amount,
+                                cpn_times, cpn_flows,
+                                exercise_typeInt,
+                                _df_times, _df_values,
+                                _tree_times, _Q, _pu, _pm, _pd, _r_t, _dt, _a):
+    """ Option to enter into a swap that can be exercised on coupon payment
+    dates after the star_t of the exercise period. Due to multiple exercise
+    times we need to extend tree out to bond maturity and take into account
+    cash flows through time. """
+
+    num_time_steps, num_nodes = _Q.shape
+    j_max = ceil(0.1835/(_a * _dt))
+    expiry_step = int(t_exp/_dt + 0.50)
+    maturityStep = int(t_mat/_dt + 0.50)
+
+    ###########################################################################
+
+    fixed_leg_flows, float_leg_values, accrued = \
+        _swaption_flows_on_tree(t_exp, t_mat, strike_price, face_amount,
+                                cpn_times, cpn_flows, _df_times, _df_values,
+                                _tree_times, _dt)
+
     ###########################################################################
 
     # The value of the swap at each time and node. Principal is exchanged.
@@ -595,6 +620,96 @@ def bermudan_swaption_tree_fast(t_exp, t_mat, strike_price, face_amount,
     return pay_values[0, j_max], rec_values[0, j_max]
 
 ###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def bermudan_swaptions_tree_fast(maturity_steps, faces, fixed_leg_flows,
+                                 float_leg_values, accrued, exercise_masks,
+                                 _Q, _pu, _pm, _pd, _r_t, _dt, _a):
+    """ Value a book of swaptions in one sweep back through the tree. Row i of
+    the flow, floating leg, accrued and exercise mask arrays holds trade i at
+    each time step. The values at each node are held for all of the trades
+    together so that each step of the tree is read once for the whole book
+    and only the values at two time steps are kept. """
+
+    num_time_steps, num_nodes = _Q.shape
+    num_trades = len(faces)
+    j_max = ceil(0.1835/(_a * _dt))
+    N = j_max
+    last_step = np.max(maturity_steps)
+
+    # The values of all trades at the next and the current time step
+    fixed_next = np.zeros(shape=(num_nodes, num_trades))
+    pay_next = np.zeros(shape=(num_nodes, num_trades))
+    rec_next = np.zeros(shape=(num_nodes, num_trades))
+    fixed_now = np.zeros(shape=(num_nodes, num_trades))
+    pay_now = np.zeros(shape=(num_nodes, num_trades))
+    rec_now = np.zeros(shape=(num_nodes, num_trades))
+
+    for m in range(last_step-1, -1, -1):
+
+        # A trade starts with the value of its fixed leg at maturity
+        for i in range(0, num_trades):
+            if maturity_steps[i] == m + 1:
+                flow = (1.0 + fixed_leg_flows[i, m+1]) * faces[i]
+                for k in range(0, num_nodes):
+                    fixed_next[k, i] = flow
+
+        nm = min(m, j_max)
+
+        for k in range(-nm, nm+1):
+            kN = k + N
+            df = np.exp(-_r_t[m, kN] * _dt)
+            pu = _pu[kN]
+            pm = _pm[kN]
+            pd = _pd[kN]
+
+            if k == j_max:
+                ku, km, kd = kN, kN-1, kN-2
+            elif k == -j_max:
+                ku, km, kd = kN+2, kN+1, kN
+            else:
+                ku, km, kd = kN+1, kN, kN-1
+
+            for i in range(0, num_trades):
+
+                # Trades that have matured have no value
+                if m >= maturity_steps[i]:
+                    continue
+
+                flow = fixed_leg_flows[i, m] * faces[i]
+
+                v_fixed = (pu*fixed_next[ku, i] + pm*fixed_next[km, i] +
+                           pd*fixed_next[kd, i]) * df
+                v_fixed += flow
+                v_pay = (pu*pay_next[ku, i] + pm*pay_next[km, i] +
+                         pd*pay_next[kd, i]) * df
+                v_rec = (pu*rec_next[ku, i] + pm*rec_next[km, i] +
+                         pd*rec_next[kd, i]) * df
+
+                if exercise_masks[i, m]:
+
+                    # The floating value is clean and so must be the fixed
+                    fixed_leg_value = v_fixed - accrued[i, m]
+                    float_leg_value = float_leg_values[i, m]
+
+                    pay_exercise = max(float_leg_value - fixed_leg_value, 0.0)
+                    rec_exercise = max(fixed_leg_value - float_leg_value, 0.0)
+
+                    v_pay = max(pay_exercise, v_pay)
+                    v_rec = max(rec_exercise, v_rec)
+
+                fixed_now[kN, i] = v_fixed
+                pay_now[kN, i] = v_pay
+                rec_now[kN, i] = v_rec
+
+        fixed_next, fixed_now = fixed_now, fixed_next
+        pay_next, pay_now = pay_now, pay_next
+        rec_next, rec_now = rec_now, rec_next
+
+    return pay_next[j_max, :], rec_next[j_max, :]
+
+###############################################################################
 # TODO: CHECK ACCRUED AND COUPONS TO SEE IF IT WORKS FOR LOW TREE STEPS
 ###############################################################################
 
@@ -872,6 +987,8 @@ class HWTree():
         self._pd = None
         self._discount_curve = None
         self._treeBuilt = False
+        self._tree_cache = None
+        self._min_tree_mat = 0.0
 
 ###############################################################################
 
@@ -1132,6 +1249,92 @@ class HWTree():
 
         return {'pay': payValue, 'rec': recValue}
 
+###############################################################################
+
+    def bermudan_swaptions(self, t_exps, strikes, face_amounts,
+                           cpn_times, cpn_flows, exercise_types,
+                           num_threads=1):
+        """ Value a book of swaptions on the tree that has been built. Each
+        trade has an expiry time, strike, face amount and exercise type and
+        the lists cpn_times and cpn_flows hold an array of the fixed flows of
+        each trade as used by bermudan_swaption. The tree must extend to the
+        last maturity. All of the trades are valued in one sweep back through
+        the tree and arrays of the payer and receiver values are returned.
+        The trades can be split into blocks which are rolled back on
+        num_threads threads. """
+
+        if num_threads < 1:
+            raise FinError("Number of threads must be at least one.")
+
+        num_trades = len(t_exps)
+        num_time_steps = len(self._tree_times)
+        steps = np.arange(0, num_time_steps)
+
+        fixed_leg_flows = np.zeros(shape=(num_trades, num_time_steps))
+        float_leg_values = np.zeros(shape=(num_trades, num_time_steps))
+        accrued = np.zeros(shape=(num_trades, num_time_steps))
+        exercise_masks = np.zeros(shape=(num_trades, num_time_steps),
+                                  dtype=np.bool_)
+        maturity_steps = np.zeros(num_trades, dtype=np.int64)
+        faces = np.array(face_amounts, dtype=np.float64)
+
+        for i in range(0, num_trades):
+
+            exercise_type_int = option_exercise_types_to_int(exercise_types[i])
+
+            t_exp = t_exps[i]
+            t_mat = cpn_times[i][-1]
+
+            if t_exp > t_mat:
+                raise FinError("Option expiry after bond matures.")
+
+            if t_exp < 0.0:
+                raise FinError("Option expiry time negative.")
+
+            if exercise_type_int == 3:
+                raise FinError("American optionality not allowed.")
+
+            maturity_steps[i] = int(t_mat/self._dt + 0.50)
+
+            if maturity_steps[i] >= num_time_steps - 1:
+                raise FinError("Tree does not extend to the swap maturity.")
+
+            fixed_leg_flows[i], float_leg_values[i], accrued[i] \
+                = _swaption_flows_on_tree(t_exp, t_mat, strikes[i], faces[i],
+                                          cpn_times[i], cpn_flows[i],
+                                          self._df_times, self._dfs,
+                                          self._tree_times, self._dt)
+
+            expiry_step = int(t_exp/self._dt + 0.50)
+            exercise_masks[i] = steps == expiry_step
+
+            # Bermudans can also be exercised on the later coupon dates
+            if exercise_type_int == 2:
+                is_cpn = fixed_leg_flows[i] * faces[i] > gSmall
+                exercise_masks[i] |= is_cpn & (steps > expiry_step)
+
+        trades = (maturity_steps, faces, fixed_leg_flows, float_leg_values,
+                  accrued, exercise_masks)
+        tree = (self._Q, self._pu, self._pm, self._pd, self._r_t, self._dt,
+                self._a)
+
+        if num_threads == 1:
+            pay_values, rec_values \
+                = bermudan_swaptions_tree_fast(*trades, *tree)
+        else:
+            num_blocks = min(num_threads, num_trades)
+            bounds = np.linspace(0, num_trades, num_blocks + 1).astype(int)
+            with ThreadPoolExecutor(max_workers=num_blocks) as executor:
+                jobs = [executor.submit(bermudan_swaptions_tree_fast,
+                                        *[x[bounds[k]:bounds[k + 1]]
+                                          for x in trades], *tree)
+                        for k in range(0, num_blocks)]
+                values = [job.result() for job in jobs]
+            pay_values = np.concatenate([v[0] for v in values])
+            rec_values = np.concatenate([v[1] for v in values])
+
+        return {'pay': pay_values, 'rec': rec_values}
+
 ###############################################################################
 
     def bond_option(self, t_exp, strike_price, face_amount,
@@ -1264,10 +1467,26 @@ class HWTree():
         zero_rate = -np.log(p)/t_mat
         return p, zero_rate
 
+###############################################################################
+
+    def cache_trees(self,
+                    max_size: int = 8,
+                    tree_maturity: float = 0.0):
+        """ Keep the trees made by build_tree so that trades valued on the
+        same curve with the same model parameters share a tree rather than
+        building their own. Trees are built out to at least tree_maturity
+        years so that all trades that mature before it use the same tree. The
+        cache is returned so that the number of trees reused can be seen. """
+
+        self._tree_cache = TreeCache(max_size)
+        self._min_tree_mat = tree_maturity
+        return self._tree_cache
+
 ###############################################################################
 
     def build_tree(self, treeMat, df_times, df_values):
-        """ Build the trinomial tree. """
+        """ Build the trinomial tree. If trees are being cached then a tree
+        built earlier on the same curve is reused. """
 
         if isinstance(df_times, np.ndarray) is False:
             raise FinError("DF TIMES must be a numpy vector")
@@ -1275,6 +1494,21 @@ class HWTree():
         if isinstance(df_values, np.ndarray) is False:
             raise FinError("DF VALUES must be a numpy vector")
 
+        key = None
+
+        if self._tree_cache is not None:
+            treeMat = max(treeMat, self._min_tree_mat)
+            params = (self._sigma, self._a)
+            key = self._tree_cache.key(df_times, df_values, params,
+                                       treeMat, self._num_time_steps)
+            tree = self._tree_cache.get(key)
+            if tree is not None:
+                self._tree_times, self._Q, self._pu, self._pm, self._pd, \
+                    self._r_t, self._dt = tree
+                self._df_times = df_times
+                self._dfs = df_values
+                return
+
         # I wish to add on an additional time to the tree so that the second
         # last time corresponds to a maturity treeMat. For this reason I scale
         # up the maturity date of the tree as follows
@@ -1284,19 +1518,19 @@ class HWTree():
         tree_times = np.linspace(0.0, treeMaturity, self._num_time_steps + 2)
         self._tree_times = tree_times
 
-        dfTree = np.zeros(shape=(self._num_time_steps+2))
-        dfTree[0] = 1.0
-
-        for i in range(1, self._num_time_steps+2):
-            t = tree_times[i]
-            dfTree[i] = _uinterpolate(t, df_times, df_values, interp)
-
         self._df_times = df_times
         self._dfs = df_values
 
+        curve = flat_fwd_curve(df_times, df_values)
+
         self._Q, self._pu, self._pm, self._pd, self._r_t, self._dt \
             = build_tree_fast(self._a, self._sigma,
-                              tree_times, self._num_time_steps, dfTree)
+                              tree_times, self._num_time_steps, curve)
+
+        if key is not None:
+            self._tree_cache.add(key, (tree_times, self._Q, self._pu,
+                                       self._pm, self._pd, self._r_t,
+                                       self._dt))
 
         return
 
@@ -2,17 +2,50 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from math import sqrt
 import numpy as np
 from scipy.stats import t as student
 
-from ..utils.helpers import uniform_to_default_time
+from .gauss_copula import _flatten_curves, _correlated_gaussian_blocks
+from .gauss_copula import _default_times_numba
 
 ###############################################################################
 
 
 class StudentTCopula():
 
+    def default_time_blocks(self,
+                            issuer_curves,
+                            degrees_of_freedom,
+                            num_trials,
+                            seed,
+                            correlation_matrix=None,
+                            beta_vector=None,
+                            block_size=10000,
+                            num_threads=1):
+        """ Generate the default times of a Student-t copula model in blocks
+        of at most block_size trials. Each block is a matrix by credit and
+        trial with the antithetic trials in the second half of the columns.
+        Either a full rank correlation matrix or a beta vector for a one
+        factor model must be given. The blocks are generated num_threads at
+        a time and do not depend on num_threads. """
+
+        curve_ptr, curve_times, curve_values = _flatten_curves(issuer_curves)
+
+        def block_fn(y, rng, n):
+            chi2 = rng.chisquare(degrees_of_freedom, size=n)
+            c = np.sqrt(chi2 / degrees_of_freedom)
+            u = student.cdf(y / c[None, :], degrees_of_freedom)
+            return _default_times_numba(u, curve_ptr, curve_times,
+                                        curve_values)
+
+        yield from _correlated_gaussian_blocks(len(issuer_curves),
+                                               num_trials, seed,
+                                               correlation_matrix,
+                                               beta_vector, block_size,
+                                               block_fn, num_threads)
+
+###############################################################################
+
     def default_times(self,
                       issuer_curves,
                       correlation_matrix,
@@ -20,29 +53,12 @@ class StudentTCopula():
                       num_trials,
                       seed):
 
-        np.random.seed(seed)
-        num_credits = len(issuer_curves)
-        x = np.random.normal(0.0, 1.0, size=(num_credits, num_trials))
-        c = np.linalg.cholesky(correlation_matrix)
-        y = np.dot(c, x)
-
-        corr_times = np.empty(shape=(num_credits, 2 * num_trials))
-
-        for i_trial in range(0, num_trials):
-            chi2 = np.random.chisquare(degreesOfFreedom)
-            c = sqrt(chi2 / degreesOfFreedom)
-            for iCredit in range(0, num_credits):
-                issuer_curve = issuer_curves[iCredit]
-                g = y[iCredit, i_trial] / c
-                u1 = student.cdf(g, degreesOfFreedom)
-                u2 = 1.0 - u1
-                times = issuer_curve._times
-                values = issuer_curve._values
-                t1 = uniform_to_default_time(u1, times, values)
-                t2 = uniform_to_default_time(u2, times, values)
-                corr_times[iCredit, i_trial] = t1
-                corr_times[iCredit, i_trial + num_trials] = t2
-
-        return corr_times
+        blocks = self.default_time_blocks(issuer_curves, degreesOfFreedom,
+                                          num_trials, seed,
+                                          correlation_matrix,
+                                          block_size=max(num_trials, 1))
+
+        # There are no blocks if there are no trials
+        return next(blocks, np.zeros((len(issuer_curves), 0)))
 
 ###############################################################################
@@ -0,0 +1,101 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from collections import OrderedDict
+
+from ..utils.error import FinError
+from ..utils.helpers import label_to_string
+
+###############################################################################
+# Building a short rate tree is the main cost of valuing a Bermudan swaption
+# or a callable bond. When a book of trades is valued on the same curve with
+# the same model the trees are the same and so can be kept and reused. The
+# trees are keyed by the curve, the model parameters, the maturity of the
+# tree and its number of time steps. The least recently used tree is dropped
+# once the cache is full.
+###############################################################################
+
+
+class TreeCache():
+    """ Holds the most recently used trees of a short rate model together
+    with counts of the number of times a tree was found or had to be built.
+    """
+
+    def __init__(self,
+                 max_size: int = 8):
+        """ Create a cache that holds up to max_size trees. """
+
+        if max_size < 1:
+            raise FinError("Tree cache must hold at least one tree.")
+
+        self._max_size = max_size
+        self._trees = OrderedDict()
+        self._num_hits = 0
+        self._num_misses = 0
+
+###############################################################################
+
+    def key(self, df_times, df_values, params, tree_mat, num_time_steps):
+        """ The key of a tree built on the discount factors at the given
+        times with a tuple of model parameters. """
+
+        return (df_times.tobytes(), df_values.tobytes(), params, tree_mat,
+                num_time_steps)
+
+###############################################################################
+
+    def get(self, key):
+        """ Return the tree for this key or None if it is not held. """
+
+        tree = self._trees.get(key)
+
+        if tree is None:
+            self._num_misses += 1
+            return None
+
+        self._trees.move_to_end(key)
+        self._num_hits += 1
+        return tree
+
+###############################################################################
+
+    def add(self, key, tree):
+        """ Hold a tree dropping the least recently used one if full. """
+
+        self._trees[key] = tree
+        self._trees.move_to_end(key)
+
+        if len(self._trees) > self._max_size:
+            self._trees.popitem(last=False)
+
+###############################################################################
+
+    def clear(self):
+        """ Drop all of the trees and reset the counts. """
+
+        self._trees.clear()
+        self._num_hits = 0
+        self._num_misses = 0
+
+###############################################################################
+
+    def __len__(self):
+        return len(self._trees)
+
+###############################################################################
+
+    def __repr__(self):
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("MAX SIZE", self._max_size)
+        s += label_to_string("NUM TREES", len(self._trees))
+        s += label_to_string("NUM HITS", self._num_hits)
+        s += label_to_string("NUM MISSES", self._num_misses)
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
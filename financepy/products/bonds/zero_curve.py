@@ -7,16 +7,17 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy import optimize
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.math import scale, test_monotonicity
 from ...utils.global_vars import gDaysInYear
 from ...utils.day_count import DayCount, DayCountTypes
-from ...utils.helpers import input_time
+from ...utils.helpers import input_time, times_from_dates
 from ...utils.helpers import table_to_string
 from ...market.curves.interpolator import InterpTypes, interpolate
 from ...utils.error import FinError
 from ...utils.frequency import annual_frequency, FrequencyTypes
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.curves.jit_curve import JitCurveTypes, make_jit_curve
 from ...utils.helpers import label_to_string
 
 ###############################################################################
@@ -112,11 +113,24 @@ class BondZeroCurve(DiscountCurve):
 ###############################################################################
 
     def df(self,
-           dt: Date):
+           dt: (Date, list, DateArray)):
+        """ Discount factor at a date, a list of dates or a DateArray. """
+        if isinstance(dt, (list, DateArray)):
+            dt = times_from_dates(dt, self._value_dt)
         t = input_time(dt, self)
         z = interpolate(t, self._times, self._values, self._interp_type.value)
         return z
 
+###############################################################################
+
+    def jit_curve(self):
+        """ Return a JitCurve record for use inside numba kernels. """
+
+        return make_jit_curve(JitCurveTypes.INTERPOLATED,
+                              times=self._times,
+                              values=self._values,
+                              interp_type=self._interp_type)
+
 ###############################################################################
 
     def survival_prob(self,
@@ -129,13 +143,16 @@ class BondZeroCurve(DiscountCurve):
 
     def fwd(self,
             dt: Date):
-        """ Calculate the continuous forward rate at the forward date. """
+        """ Calculate the continuous forward rate at the forward date. The
+        date is converted to a time as in the df function and the forward is
+        found in closed form from the JitCurve record of the curve. """
         t = input_time(dt, self)
-        dt = 0.000001
-        df1 = self.df(t)
-        df2 = self.df(t+dt)
-        fwd = np.log(df1/df2)/dt
-        return fwd
+        fwds = self._fwd(t)
+
+        if isinstance(dt, np.ndarray):
+            return fwds
+        else:
+            return fwds[0]
 
 ###############################################################################
 
@@ -1,5 +1,6 @@
 from .cds import *
 from .cds_curve import *
+from .cds_risk import *
 from .cds_basket import *
 from .cds_index_option import *
 from .cds_index_portfolio import *
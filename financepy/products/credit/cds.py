@@ -4,11 +4,11 @@
 
 
 import numpy as np
-from numba import njit, float64, int64
+from numba import njit
 from math import exp, log
 from copy import deepcopy
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.error import FinError
 from ...utils.calendar import Calendar, CalendarTypes
 from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
@@ -17,7 +17,7 @@ from ...utils.frequency import annual_frequency, FrequencyTypes
 from ...utils.global_vars import gDaysInYear
 from ...utils.math import ONE_MILLION
 from ...utils.helpers import label_to_string, table_to_string
-from ...market.curves.interpolator import InterpTypes, _uinterpolate
+from ...market.curves.jit_curve import curve_df, flat_fwd_curve
 
 from ...utils.helpers import check_argument_types
 
@@ -33,31 +33,45 @@ glob_num_steps_per_year = 25
 ###############################################################################
 
 
-@njit(float64[:](float64, float64, float64[:], float64[:], float64[:],
-                 float64[:], float64[:], float64[:], int64),
-      fastmath=True, cache=True)
+def _ibor_jit_curve(libor_curve):
+    """ JitCurve record of the Ibor discount factors which are interpolated
+    using flat forward rates whatever the scheme of the Ibor curve. """
+
+    return flat_fwd_curve(np.asarray(libor_curve._times, dtype=np.float64),
+                          np.asarray(libor_curve._dfs, dtype=np.float64))
+
+###############################################################################
+
+
+def _surv_jit_curve(issuer_curve):
+    """ JitCurve record of the survival probabilities of an issuer curve. """
+
+    return flat_fwd_curve(np.asarray(issuer_curve._times, dtype=np.float64),
+                          np.asarray(issuer_curve._values, dtype=np.float64))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
 def _risky_pv01_numba(teff,
                       accrual_factorPCDToNow,
                       paymentTimes,
                       year_fracs,
-                      npIborTimes,
-                      npIborValues,
-                      npSurvTimes,
-                      npSurvValues,
+                      ibor_curve,
+                      surv_curve,
                       pv01_method):
-    """ Fast calculation of the risky PV01 of a CDS using NUMBA.
+    """ Fast calculation of the risky PV01 of a CDS using NUMBA. The Ibor
+    discount factors and the survival probabilities are JitCurve records.
     The output is a numpy array of the full and clean risky PV01."""
 
-    method = InterpTypes.FLAT_FWD_RATES.value
-
     if 1 == 0:
         print("===================")
         print("Teff", teff)
         print("Acc", accrual_factorPCDToNow)
         print("Payments", paymentTimes)
         print("Alphas", year_fracs)
-        print("QTimes", npSurvTimes)
-        print("QValues", npSurvValues)
+        print("QTimes", surv_curve.times)
+        print("QValues", surv_curve.values)
 
     cpnAccruedIndicator = 1
 
@@ -69,9 +83,9 @@ def _risky_pv01_numba(teff,
 
     # The first cpn is a special case which needs to be handled carefully
     # taking into account what cpn has already accrued and what has not
-    qeff = _uinterpolate(teff, npSurvTimes, npSurvValues, method)
-    q1 = _uinterpolate(tncd, npSurvTimes, npSurvValues, method)
-    z1 = _uinterpolate(tncd, npIborTimes, npIborValues, method)
+    qeff = curve_df(surv_curve, teff)
+    q1 = curve_df(surv_curve, tncd)
+    z1 = curve_df(ibor_curve, tncd)
 
     # this is the part of the cpn accrued from previous cpn date to now
     # accrual_factorPCDToNow = day_count.year_frac(pcd,teff)
@@ -94,8 +108,8 @@ def _risky_pv01_numba(teff,
 
         t2 = paymentTimes[it]
 
-        q2 = _uinterpolate(t2, npSurvTimes, npSurvValues, method)
-        z2 = _uinterpolate(t2, npIborTimes, npIborValues, method)
+        q2 = curve_df(surv_curve, t2)
+        z2 = curve_df(ibor_curve, t2)
 
         accrual_factor = year_fracs[it]
 
@@ -131,28 +145,25 @@ def _risky_pv01_numba(teff,
 ###############################################################################
 
 
-@njit(float64(float64, float64, float64[:], float64[:], float64[:], float64[:],
-              float64, int64, int64), fastmath=True, cache=True)
+@njit(fastmath=True, cache=True, nogil=True)
 def _protection_leg_pv_numba(teff,
                              t_mat,
-                             npIborTimes,
-                             npIborValues,
-                             npSurvTimes,
-                             npSurvValues,
+                             ibor_curve,
+                             surv_curve,
                              contract_recovery_rate,
                              num_steps_per_year,
                              protMethod):
     """ Fast calculation of the CDS protection leg PV using NUMBA to speed up
-    the numerical integration over time. """
+    the numerical integration over time. The Ibor discount factors and the
+    survival probabilities are JitCurve records. """
 
-    method = InterpTypes.FLAT_FWD_RATES.value
     dt = 1.0 / num_steps_per_year
     num_steps = int((t_mat-teff) * num_steps_per_year + 0.50)
     dt = (t_mat - teff) / num_steps
 
     t = teff
-    z1 = _uinterpolate(t, npIborTimes, npIborValues, method)
-    q1 = _uinterpolate(t, npSurvTimes, npSurvValues, method)
+    z1 = curve_df(ibor_curve, t)
+    q1 = curve_df(surv_curve, t)
 
     prot_pv = 0.0
     small = 1e-8
@@ -161,8 +172,8 @@ def _protection_leg_pv_numba(teff,
 
         for _ in range(0, num_steps):
             t = t + dt
-            z2 = _uinterpolate(t, npIborTimes, npIborValues, method)
-            q2 = _uinterpolate(t, npSurvTimes, npSurvValues, method)
+            z2 = curve_df(ibor_curve, t)
+            q2 = curve_df(surv_curve, t)
             # This needs to be updated to handle small h+r
             h12 = -log(q2 / q1) / dt
             r12 = -log(z2 / z1) / dt
@@ -177,8 +188,8 @@ def _protection_leg_pv_numba(teff,
 
         for _ in range(0, num_steps):
             t += dt
-            z2 = _uinterpolate(t, npIborTimes, npIborValues, method)
-            q2 = _uinterpolate(t, npSurvTimes, npSurvValues, method)
+            z2 = curve_df(ibor_curve, t)
+            q2 = curve_df(surv_curve, t)
             dq = q1 - q2
             dprot_pv = 0.5 * (z1 + z2) * dq
             prot_pv += dprot_pv
@@ -339,10 +350,13 @@ class CDS:
         # self._accrual_factors.append(0.0)
         # self._flows.append(0.0)
 
-        for t0, t1 in zip(self._accrual_start_dts, self._accrual_end_dts):
-            # Adding a day because `year_frac` is non-inclusive
-            # eg. 20th to 22nd should be 3 days
-            accrual_factor = day_count.year_frac(t0, t1.add_days(1))[0]
+        # Adding a day because `year_frac` is non-inclusive
+        # eg. 20th to 22nd should be 3 days
+        end_dts = DateArray(self._accrual_end_dts).add_days(1)
+        accrual_factors = day_count.year_fracs(self._accrual_start_dts,
+                                               end_dts)[0]
+
+        for accrual_factor in accrual_factors.tolist():
             flow = accrual_factor * self._running_cpn * self._notional
 
             self._accrual_factors.append(accrual_factor)
@@ -410,10 +424,10 @@ class CDS:
 
         # we create a deep copy to avoid state issues
         bumpedIssuerCurve = deepcopy(issuer_curve)
-        for cds in bumpedIssuerCurve._cds_contracts:
-            cds._running_cpn += bump
+        quotes = {i: cds._running_cpn + bump
+                  for i, cds in enumerate(bumpedIssuerCurve._cds_contracts)}
 
-        bumpedIssuerCurve._build_curve()
+        bumpedIssuerCurve.update_quotes(quotes)
 
         v1 = self.value(value_dt,
                         bumpedIssuerCurve,
@@ -449,29 +463,13 @@ class CDS:
 
         bump = 0.0001  # 1 basis point
 
-        for depo in new_issuer_curve._libor_curve._usedDeposits:
-
-            depo._deposit_rate += bump
-
-        for fra in new_issuer_curve._libor_curve._usedFRAs:
-
-            fra._fraRate += bump
-
-        for swap in new_issuer_curve._libor_curve._usedSwaps:
-
-            cpn = swap._fixed_leg._cpn
-            swap._fixed_leg._cpn = cpn + bump
-
-            # Need to regenerate fixed leg payments with bumped cpn
-            # I could call swap._fixed_leg.generate_payments() but it is
-            # overkill as it has to do all the schedule generation which is
-            # not needed as the dates are unchanged
-            num_payments = len(swap._fixed_leg._payments)
-            for i in range(0, num_payments):
-                old_pmt = swap._fixed_leg._payments[i]
-                swap._fixed_leg._payments[i] = old_pmt * (cpn + bump) / cpn
+        # The rates of all of the curve instruments are bumped. The payment
+        # dates of the swaps are unchanged so only the solvers are re-run.
+        libor_curve = new_issuer_curve._libor_curve
+        quotes = {i: quote + bump
+                  for i, quote in enumerate(libor_curve._quotes)}
 
-        new_issuer_curve._libor_curve._build_curve()
+        libor_curve.update_quotes(quotes)
         new_issuer_curve._build_curve()
 
         v1 = self.value(value_dt,
@@ -585,10 +583,8 @@ class CDS:
 
         v = _protection_leg_pv_numba(teff,
                                      t_mat,
-                                     libor_curve._times,
-                                     libor_curve._dfs,
-                                     issuer_curve._times,
-                                     issuer_curve._values,
+                                     _ibor_jit_curve(libor_curve),
+                                     _surv_jit_curve(issuer_curve),
                                      contract_recovery_rate,
                                      num_steps_per_year,
                                      protMethod)
@@ -628,10 +624,8 @@ class CDS:
                                        accrual_factorPCDToNow,
                                        np.array(paymentTimes),
                                        np.array(year_fracs),
-                                       libor_curve._times,
-                                       libor_curve._dfs,
-                                       issuer_curve._times,
-                                       issuer_curve._values,
+                                       _ibor_jit_curve(libor_curve),
+                                       _surv_jit_curve(issuer_curve),
                                        pv01_method)
 
         full_rpv01 = valueRPV01[0]
@@ -5,7 +5,10 @@
 # TODO: There are several speed ups for the Monte-Carlo including calculating
 # all default baskets at the same time.
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+from numba import njit
 
 from ...utils.error import FinError
 from ...utils.day_count import DayCount, DayCountTypes
@@ -19,7 +22,7 @@ from ...utils.date import Date
 from ...utils.helpers import label_to_string
 
 from ...models.gauss_copula_onefactor import homog_basket_loss_dbn
-from ...models.gauss_copula import default_times_gc
+from ...models.gauss_copula import default_time_blocks_gc
 from ...models.student_t_copula import StudentTCopula
 
 from ...market.curves.interpolator import interpolate, InterpTypes
@@ -32,6 +35,78 @@ from ...products.credit.cds import CDS
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True, nogil=True)
+def _basket_legs_numba(first,
+                       last,
+                       n_to_default,
+                       default_times,
+                       rpv01_to_times,
+                       avg_acc_factor,
+                       t_mat,
+                       recovery_rates,
+                       rpv01s,
+                       taus,
+                       lgds,
+                       is_default):
+    """ Find the nth default time in trials first to last - 1 by keeping the
+    n smallest default times rather than sorting them all. The risky PV01 of
+    each trial is written into rpv01s. If the nth default is before maturity
+    then its time and loss given default are written into taus and lgds and
+    the trial is flagged in is_default. """
+
+    num_credits = default_times.shape[0]
+
+    smallest = np.zeros(n_to_default)
+
+    for i_trial in range(first, last):
+
+        num_held = 0
+
+        for i_credit in range(0, num_credits):
+
+            tau = default_times[i_credit, i_trial]
+
+            if num_held < n_to_default:
+                j = num_held
+                num_held += 1
+            elif tau < smallest[n_to_default - 1]:
+                j = n_to_default - 1
+            else:
+                continue
+
+            while j > 0 and smallest[j - 1] > tau:
+                smallest[j] = smallest[j - 1]
+                j -= 1
+
+            smallest[j] = tau
+
+        min_tau = smallest[n_to_default - 1]
+
+        if min_tau < t_mat:
+
+            num_pmnts_index = int(min_tau / avg_acc_factor)
+            rpv01s[i_trial] = rpv01_to_times[num_pmnts_index] + \
+                (min_tau - num_pmnts_index * avg_acc_factor)
+
+            # Determine identity of n-to-default credit if basket not homo
+            asset_index = 0
+            for i_credit in range(0, num_credits):
+                if min_tau == default_times[i_credit, i_trial]:
+                    asset_index = i_credit
+                    break
+
+            taus[i_trial] = min_tau
+            lgds[i_trial] = 1.0 - recovery_rates[asset_index]
+            is_default[i_trial] = True
+
+        else:
+
+            rpv01s[i_trial] = rpv01_to_times[-1]
+            is_default[i_trial] = False
+
+###############################################################################
+
+
 class CDSBasket:
 
     """ Class to deal with n-to-default CDS baskets. """
@@ -79,12 +154,19 @@ class CDSBasket:
                       n_to_default,
                       default_times,
                       issuer_curves,
-                      libor_curve):
+                      libor_curve,
+                      num_threads=1):
         """ Value the legs of the default basket using Monte Carlo. The default
-        times are an input so this valuation is not model dependent. """
+        times are an input so this valuation is not model dependent. They can
+        be a matrix by credit and trial or an iterable of such matrices which
+        hold blocks of trials. The trials of each block are split across
+        num_threads and the result does not depend on num_threads. """
+
+        if num_threads < 1:
+            raise FinError("Number of threads must be at least one.")
 
-        num_credits = default_times.shape[0]
-        num_trials = default_times.shape[1]
+        if isinstance(default_times, np.ndarray):
+            default_times = [default_times]
 
         payment_dts = self._cds_contract._payment_dts
         num_payments = len(payment_dts)
@@ -108,47 +190,43 @@ class CDSBasket:
 
         t_mat = (self._maturity_dt - value_dt) / gDaysInYear
 
+        recovery_rates = np.array([issuer_curve._recovery_rate
+                                   for issuer_curve in issuer_curves],
+                                  dtype=np.float64)
+
         rpv01 = 0.0
         prot = 0.0
+        num_trials = 0
 
-        assetTau = np.zeros(num_credits)
-
-        for i_trial in range(0, num_trials):
-
-            for i_credit in range(0, num_credits):
-
-                assetTau[i_credit] = default_times[i_credit, i_trial]
-
-            # ORDER THE DEFAULT TIMES
-            assetTau.sort()
-
-            # GET THE Nth DEFAULT TIME
-            minTau = assetTau[n_to_default - 1]
-
-            if minTau < t_mat:
-
-                num_pmnts_index = int(minTau / avg_acc_factor)
-                rpv01_trial = rpv01ToTimes[num_pmnts_index]
-                rpv01_trial += (minTau - num_pmnts_index * avg_acc_factor)
+        for block in default_times:
 
-                # DETERMINE IDENTITY OF N-TO-DEFAULT CREDIT IF BASKET NOT HOMO
-                assetIndex = 0
-                for i_credit in range(0, num_credits):
-                    if minTau == default_times[i_credit, i_trial]:
-                        assetIndex = i_credit
-                        break
+            n = block.shape[1]
+            rpv01s = np.zeros(n)
+            taus = np.zeros(n)
+            lgds = np.zeros(n)
+            is_default = np.zeros(n, dtype=np.bool_)
 
-                prot_trial = (1.0 - issuer_curves[assetIndex]._recovery_rate)
-                prot_trial *= libor_curve._df(minTau)
+            args = (n_to_default, block, rpv01ToTimes, avg_acc_factor, t_mat,
+                    recovery_rates, rpv01s, taus, lgds, is_default)
 
+            if num_threads == 1:
+                _basket_legs_numba(0, n, *args)
             else:
-
-                num_pmnts_index = int(t_mat / avg_acc_factor)
-                rpv01_trial = rpv01ToTimes[-1]
-                prot_trial = 0.0
-
-            rpv01 += rpv01_trial
-            prot += prot_trial
+                bounds = np.linspace(0, n, num_threads + 1).astype(int)
+                with ThreadPoolExecutor(max_workers=num_threads) as executor:
+                    jobs = [executor.submit(_basket_legs_numba, bounds[k],
+                                            bounds[k + 1], *args)
+                            for k in range(0, num_threads)]
+                    for job in jobs:
+                        job.result()
+
+            # The discount factors at the default times in one call
+            if np.any(is_default):
+                prot += np.sum(lgds[is_default] *
+                               libor_curve._df(taus[is_default]))
+
+            rpv01 += np.sum(rpv01s)
+            num_trials += n
 
         rpv01 = rpv01 / num_trials
         prot = prot / num_trials
@@ -163,25 +241,38 @@ class CDSBasket:
                           correlation_matrix,
                           libor_curve,
                           num_trials,
-                          seed):
+                          seed,
+                          block_size=None,
+                          num_threads=1):
         """ Value the default basket using a Gaussian copula model. This
-        depends on the issuer discount and correlation matrix. """
+        depends on the issuer discount and correlation matrix. By default
+        all of the trials are drawn in one block as in default_times_gc. If
+        a block_size is given then the default times are generated and valued
+        in blocks of at most block_size trials so that the memory used does
+        not grow with the number of trials, but the value then depends on the
+        block size. The work is split across num_threads. """
 
         num_credits = len(issuer_curves)
 
         if n_to_default > num_credits or n_to_default < 1:
             raise FinError("n_to_default must be 1 to num_credits")
 
-        default_times = default_times_gc(issuer_curves,
-                                         correlation_matrix,
-                                         num_trials,
-                                         seed)
+        if block_size is None:
+            block_size = max(num_trials, 1)
+
+        default_times = default_time_blocks_gc(issuer_curves,
+                                               num_trials,
+                                               seed,
+                                               correlation_matrix,
+                                               block_size=block_size,
+                                               num_threads=num_threads)
 
         rpv01, prot_pv = self.value_legs_mc(value_dt,
                                             n_to_default,
                                             default_times,
                                             issuer_curves,
-                                            libor_curve)
+                                            libor_curve,
+                                            num_threads)
 
         spd = prot_pv / rpv01
         value = self._notional * (prot_pv - self._running_cpn * rpv01)
@@ -201,27 +292,38 @@ class CDSBasket:
                            degrees_of_freedom,
                            libor_curve,
                            num_trials,
-                           seed):
-        """ Value the default basket using the Student-T copula. """
+                           seed,
+                           block_size=None,
+                           num_threads=1):
+        """ Value the default basket using the Student-T copula. By default
+        all of the trials are drawn in one block. If a block_size is given
+        then the default times are generated and valued in blocks of at most
+        block_size trials. The work is split across num_threads. """
 
         num_credits = len(issuer_curves)
 
         if n_to_default > num_credits or n_to_default < 1:
             raise FinError("n_to_default must be 1 to num_credits")
 
+        if block_size is None:
+            block_size = max(num_trials, 1)
+
         model = StudentTCopula()
 
-        default_times = model.default_times(issuer_curves,
-                                            correlation_matrix,
-                                            degrees_of_freedom,
-                                            num_trials,
-                                            seed)
+        default_times = model.default_time_blocks(issuer_curves,
+                                                  degrees_of_freedom,
+                                                  num_trials,
+                                                  seed,
+                                                  correlation_matrix,
+                                                  block_size=block_size,
+                                                  num_threads=num_threads)
 
         rpv01, prot_pv = self.value_legs_mc(value_dt,
                                             n_to_default,
                                             default_times,
                                             issuer_curves,
-                                            libor_curve)
+                                            libor_curve,
+                                            num_threads)
 
         spd = prot_pv / rpv01
         value = self._notional * (prot_pv - self._running_cpn * rpv01)
@@ -2,18 +2,30 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import numpy as np
 import scipy.optimize as optimize
+from numba import njit
 
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.error import FinError
 from ...utils.global_vars import gDaysInYear
 from ...market.curves.interpolator import _uinterpolate, InterpTypes
+from ...market.curves.interpolator import g_spline_types
+from ...market.curves.jit_curve import flat_fwd_curve
 from ...utils.helpers import input_time, table_to_string
+from ...utils.helpers import times_from_dates
 from ...utils.day_count import DayCount
 from ...utils.frequency import annual_frequency, FrequencyTypes
 from ...utils.helpers import check_argument_types, _func_name
 from ...utils.helpers import label_to_string
+from .cds import CDS
+from .cds import _risky_pv01_numba, _protection_leg_pv_numba
+from .cds import _ibor_jit_curve
+from .cds import glob_num_steps_per_year
 
 
 ###############################################################################
@@ -38,6 +50,169 @@ def f(q, *args):
 ###############################################################################
 
 
+def _pillar_inputs(value_dt, cds_contracts):
+    """ The times, accrual factors and payment times of each contract that
+    do not depend on the survival curve. These are flattened into arrays
+    with pointers to the start of each contract. """
+
+    num_times = len(cds_contracts)
+
+    teffs = np.zeros(num_times)
+    t_mats = np.zeros(num_times)
+    accrual_factors_pcd_to_now = np.zeros(num_times)
+    payment_ptr = np.zeros(num_times + 1, dtype=np.int64)
+    year_frac_ptr = np.zeros(num_times + 1, dtype=np.int64)
+    payment_times = []
+    year_fracs = []
+
+    for i, cds in enumerate(cds_contracts):
+
+        teffs[i] = (cds._step_in_dt - value_dt) / gDaysInYear
+        t_mats[i] = (cds._maturity_dt - value_dt) / gDaysInYear
+
+        day_count = DayCount(cds._dc_type)
+        accrual_factors_pcd_to_now[i] = \
+            day_count.year_frac(cds._accrual_start_dts[0],
+                                cds._step_in_dt)[0]
+
+        for dt in cds._payment_dts:
+            t = (dt - value_dt) / gDaysInYear
+            if t > 0.0:
+                payment_times.append(t)
+
+        year_fracs += cds._accrual_factors
+        payment_ptr[i + 1] = len(payment_times)
+        year_frac_ptr[i + 1] = len(year_fracs)
+
+    return (teffs, t_mats, accrual_factors_pcd_to_now, payment_ptr,
+            np.array(payment_times), year_frac_ptr, np.array(year_fracs))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _clean_pv_numba(q, surv_curve, teff, t_mat, accrual_factor_pcd_to_now,
+                    payment_times, year_fracs, cpn, ibor_curve, recovery_rate,
+                    num_steps_per_year):
+    """ Clean value per unit notional of a long protection CDS when the
+    survival probability at the last point of the curve is set to q. """
+
+    surv_curve.values[-1] = q
+
+    rpv01 = _risky_pv01_numba(teff, accrual_factor_pcd_to_now, payment_times,
+                              year_fracs, ibor_curve, surv_curve, 0)
+
+    prot_pv = _protection_leg_pv_numba(teff, t_mat, ibor_curve, surv_curve,
+                                       recovery_rate, num_steps_per_year, 0)
+
+    return prot_pv - cpn * rpv01[1]
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _solve_pillars_numba(first_pillar, times, values,
+                         teffs, t_mats, accrual_factors_pcd_to_now,
+                         payment_ptr, payment_times, year_frac_ptr,
+                         year_fracs, cpns, ibor_curve, recovery_rate,
+                         num_steps_per_year, tol, max_iter):
+    """ Solve for the survival probability at each pillar in turn so that the
+    clean value of its CDS is zero. The pillar times and the values before
+    first_pillar are already set. Each pillar is found with the same secant
+    search as scipy's newton and the curve ends at the pillar being solved.
+    The index of a pillar that fails to converge is returned or else -1. """
+
+    num_pillars = len(t_mats)
+
+    for j in range(first_pillar, num_pillars):
+
+        n = j + 2
+        surv_curve = flat_fwd_curve(times[0:n], values[0:n])
+
+        teff = teffs[j]
+        t_mat = t_mats[j]
+        accrual = accrual_factors_pcd_to_now[j]
+        pay_times = payment_times[payment_ptr[j]:payment_ptr[j + 1]]
+        alphas = year_fracs[year_frac_ptr[j]:year_frac_ptr[j + 1]]
+        cpn = cpns[j]
+
+        p0 = values[j]
+
+        eps = 1e-4
+        p1 = p0 * (1.0 + eps)
+        p1 += eps if p1 >= 0.0 else -eps
+
+        q0 = _clean_pv_numba(p0, surv_curve, teff, t_mat, accrual,
+                             pay_times, alphas, cpn, ibor_curve,
+                             recovery_rate, num_steps_per_year)
+
+        q1 = _clean_pv_numba(p1, surv_curve, teff, t_mat, accrual,
+                             pay_times, alphas, cpn, ibor_curve,
+                             recovery_rate, num_steps_per_year)
+
+        if abs(q1) < abs(q0):
+            p0, p1, q0, q1 = p1, p0, q1, q0
+
+        converged = False
+
+        for _ in range(0, max_iter):
+
+            if q1 == q0:
+                if p1 != p0:
+                    return j
+                p = (p1 + p0) / 2.0
+                converged = True
+                break
+
+            if abs(q1) > abs(q0):
+                p = (-q0 / q1 * p1 + p0) / (1.0 - q0 / q1)
+            else:
+                p = (-q1 / q0 * p0 + p1) / (1.0 - q1 / q0)
+
+            if abs(p - p1) <= tol:
+                converged = True
+                break
+
+            p0, q0 = p1, q1
+            p1 = p
+            q1 = _clean_pv_numba(p1, surv_curve, teff, t_mat, accrual,
+                                 pay_times, alphas, cpn, ibor_curve,
+                                 recovery_rate, num_steps_per_year)
+
+        if not converged:
+            return j
+
+        values[j + 1] = p
+
+    return -1
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _solve_curves_numba(first, last, times, values, teffs, t_mats,
+                        accrual_factors_pcd_to_now, payment_ptr,
+                        payment_times, year_frac_ptr, year_fracs, cpns,
+                        ibor_curve, recovery_rates, num_steps_per_year, tol,
+                        max_iter, failed_pillars):
+    """ Bootstrap the survival curves of names first to last - 1 that share
+    the same contract schedules. Each row of the values matrix is the curve
+    of one name and each row of cpns holds its contract spreads. The pillar
+    that failed for each name is written into failed_pillars or else -1. """
+
+    for i in range(first, last):
+
+        failed_pillars[i] = \
+            _solve_pillars_numba(0, times, values[i], teffs, t_mats,
+                                 accrual_factors_pcd_to_now,
+                                 payment_ptr, payment_times, year_frac_ptr,
+                                 year_fracs, cpns[i], ibor_curve,
+                                 recovery_rates[i],
+                                 num_steps_per_year, tol, max_iter)
+
+###############################################################################
+
+
 class CDSCurve:
     """ Generate a survival probability curve implied by the value of CDS
     contracts given a Ibor curve and an assumed recovery rate. The recovery
@@ -50,10 +225,14 @@ class CDSCurve:
                  libor_curve,
                  recovery_rate,
                  use_cache: bool = False,
-                 interp_method: InterpTypes = InterpTypes.FLAT_FWD_RATES):
+                 interp_method: InterpTypes = InterpTypes.FLAT_FWD_RATES,
+                 fast_bootstrap: bool = False):
         """ Construct a credit curve from a sequence of maturity-ordered CDS
         contracts and a Ibor curve using the same recovery rate and the
-        same interpolation method. """
+        same interpolation method. If fast_bootstrap is True then the flows
+        of the contracts are worked out once and all of the pillars are
+        solved inside one compiled function rather than by valuing each CDS
+        in Python at each step of the root search. """
 
         check_argument_types(getattr(self, _func_name(), None), locals())
 
@@ -66,6 +245,8 @@ class CDSCurve:
         self._recovery_rate = recovery_rate
         self._libor_curve = libor_curve
         self._interp_method = interp_method
+        self._fast_bootstrap = fast_bootstrap
+        self._pillar_inputs = None
         self._built_ok = False
 
         self._times = []
@@ -132,10 +313,14 @@ class CDSCurve:
 
     def df(self, dt):
         """ Extract the discount factor from the underlying Ibor curve. This
-        function supports vectorisation. """
-
-        if isinstance(dt, Date):
-            t = (dt - self._value_dt) / gDaysInYear
+        function supports vectorisation over a list of dates or times or a
+        DateArray. """
+
+        if isinstance(dt, Date) or isinstance(dt, DateArray):
+            t = times_from_dates(dt, self._value_dt)
+        elif isinstance(dt, list) and len(dt) > 0 and \
+                isinstance(dt[0], Date):
+            t = times_from_dates(dt, self._value_dt)
         elif isinstance(dt, list):
             t = np.array(dt)
         else:
@@ -145,17 +330,31 @@ class CDSCurve:
 
 ###############################################################################
 
-    def _build_curve(self):
-        """ Construct the CDS survival curve from a set of CDS contracts """
+    def _build_curve(self, first_pillar=0):
+        """ Construct the CDS survival curve from a set of CDS contracts. The
+        pillars are solved in order and so the survival probabilities before
+        the first pillar are kept. Each pillar starts its root search from
+        the pillar before it so that the result does not depend on any
+        earlier solution of the curve. """
 
         self._validate(self._cds_contracts)
         num_times = len(self._cds_contracts)
 
-        # we size the vectors to include time zero
-        self._times = np.array([0.0])
-        self._values = np.array([1.0])
+        if first_pillar > 0:
+            self._times = self._times[0:first_pillar + 1].copy()
+            self._values = self._values[0:first_pillar + 1].copy()
+        else:
+            # we size the vectors to include time zero
+            self._times = np.array([0.0])
+            self._values = np.array([1.0])
 
-        for i in range(0, num_times):
+        if self._fast_bootstrap:
+            self._solve_pillars(first_pillar)
+            self._quotes = np.array([cds._running_cpn
+                                     for cds in self._cds_contracts])
+            return
+
+        for i in range(first_pillar, num_times):
 
             maturity_dt = self._cds_contracts[i]._maturity_dt
 
@@ -165,6 +364,7 @@ class CDSCurve:
                         self._recovery_rate)
 
             t_mat = (maturity_dt - self._value_dt) / gDaysInYear
+
             q = self._values[i]
 
             self._times = np.append(self._times, t_mat)
@@ -173,6 +373,82 @@ class CDSCurve:
             optimize.newton(f, x0=q, fprime=None, args=argtuple,
                             tol=1e-7, maxiter=50, fprime2=None)
 
+        self._quotes = np.array([cds._running_cpn
+                                 for cds in self._cds_contracts])
+
+###############################################################################
+
+    def _bootstrap_inputs(self):
+        """ The inputs of the compiled bootstrap that do not depend on the
+        survival curve. They are kept as they only change if the contracts
+        change. """
+
+        if self._pillar_inputs is None:
+            self._pillar_inputs = _pillar_inputs(self._value_dt,
+                                                 self._cds_contracts)
+
+        return self._pillar_inputs
+
+###############################################################################
+
+    def _solve_pillars(self, first_pillar):
+        """ Solve the pillars from first_pillar onwards in one compiled call
+        using the same root search and tolerance as the standard bootstrap.
+        """
+
+        (teffs, t_mats, accrual_factors_pcd_to_now, payment_ptr,
+         payment_times, year_frac_ptr, year_fracs) = self._bootstrap_inputs()
+
+        num_times = len(self._cds_contracts)
+
+        times = np.zeros(num_times + 1)
+        values = np.ones(num_times + 1)
+        times[0:first_pillar + 1] = self._times
+        values[0:first_pillar + 1] = self._values
+        times[1:] = t_mats
+
+        cpns = np.array([cds._running_cpn for cds in self._cds_contracts])
+
+        ibor_curve = _ibor_jit_curve(self._libor_curve)
+
+        failed_pillar = _solve_pillars_numba(first_pillar, times, values,
+                                             teffs, t_mats,
+                                             accrual_factors_pcd_to_now,
+                                             payment_ptr, payment_times,
+                                             year_frac_ptr, year_fracs, cpns,
+                                             ibor_curve, self._recovery_rate,
+                                             glob_num_steps_per_year,
+                                             1e-7, 50)
+
+        if failed_pillar >= 0:
+            raise FinError("CDS curve bootstrap failed to converge at pillar "
+                           + str(failed_pillar))
+
+        self._times = times
+        self._values = values
+
+###############################################################################
+
+    def update_quotes(self,
+                      quotes: dict):
+        """ Change the running coupons of some of the CDS contracts and
+        re-solve the curve. The dictionary maps the position of each contract
+        to its new coupon. Only the pillars from the first changed contract
+        onwards are re-solved and the result is the same as a rebuild from
+        scratch. """
+
+        if len(quotes) == 0:
+            return
+
+        for index, quote in quotes.items():
+            if index < 0 or index >= len(self._cds_contracts):
+                raise FinError("Quote index out of range.")
+
+            self._cds_contracts[index]._running_cpn = quote
+            self._cds_contracts[index]._calc_flows()
+
+        self._build_curve(min(quotes.keys()))
+
 ###############################################################################
 
     def fwd(self, dt):
@@ -245,3 +521,118 @@ class CDSCurve:
         print(self)
 
 ##########################################################################
+
+
+def build_cds_curves(value_dt: Date,
+                     spread_matrix: (list, np.ndarray),
+                     recovery_rates: (float, list, np.ndarray),
+                     libor_curve,
+                     tenors: Optional[list] = None,
+                     interp_method: InterpTypes = InterpTypes.FLAT_FWD_RATES,
+                     num_threads: int = 1):
+    """ Build the survival curves of many issuers that share the same Ibor
+    curve, value date and standard CDS maturities. Row i of the spread
+    matrix holds the CDS spreads of issuer i at each tenor and the recovery
+    rate can be one value or one per issuer. The schedules and discount
+    factors are worked out once and all of the curves are solved in one
+    compiled call with the issuers split across num_threads. The pillars do
+    not depend on interp_method, as in CDSCurve, but the curves use it to
+    interpolate between them. A list of CDSCurve objects is returned. """
+
+    check_argument_types(build_cds_curves, locals())
+
+    if tenors is None:
+        tenors = ["1Y", "2Y", "3Y", "5Y", "7Y", "10Y"]
+
+    spread_matrix = np.array(spread_matrix, dtype=np.float64)
+
+    if spread_matrix.ndim != 2:
+        raise FinError("Spread matrix must have one row per issuer.")
+
+    num_names, num_tenors = spread_matrix.shape
+
+    if num_tenors != len(tenors):
+        raise FinError("Spread matrix must have one column per tenor.")
+
+    if value_dt != libor_curve._value_dt:
+        raise FinError(
+            "Curve does not have same valuation date as Issuer curve.")
+
+    recovery_rates = np.array(recovery_rates, dtype=np.float64)
+
+    if recovery_rates.ndim == 0:
+        recovery_rates = np.full(num_names, float(recovery_rates))
+
+    if len(recovery_rates) != num_names:
+        raise FinError("There must be one recovery rate per issuer.")
+
+    if interp_method.value in g_spline_types:
+        raise FinError("Survival curves cannot use spline interpolation.")
+
+    if num_threads < 1:
+        raise FinError("Number of threads must be at least one.")
+
+    templates = [CDS(value_dt, tenor, 0.0) for tenor in tenors]
+
+    for i in range(1, num_tenors):
+        if templates[i]._maturity_dt <= templates[i - 1]._maturity_dt:
+            raise FinError("CDS contracts not in increasing maturity.")
+
+    pillar_inputs = _pillar_inputs(value_dt, templates)
+
+    times = np.zeros(num_tenors + 1)
+    times[1:] = pillar_inputs[1]
+    values = np.ones((num_names, num_tenors + 1))
+
+    failed_pillars = np.zeros(num_names, dtype=np.int64)
+
+    args = (times, values, *pillar_inputs, spread_matrix,
+            _ibor_jit_curve(libor_curve), recovery_rates,
+            glob_num_steps_per_year, 1e-7, 50, failed_pillars)
+
+    if num_threads == 1:
+        _solve_curves_numba(0, num_names, *args)
+    else:
+        bounds = np.linspace(0, num_names, num_threads + 1).astype(int)
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            jobs = [executor.submit(_solve_curves_numba, bounds[k],
+                                    bounds[k + 1], *args)
+                    for k in range(0, num_threads)]
+            for job in jobs:
+                job.result()
+
+    failed_names = np.where(failed_pillars >= 0)[0]
+
+    if len(failed_names) > 0:
+        raise FinError("CDS curve bootstrap failed to converge for issuers "
+                       + str(failed_names.tolist()))
+
+    curves = []
+
+    for i in range(0, num_names):
+
+        # Each contract shares the schedule of its template but has its own
+        # date lists and premium flows at the spread of the issuer
+        cds_contracts = []
+        for template, spread in zip(templates, spread_matrix[i]):
+            cds = copy.copy(template)
+            cds._payment_dts = list(template._payment_dts)
+            cds._accrual_start_dts = list(template._accrual_start_dts)
+            cds._accrual_end_dts = list(template._accrual_end_dts)
+            cds._running_cpn = spread
+            cds._calc_flows()
+            cds_contracts.append(cds)
+
+        curve = CDSCurve(value_dt, [], libor_curve, recovery_rates[i],
+                         interp_method=interp_method, fast_bootstrap=True)
+
+        curve._cds_contracts = cds_contracts
+        curve._pillar_inputs = pillar_inputs
+        curve._times = times.copy()
+        curve._values = values[i].copy()
+        curve._quotes = spread_matrix[i].copy()
+        curves.append(curve)
+
+    return curves
+
+###############################################################################
@@ -0,0 +1,185 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+
+from ...utils.date import Date
+from ...utils.error import FinError
+from ...market.curves.jit_curve import flat_fwd_curve
+from ...products.rates.curve_risk import quote_jacobian
+from .cds import _risky_pv01_numba, _protection_leg_pv_numba
+from .cds import glob_num_steps_per_year, standard_recovery_rate
+from .cds_curve import _pillar_inputs
+
+###############################################################################
+# The CDS risk of a book of trades on one issuer curve is calculated without
+# copying or rebuilding any curve. At the solution each curve contract has
+# zero clean value and so by the implicit function theorem the derivatives
+# of the survival probabilities with respect to the CDS spreads and to the
+# Ibor discount factors follow from the Jacobian of these repricing errors.
+# The gradients of the trade values with respect to the survival and
+# discount factor pillars are found by bumping the pillar arrays and valuing
+# all of the trades and curve contracts in one compiled call for each bump.
+# A single linear solve then maps them onto the CDS spreads and the Ibor
+# curve quotes.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _cds_values_numba(teffs, t_mats, accrual_factors_pcd_to_now,
+                      payment_ptr, payment_times, year_frac_ptr, year_fracs,
+                      cpns, recovery_rates, ibor_curve, surv_curve,
+                      num_steps_per_year):
+    """ Value a set of long protection CDS per unit notional. Each row of
+    the output holds the dirty value, the clean value and the clean risky
+    PV01 of one contract. The curves are JitCurve records. """
+
+    num_contracts = len(teffs)
+    values = np.zeros((num_contracts, 3))
+
+    for i in range(0, num_contracts):
+
+        pay_times = payment_times[payment_ptr[i]:payment_ptr[i + 1]]
+        alphas = year_fracs[year_frac_ptr[i]:year_frac_ptr[i + 1]]
+
+        rpv01 = _risky_pv01_numba(teffs[i], accrual_factors_pcd_to_now[i],
+                                  pay_times, alphas, ibor_curve, surv_curve,
+                                  0)
+
+        prot_pv = _protection_leg_pv_numba(teffs[i], t_mats[i], ibor_curve,
+                                           surv_curve, recovery_rates[i],
+                                           num_steps_per_year, 0)
+
+        values[i, 0] = prot_pv - cpns[i] * rpv01[0]
+        values[i, 1] = prot_pv - cpns[i] * rpv01[1]
+        values[i, 2] = rpv01[1]
+
+    return values
+
+###############################################################################
+
+
+def cds_risk(cds_trades: list,
+             value_dt: Date,
+             issuer_curve,
+             contract_recovery_rates=standard_recovery_rate,
+             bump: float = 1e-6):
+    """ Return the dirty values and the credit and interest rate risk of a
+    list of CDS trades on the same issuer curve. The credit DV01 is the
+    change in value for a one basis point rise in all of the CDS spreads of
+    the curve and the bucketed CS01 gives the change for each spread in
+    turn. The interest DV01 and its buckets do the same for the quotes of
+    the Ibor curve. The gradient of each value with respect to the Ibor
+    discount factor pillars after time zero is always returned as
+    ibor_df_grad. If the Ibor curve was not calibrated to market quotes,
+    for example a flat curve, then there are no quotes to map it onto and
+    the interest DV01 and its buckets are not returned. The recovery rate
+    can be one value or one per trade. The pillar gradients are found with
+    central differences of size bump. """
+
+    if bump <= 0.0:
+        raise FinError("Bump must be positive.")
+
+    if value_dt != issuer_curve._value_dt:
+        raise FinError(
+            "Curve does not have same valuation date as Issuer curve.")
+
+    num_trades = len(cds_trades)
+    curve_contracts = issuer_curve._cds_contracts
+    num_pillars = len(curve_contracts)
+
+    if num_trades == 0:
+        raise FinError("No CDS trades.")
+
+    if len(issuer_curve._values) != num_pillars + 1:
+        raise FinError("Issuer curve has not been built.")
+
+    contract_recovery_rates = np.array(contract_recovery_rates,
+                                       dtype=np.float64)
+
+    if contract_recovery_rates.ndim == 0:
+        contract_recovery_rates = np.full(num_trades,
+                                          float(contract_recovery_rates))
+
+    if len(contract_recovery_rates) != num_trades:
+        raise FinError("There must be one recovery rate per trade.")
+
+    # The trades and the curve contracts are valued together
+    inputs = _pillar_inputs(value_dt, cds_trades + curve_contracts)
+
+    cpns = np.array([cds._running_cpn for cds in cds_trades]
+                    + [cds._running_cpn for cds in curve_contracts])
+
+    recovery_rates = np.zeros(num_trades + num_pillars)
+    recovery_rates[0:num_trades] = contract_recovery_rates
+    recovery_rates[num_trades:] = issuer_curve._recovery_rate
+
+    scales = np.array([cds._notional * (1.0 if cds._long_protection
+                                        else -1.0) for cds in cds_trades])
+
+    libor_curve = issuer_curve._libor_curve
+    ibor_times = np.array(libor_curve._times, dtype=np.float64)
+    ibor_values = np.array(libor_curve._dfs, dtype=np.float64)
+    surv_times = np.array(issuer_curve._times, dtype=np.float64)
+    surv_values = np.array(issuer_curve._values, dtype=np.float64)
+
+    # The records share the pillar arrays which are bumped below
+    ibor_curve = flat_fwd_curve(ibor_times, ibor_values)
+    surv_curve = flat_fwd_curve(surv_times, surv_values)
+
+    def values_fn():
+        return _cds_values_numba(*inputs, cpns, recovery_rates, ibor_curve,
+                                 surv_curve, glob_num_steps_per_year)
+
+    v0 = values_fn()
+
+    # The dirty value of each trade and the clean value of each curve
+    # contract which is the repricing error of the bootstrap
+    def outputs(values):
+        return np.concatenate((values[0:num_trades, 0] * scales,
+                               values[num_trades:, 1]))
+
+    def pillar_gradient(pillar_values):
+        grad = np.zeros((num_trades + num_pillars, len(pillar_values) - 1))
+
+        for k in range(1, len(pillar_values)):
+            p = pillar_values[k]
+            pillar_values[k] = p + bump
+            v_up = outputs(values_fn())
+            pillar_values[k] = p - bump
+            v_down = outputs(values_fn())
+            pillar_values[k] = p
+            grad[:, k - 1] = (v_up - v_down) / (2.0 * bump)
+
+        return grad
+
+    surv_grad = pillar_gradient(surv_values)
+    df_grad = pillar_gradient(ibor_values)
+
+    dv_dq = surv_grad[0:num_trades]
+    dg_dq = surv_grad[num_trades:]
+
+    # One adjoint vector per trade. A spread rise of ds on contract k moves
+    # its repricing error by -clean_rpv01 * ds.
+    adjoints = np.linalg.solve(dg_dq.T, dv_dq.T)
+    clean_rpv01s = v0[num_trades:, 2]
+    bucketed_cs01 = (adjoints * clean_rpv01s[:, None]).T * 0.0001
+
+    total_df_grad = df_grad[0:num_trades] - adjoints.T @ df_grad[num_trades:]
+
+    risk = {'dirty_pv': v0[0:num_trades, 0] * scales,
+            'credit_dv01': np.sum(bucketed_cs01, axis=1),
+            'bucketed_cs01': bucketed_cs01,
+            'ibor_df_grad': total_df_grad}
+
+    # Only a curve built from deposits, FRAs and swaps has quotes
+    if hasattr(libor_curve, "_quotes"):
+        bucketed_ir01 = total_df_grad @ quote_jacobian(libor_curve) * 0.0001
+        risk['interest_dv01'] = np.sum(bucketed_ir01, axis=1)
+        risk['bucketed_interest_dv01'] = bucketed_ir01
+
+    return risk
+
+###############################################################################
@@ -11,6 +11,8 @@ from ...utils.global_vars import gDaysInYear
 from ...utils.error import FinError
 # from ...products.equity.EquityOption import FinOption
 from ...utils.date import Date
+from ...utils.calendar import (Calendar, CalendarTypes,
+                               JointCalendarType)
 # from ...products.fx.FinFXModelTypes import FinFXModel
 from ...models.black_scholes import BlackScholes
 from ...utils.helpers import check_argument_types
@@ -28,7 +30,9 @@ class FXDigitalOption:
                  option_type: (OptionTypes, list),
                  notional: float,
                  prem_currency: str,
-                 spot_days: int = 0):
+                 spot_days: int = 0,
+                 cal_type: (CalendarTypes,
+                            JointCalendarType) = CalendarTypes.WEEKEND):
         """ Create the FX Digital Option object. Inputs include expiry date,
         strike, currency pair, option type (call or put), notional and the
         currency of the notional. And adjustment for spot days is enabled. All
@@ -39,7 +43,8 @@ class FXDigitalOption:
 
         check_argument_types(self.__init__, locals())
 
-        delivery_dt = expiry_dt.add_weekdays(spot_days)
+        calendar = Calendar(cal_type)
+        delivery_dt = calendar.add_business_days(expiry_dt, spot_days)
 
         if delivery_dt < expiry_dt:
             raise FinError("Delivery date must be on or after expiry date.")
@@ -72,6 +77,7 @@ class FXDigitalOption:
 
         self._option_type = option_type
         self._spot_days = spot_days
+        self._cal_type = cal_type
 
 ###############################################################################
 
@@ -102,7 +108,9 @@ class FXDigitalOption:
                 "Foreign Curve valuation date not same as valuation date")
 
         if isinstance(value_dt, Date):
-            spot_dt = value_dt.add_weekdays(self._spot_days)
+            calendar = Calendar(self._cal_type)
+            spot_dt = calendar.add_business_days(value_dt,
+                                                 self._spot_days)
             tdel = (self._delivery_dt - spot_dt) / gDaysInYear
             t_exp = (self._expiry_dt - value_dt) / gDaysInYear
         else:
@@ -11,6 +11,8 @@ from ...utils.global_vars import gDaysInYear
 from ...utils.error import FinError
 # from ...products.equity.EquityOption import FinOption
 from ...utils.date import Date
+from ...utils.calendar import (Calendar, CalendarTypes,
+                               JointCalendarType)
 # from ...products.fx.FinFXModelTypes import FinFXModel
 from ...models.black_scholes import BlackScholes
 from ...utils.helpers import check_argument_types
@@ -26,7 +28,9 @@ class FXDoubleDigitalOption:
                  currency_pair: str,  # FORDOM
                  notional: float,
                  prem_currency: str,
-                 spot_days: int = 0):
+                 spot_days: int = 0,
+                 cal_type: (CalendarTypes,
+                            JointCalendarType) = CalendarTypes.WEEKEND):
         """ Create the FX Double Digital Option object. Inputs include
         expiry date, upper strike, lower strike, currency pair,
         option type notional and the currency of the notional.
@@ -38,7 +42,8 @@ class FXDoubleDigitalOption:
 
         check_argument_types(self.__init__, locals())
 
-        delivery_dt = expiry_dt.add_weekdays(spot_days)
+        calendar = Calendar(cal_type)
+        delivery_dt = calendar.add_business_days(expiry_dt, spot_days)
 
         if delivery_dt < expiry_dt:
             raise FinError("Delivery date must be on or after expiry date.")
@@ -70,6 +75,7 @@ class FXDoubleDigitalOption:
         self._notional = notional
 
         self._spot_days = spot_days
+        self._cal_type = cal_type
 
 ###############################################################################
 
@@ -101,7 +107,9 @@ class FXDoubleDigitalOption:
                 "Foreign Curve valuation date not same as valuation date")
 
         if isinstance(value_dt, Date):
-            spot_dt = value_dt.add_weekdays(self._spot_days)
+            calendar = Calendar(self._cal_type)
+            spot_dt = calendar.add_business_days(value_dt,
+                                                 self._spot_days)
             tdel = (self._delivery_dt - spot_dt) / gDaysInYear
             t_exp = (self._expiry_dt - value_dt) / gDaysInYear
         else:
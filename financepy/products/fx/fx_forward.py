@@ -6,6 +6,8 @@ import numpy as np
 
 
 from ...utils.date import Date
+from ...utils.calendar import (Calendar, CalendarTypes,
+                               JointCalendarType)
 from ...utils.global_vars import gDaysInYear
 from ...utils.error import FinError
 from ...utils.helpers import label_to_string, check_argument_types
@@ -26,14 +28,17 @@ class FXForward:
                  currency_pair: str,  # FOR DOM
                  notional: float,
                  notional_currency: str,  # must be FOR or DOM
-                 spot_days: int = 0):
+                 spot_days: int = 0,
+                 cal_type: (CalendarTypes,
+                            JointCalendarType) = CalendarTypes.WEEKEND):
         """ Creates a FinFXForward which allows the owner to buy the FOR
         against the DOM currency at the strike_fx_rate and to pay it in the
         notional currency. """
 
         check_argument_types(self.__init__, locals())
 
-        delivery_dt = expiry_dt.add_weekdays(spot_days)
+        calendar = Calendar(cal_type)
+        delivery_dt = calendar.add_business_days(expiry_dt, spot_days)
 
         """ The FX rate is the price in domestic currency ccy2 of a single unit
         of the foreign currency which is ccy1. For example EURUSD of 1.3 is the
@@ -59,6 +64,7 @@ class FXForward:
         self._notional = notional
         self._notional_currency = notional_currency
         self._spot_days = spot_days
+        self._cal_type = cal_type
 
 ###############################################################################
 
@@ -169,7 +175,8 @@ class FXForward:
         s += label_to_string("CURRENCY PAIR", self._currency_pair)
         s += label_to_string("NOTIONAL", self._notional)
         s += label_to_string("NOTIONAL CCY", self._notional_currency)
-        s += label_to_string("SPOT DAYS", self._spot_days, "")
+        s += label_to_string("SPOT DAYS", self._spot_days)
+        s += label_to_string("CALENDAR", self._cal_type, "")
         return s
 
 ###############################################################################
@@ -7,6 +7,8 @@ from scipy import optimize
 from numba import njit
 
 from ...utils.date import Date
+from ...utils.calendar import (Calendar, CalendarTypes,
+                               JointCalendarType)
 from ...utils.math import nprime
 from ...utils.global_vars import gDaysInYear, gSmall
 from ...utils.error import FinError
@@ -187,7 +189,9 @@ class FXVanillaOption():
                  option_type: (OptionTypes, list),
                  notional: float,
                  prem_currency: str,
-                 spot_days: int = 0):
+                 spot_days: int = 0,
+                 cal_type: (CalendarTypes,
+                            JointCalendarType) = CalendarTypes.WEEKEND):
         """ Create the FX Vanilla Option object. Inputs include expiry date,
         strike, currency pair, option type (call or put), notional and the
         currency of the notional. And adjustment for spot days is enabled. All
@@ -198,7 +202,8 @@ class FXVanillaOption():
 
         check_argument_types(self.__init__, locals())
 
-        delivery_dt = expiry_dt.add_weekdays(spot_days)
+        calendar = Calendar(cal_type)
+        delivery_dt = calendar.add_business_days(expiry_dt, spot_days)
 
         """ The FX rate the price in domestic currency ccy2 of a single unit
         of the foreign currency which is ccy1. For example EURUSD of 1.3 is the
@@ -237,6 +242,7 @@ class FXVanillaOption():
 
         self._option_type = option_type
         self._spot_days = spot_days
+        self._cal_type = cal_type
 
 ###############################################################################
 
@@ -266,7 +272,9 @@ class FXVanillaOption():
                 "Foreign Curve valuation date not same as valuation date")
 
         if isinstance(value_dt, Date):
-            spot_dt = value_dt.add_weekdays(self._spot_days)
+            calendar = Calendar(self._cal_type)
+            spot_dt = calendar.add_business_days(value_dt,
+                                                 self._spot_days)
             tdel = (self._delivery_dt - spot_dt) / gDaysInYear
             t_exp = (self._expiry_dt - value_dt) / gDaysInYear
         else:
@@ -425,7 +433,9 @@ class FXVanillaOption():
         by Iain Clark, published by Wiley Finance. """
 
         if isinstance(value_dt, Date):
-            spot_dt = value_dt.add_weekdays(self._spot_days)
+            calendar = Calendar(self._cal_type)
+            spot_dt = calendar.add_business_days(value_dt,
+                                                 self._spot_days)
             tdel = (self._delivery_dt - spot_dt) / gDaysInYear
             t_exp = (self._expiry_dt - value_dt) / gDaysInYear
         else:
@@ -766,6 +776,7 @@ class FXVanillaOption():
         s += label_to_string("STRIKE FX RATE", self._strike_fx_rate)
         s += label_to_string("OPTION TYPE", self._option_type)
         s += label_to_string("SPOT DAYS", self._spot_days)
+        s += label_to_string("CALENDAR", self._cal_type)
         s += label_to_string("NOTIONAL", self._notional, "")
         return s
 
@@ -7,9 +7,14 @@ from .ibor_future import *
 from .ibor_conventions import *
 from .ibor_swap import *
 from .ibor_swaption import *
+from .ibor_swaption_grid import *
 from .ois_curve import *
 from .ois import *
 from .ibor_single_curve import *
+from .curve_solver import *
+from .curve_risk import *
 from .dual_curve import *
 from .swap_fixed_leg import *
 from .swap_float_leg import *
+from .swap_portfolio import *
+from .rates_model_calibration import *
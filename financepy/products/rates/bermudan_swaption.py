@@ -97,6 +97,51 @@ class IborBermudanSwaption:
         discount curve. The choices of model are the Hull-White model, the
         Black-Karasinski model and the Black-Derman-Toy model. """
 
+        t_exp, t_mat, cpn_times, cpn_flows = self._tree_flows(value_dt,
+                                                              discount_curve)
+
+        df_times = discount_curve._times
+        df_values = discount_curve._dfs
+
+        face_amount = 1.0
+        strike_price = 1.0  # Floating leg is assumed to price at par
+
+        #######################################################################
+        # For both models, the tree needs to extend out to maturity because of
+        # the multi-callable nature of the Bermudan Swaption
+        #######################################################################
+
+        if isinstance(model, BDTTree) or isinstance(model, BKTree) or isinstance(model, HWTree):
+
+            model.build_tree(t_mat, df_times, df_values)
+
+            v = model.bermudan_swaption(t_exp,
+                                        t_mat,
+                                        strike_price,
+                                        face_amount,
+                                        cpn_times,
+                                        cpn_flows,
+                                        self._exercise_type)
+        else:
+
+            raise FinError("Invalid model choice for Bermudan Swaption")
+
+        if self._fixed_leg_type == SwapTypes.RECEIVE:
+            v = self._notional * v['rec']
+        elif self._fixed_leg_type == SwapTypes.PAY:
+            v = self._notional * v['pay']
+
+        return v
+
+###############################################################################
+
+    def _tree_flows(self,
+                    value_dt,
+                    discount_curve):
+        """ The expiry and maturity times and the fixed flows per unit of
+        notional of the underlying swap as they are used by the tree models.
+        """
+
         float_spread = 0.0
 
         # The underlying is a swap in which we pay the fixed amount
@@ -151,38 +196,7 @@ class IborBermudanSwaption:
         # Allow exercise on coupon dates but control this later for europeans
         self._call_times = cpn_times
 
-        df_times = discount_curve._times
-        df_values = discount_curve._dfs
-
-        face_amount = 1.0
-        strike_price = 1.0  # Floating leg is assumed to price at par
-
-        #######################################################################
-        # For both models, the tree needs to extend out to maturity because of
-        # the multi-callable nature of the Bermudan Swaption
-        #######################################################################
-
-        if isinstance(model, BDTTree) or isinstance(model, BKTree) or isinstance(model, HWTree):
-
-            model.build_tree(t_mat, df_times, df_values)
-
-            v = model.bermudan_swaption(t_exp,
-                                        t_mat,
-                                        strike_price,
-                                        face_amount,
-                                        cpn_times,
-                                        cpn_flows,
-                                        self._exercise_type)
-        else:
-
-            raise FinError("Invalid model choice for Bermudan Swaption")
-
-        if self._fixed_leg_type == SwapTypes.RECEIVE:
-            v = self._notional * v['rec']
-        elif self._fixed_leg_type == SwapTypes.PAY:
-            v = self._notional * v['pay']
-
-        return v
+        return t_exp, t_mat, cpn_times, cpn_flows
 
 ###############################################################################
 
@@ -222,3 +236,54 @@ class IborBermudanSwaption:
         print(self)
 
 ###############################################################################
+
+
+def value_bermudan_swaptions(swaptions: list,
+                             value_dt: Date,
+                             discount_curve,
+                             model,
+                             num_threads: int = 1):
+    """ Value a book of Bermudan swaptions using a Hull-White, Black-Karasinski
+    or Black-Derman-Toy model. One tree is built out to the last maturity of
+    the book and all of the trades are valued together in one sweep back
+    through it, with the trades split across num_threads. As the tree time
+    steps depend on its maturity, trades that mature before the last one can
+    differ from their own value by the time step noise of the tree. An array
+    with the value of each trade is returned. """
+
+    if len(swaptions) == 0:
+        raise FinError("No swaptions have been supplied.")
+
+    if not isinstance(model, (BDTTree, BKTree, HWTree)):
+        raise FinError("Invalid model choice for Bermudan Swaption")
+
+    t_exps = []
+    t_mats = []
+    cpn_times = []
+    cpn_flows = []
+    exercise_types = []
+
+    for swaption in swaptions:
+        t_exp, t_mat, times, flows = swaption._tree_flows(value_dt,
+                                                          discount_curve)
+        t_exps.append(t_exp)
+        t_mats.append(t_mat)
+        cpn_times.append(times)
+        cpn_flows.append(flows)
+        exercise_types.append(swaption._exercise_type)
+
+    model.build_tree(max(t_mats), discount_curve._times, discount_curve._dfs)
+
+    num_trades = len(swaptions)
+    strikes = np.ones(num_trades)
+    face_amounts = np.ones(num_trades)
+
+    v = model.bermudan_swaptions(t_exps, strikes, face_amounts, cpn_times,
+                                 cpn_flows, exercise_types, num_threads)
+
+    is_pay = np.array([s._fixed_leg_type == SwapTypes.PAY for s in swaptions])
+    notionals = np.array([s._notional for s in swaptions])
+
+    return notionals * np.where(is_pay, v['pay'], v['rec'])
+
+###############################################################################
@@ -0,0 +1,109 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+from ...utils.error import FinError
+from .curve_solver import CurveSolverTypes, GlobalCurveSolver
+
+###############################################################################
+# Bucketed risk to the market quotes of a bootstrapped curve is calculated
+# without rebuilding the curve once per quote. At the solution the repricing
+# errors of the calibration instruments are zero and so by the implicit
+# function theorem the derivatives of the pillar discount factors with
+# respect to the quotes follow from the Jacobian of the curve solver. The
+# gradient of a value with respect to the pillar discount factors is then
+# mapped onto the quotes with a single linear solve. A bootstrapped curve
+# with spline interpolation only reprices each instrument on the curve built
+# up to its own pillar, so its risk is found from the lower triangular system
+# of the pillar by pillar solve instead.
+###############################################################################
+
+
+def _risk_solver(curve):
+    """ Return a global solver holding the solution of the curve. If the
+    curve was bootstrapped then a solver is set up at its pillars and the
+    risk follows the order in which the pillars were solved. """
+
+    if curve._solver_type == CurveSolverTypes.GLOBAL_NEWTON:
+        return curve._solver
+
+    solver = GlobalCurveSolver(curve._value_dt,
+                               curve._usedDeposits,
+                               curve._usedFRAs,
+                               curve._usedSwaps,
+                               curve._interp_type,
+                               curve._dc_type,
+                               getattr(curve, "_discount_curve", None))
+
+    solver.set_pillar_dfs(curve._dfs, bootstrapped=True)
+    return solver
+
+###############################################################################
+
+
+def quote_jacobian(curve):
+    """ Return the matrix of derivatives of the pillar discount factors of an
+    OIS, Ibor single or Ibor dual curve with respect to its market quotes.
+    Row i is the pillar at curve._times[i + 1] and column j is quote j in the
+    order deposits, FRAs and swaps. """
+
+    return _risk_solver(curve).quote_jacobian()
+
+###############################################################################
+
+
+def pillar_df_gradient(curve,
+                       value_fn,
+                       bump: float = 1e-6):
+    """ Return the gradient of value_fn(curve) with respect to the pillar
+    discount factors of the curve excluding time zero. Each pillar is moved
+    in turn and the interpolator is refitted but the curve is not solved
+    again so the quotes are not repriced. """
+
+    if bump <= 0.0:
+        raise FinError("Bump must be positive.")
+
+    num_pillars = len(curve._dfs) - 1
+    grad = np.zeros(num_pillars)
+
+    try:
+        for i in range(0, num_pillars):
+
+            df = curve._dfs[i + 1]
+
+            curve._dfs[i + 1] = df + bump
+            curve._interpolator.fit(curve._times, curve._dfs)
+            v_up = value_fn(curve)
+
+            curve._dfs[i + 1] = df - bump
+            curve._interpolator.fit(curve._times, curve._dfs)
+            v_down = value_fn(curve)
+
+            curve._dfs[i + 1] = df
+            grad[i] = (v_up - v_down) / (2.0 * bump)
+
+    finally:
+        curve._interpolator.fit(curve._times, curve._dfs)
+
+    return grad
+
+###############################################################################
+
+
+def bucketed_delta(curve,
+                   value_fn,
+                   df_grad: np.ndarray = None):
+    """ Return the change in value_fn(curve) for a one basis point rise in
+    each of the market quotes of the curve. The quotes are in the order
+    deposits, FRAs and swaps. If the gradient with respect to the pillar
+    discount factors is known it can be passed in, otherwise it is found
+    using pillar_df_gradient. No curve is rebuilt. """
+
+    if df_grad is None:
+        df_grad = pillar_df_gradient(curve, value_fn)
+
+    return _risk_solver(curve).quote_sensitivity(df_grad) * 0.0001
+
+###############################################################################
@@ -0,0 +1,573 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from collections import namedtuple
+from enum import Enum
+
+import numpy as np
+from numba import njit
+
+from ...utils.error import FinError
+from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.global_vars import gDaysInYear
+from ...utils.global_types import SwapTypes
+from ...market.curves.interpolator import InterpTypes
+from ...market.curves.curve_adjoint import _interp_weights, _pillar_scale
+from .ibor_deposit import IborDeposit
+from .ibor_fra import IborFRA
+
+###############################################################################
+# The global solver finds all of the pillar discount factors of a curve at
+# once. Each calibration instrument is converted once into arrays of flow
+# amounts and indices into a vector of curve evaluation times. For all of the
+# supported interpolation schemes the log of the discount factor at each of
+# these times is a fixed linear function of the pillar unknowns so that the
+# curve and its Jacobian are found with one matrix product per iteration.
+###############################################################################
+
+
+class CurveSolverTypes(Enum):
+    BOOTSTRAP = 1
+    GLOBAL_NEWTON = 2
+
+
+# Schemes in which the log discount factor is linear in the pillar values
+g_global_interp_types = (InterpTypes.FLAT_FWD_RATES,
+                         InterpTypes.LINEAR_ZERO_RATES,
+                         InterpTypes.FINCUBIC_ZERO_RATES,
+                         InterpTypes.NATCUBIC_LOG_DISCOUNT,
+                         InterpTypes.NATCUBIC_ZERO_RATES)
+
+# Schemes in which a pillar does not move the curve before the previous one
+g_local_interp_types = (InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES)
+
+g_solver_tol = 1e-12
+g_solver_max_iter = 50
+
+CurveInstruments = namedtuple("CurveInstruments",
+                              "weights scale two_idx two_k "
+                              "fix_ptr fix_pay fix_amt fix_disc "
+                              "flt_ptr flt_start flt_end flt_pay flt_amt "
+                              "flt_sprd flt_disc same_curve")
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _residuals_jacobian(u, inst):
+    """ Calculate the repricing error of every instrument per unit notional
+    and its Jacobian with respect to the pillar unknowns u. Deposits and FRAs
+    come first, followed by the swaps. """
+
+    weights = inst.weights
+    scale = inst.scale
+    num_times = weights.shape[0]
+    num_pillars = weights.shape[1]
+
+    dfs = np.exp(-scale * np.dot(weights, u))
+
+    r = np.zeros(num_pillars)
+    grad = np.zeros((num_pillars, num_times))
+
+    row = 0
+
+    # Deposits and FRAs solve df(start) = (1 + acc * rate) * df(end)
+    for k in range(0, inst.two_k.size):
+        s = inst.two_idx[k, 0]
+        e = inst.two_idx[k, 1]
+        r[row] = dfs[s] - inst.two_k[k] * dfs[e]
+        grad[row, s] += 1.0
+        grad[row, e] -= inst.two_k[k]
+        row += 1
+
+    for i in range(0, inst.fix_ptr.size - 1):
+
+        v = 0.0
+
+        for f in range(inst.fix_ptr[i], inst.fix_ptr[i + 1]):
+            q = inst.fix_pay[f]
+            if inst.same_curve:
+                v += inst.fix_amt[f] * dfs[q]
+                grad[row, q] += inst.fix_amt[f]
+            else:
+                v += inst.fix_amt[f] * inst.fix_disc[f]
+
+        for g in range(inst.flt_ptr[i], inst.flt_ptr[i + 1]):
+            s = inst.flt_start[g]
+            e = inst.flt_end[g]
+            q = inst.flt_pay[g]
+            a = inst.flt_amt[g]
+
+            if inst.same_curve:
+                df_pay = dfs[q]
+            else:
+                df_pay = inst.flt_disc[g]
+
+            x = dfs[s] / dfs[e]
+            cpn = x - 1.0 + inst.flt_sprd[g]
+            v += a * cpn * df_pay
+            grad[row, s] += a * df_pay / dfs[e]
+            grad[row, e] -= a * df_pay * x / dfs[e]
+
+            if inst.same_curve:
+                grad[row, q] += a * cpn
+
+        r[row] = v
+        row += 1
+
+    # The chain rule through df = exp(-scale * weights @ u)
+    jac = -np.dot(grad * (dfs * scale), weights)
+
+    return r, jac
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _newton_solve(u0, inst, first, tol, max_iter):
+    """ Newton iteration on the pillar unknowns from index first onwards
+    together. The unknowns before this are held at their values in u0. """
+
+    u = u0.copy()
+
+    for _ in range(0, max_iter):
+        r, jac = _residuals_jacobian(u, inst)
+
+        if np.max(np.abs(r[first:])) < tol:
+            return u
+
+        u[first:] = u[first:] - np.linalg.solve(jac[first:, first:],
+                                                r[first:])
+
+    raise FinError("Global curve solver failed to converge")
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _quote_derivatives(u, inst, two_acc, fix_yf):
+    """ Derivative of the repricing error of each instrument with respect to
+    its own market quote. No instrument depends on the quote of another. """
+
+    dfs = np.exp(-inst.scale * np.dot(inst.weights, u))
+    num_two = inst.two_k.size
+
+    dr = np.zeros(num_two + inst.fix_ptr.size - 1)
+
+    for k in range(0, num_two):
+        dr[k] = -two_acc[k] * dfs[inst.two_idx[k, 1]]
+
+    for i in range(0, inst.fix_ptr.size - 1):
+        v = 0.0
+        for f in range(inst.fix_ptr[i], inst.fix_ptr[i + 1]):
+            if inst.same_curve:
+                v += fix_yf[f] * dfs[inst.fix_pay[f]]
+            else:
+                v += fix_yf[f] * inst.fix_disc[f]
+
+        dr[num_two + i] = v
+
+    return dr
+
+###############################################################################
+
+
+class GlobalCurveSolver():
+    """ Solves for the discount factors at the pillar times of a curve so
+    that all of its deposits, FRAs and swaps are repriced at the same time.
+    The cash flows of each instrument are converted once into arrays of times,
+    accrual factors and amounts. A compiled Newton solver with an analytic
+    Jacobian then finds every pillar together. If a discount curve is given,
+    the swaps and FRAs are discounted on it and only the index curve is
+    solved for. """
+
+    def __init__(self,
+                 value_dt,
+                 deposits: list,
+                 fras: list,
+                 swaps: list,
+                 interp_type: InterpTypes,
+                 index_dc_type: DayCountTypes,
+                 discount_curve=None):
+
+        if interp_type not in g_global_interp_types:
+            raise FinError("Global solver does not support " +
+                           str(interp_type))
+
+        self._value_dt = value_dt
+        self._interp_type = interp_type
+        self._eval_dts = []
+        self._eval_index = {}
+
+        # The pillars are the same as those of the 1d bootstrap
+        pillar_dts = [depo._maturity_dt for depo in deposits]
+        pillar_dts += [fra._maturity_dt for fra in fras]
+        pillar_dts += [swap._fixed_leg._payment_dts[-1] for swap in swaps]
+
+        times = [(dt - value_dt) / gDaysInYear for dt in pillar_dts]
+        self._times = np.array([0.0] + times)
+
+        two_idx = []
+        two_k = []
+        two_acc = []
+
+        # The bootstrap finds the pillar of a deposit, and of a FRA which
+        # straddles the last deposit maturity, in closed form from the start
+        # date discount factor read off the curve before the pillar is added
+        two_prev = []
+        t_depo = 0.0
+
+        for depo in deposits:
+            acc = DayCount(depo._dc_type).year_frac(depo._start_dt,
+                                                    depo._maturity_dt)[0]
+            two_idx.append([self._index(depo._start_dt),
+                            self._index(depo._maturity_dt)])
+            two_k.append(1.0 + acc * depo._deposit_rate)
+            two_acc.append(acc)
+            two_prev.append(True)
+            t_depo = (depo._maturity_dt - value_dt) / gDaysInYear
+
+        for fra in fras:
+            acc = DayCount(fra._dc_type).year_frac(fra._start_dt,
+                                                   fra._maturity_dt)[0]
+            two_idx.append([self._index(fra._start_dt),
+                            self._index(fra._maturity_dt)])
+            two_k.append(1.0 + acc * fra._fra_rate)
+            two_acc.append(acc)
+            t_set = (fra._start_dt - value_dt) / gDaysInYear
+            t_mat = (fra._maturity_dt - value_dt) / gDaysInYear
+            two_prev.append(t_set < t_depo and t_mat > t_depo)
+
+        fix_ptr = [0]
+        fix_pay = []
+        fix_amt = []
+        fix_yf = []
+        fix_prin = []
+        fix_dts = []
+        flt_ptr = [0]
+        flt_start = []
+        flt_end = []
+        flt_pay = []
+        flt_amt = []
+        flt_sprd = []
+        flt_dts = []
+
+        for swap in swaps:
+
+            fixed_leg = swap._fixed_leg
+            notional = fixed_leg._notional
+
+            sign = 1.0
+            if fixed_leg._leg_type == SwapTypes.PAY:
+                sign = -1.0
+
+            pmnt_dts = fixed_leg._payment_dts
+
+            for i_pmnt in range(0, len(pmnt_dts)):
+                if pmnt_dts[i_pmnt] > value_dt:
+                    amount = fixed_leg._payments[i_pmnt] / notional
+                    principal = 0.0
+                    if i_pmnt == len(pmnt_dts) - 1:
+                        principal = fixed_leg._principal
+                    fix_pay.append(self._index(pmnt_dts[i_pmnt]))
+                    fix_amt.append(sign * (amount + principal))
+                    fix_yf.append(sign * fixed_leg._year_fracs[i_pmnt])
+                    fix_prin.append(sign * principal)
+                    fix_dts.append(pmnt_dts[i_pmnt])
+
+            fix_ptr.append(len(fix_pay))
+
+            float_leg = swap._float_leg
+
+            sign = 1.0
+            if float_leg._leg_type == SwapTypes.PAY:
+                sign = -1.0
+
+            notionals = float_leg._notional_array
+            if len(notionals) == 0:
+                notionals = [float_leg._notional] * \
+                    len(float_leg._payment_dts)
+
+            start_dts = float_leg._startAccruedDates
+            end_dts = float_leg._endAccruedDates
+            pmnt_dts = float_leg._payment_dts
+
+            index_alphas = DayCount(index_dc_type).year_fracs(start_dts,
+                                                              end_dts)[0]
+
+            for i_pmnt in range(0, len(pmnt_dts)):
+                if pmnt_dts[i_pmnt] > value_dt:
+                    pay_alpha = float_leg._year_fracs[i_pmnt]
+                    index_alpha = index_alphas[i_pmnt]
+                    amount = pay_alpha * notionals[i_pmnt]
+                    flt_start.append(self._index(start_dts[i_pmnt]))
+                    flt_end.append(self._index(end_dts[i_pmnt]))
+                    flt_pay.append(self._index(pmnt_dts[i_pmnt]))
+                    flt_amt.append(sign * amount / index_alpha / notional)
+                    flt_sprd.append(index_alpha * float_leg._spread)
+                    flt_dts.append(pmnt_dts[i_pmnt])
+
+            flt_ptr.append(len(flt_pay))
+
+        same_curve = discount_curve is None
+
+        if same_curve:
+            fix_disc = np.zeros(len(fix_pay))
+            flt_disc = np.zeros(len(flt_pay))
+        else:
+            df_value = discount_curve.df(value_dt)
+            fix_disc = self._disc_dfs(discount_curve, fix_dts) / df_value
+            flt_disc = self._disc_dfs(discount_curve, flt_dts) / df_value
+
+        day_counter = DayCount(DayCountTypes.ACT_ACT_ISDA)
+        eval_times = day_counter.year_fracs(value_dt, self._eval_dts)[0]
+
+        weights, scale = _interp_weights(self._times, eval_times, interp_type)
+
+        self._inst = CurveInstruments(
+            weights,
+            scale,
+            np.array(two_idx, dtype=np.int64).reshape(-1, 2),
+            np.array(two_k, dtype=np.float64),
+            np.array(fix_ptr, dtype=np.int64),
+            np.array(fix_pay, dtype=np.int64),
+            np.array(fix_amt, dtype=np.float64),
+            fix_disc,
+            np.array(flt_ptr, dtype=np.int64),
+            np.array(flt_start, dtype=np.int64),
+            np.array(flt_end, dtype=np.int64),
+            np.array(flt_pay, dtype=np.int64),
+            np.array(flt_amt, dtype=np.float64),
+            np.array(flt_sprd, dtype=np.float64),
+            flt_disc,
+            same_curve)
+
+        # These are kept so that the quotes can be changed
+        self._two_acc = np.array(two_acc)
+        self._two_prev = two_prev
+        self._fix_yf = np.array(fix_yf)
+        self._fix_prin = np.array(fix_prin)
+
+        # Converts the unknowns at the pillars into discount factors
+        self._pillar_scale = _pillar_scale(self._times, interp_type)
+
+        self._u = np.zeros(len(times))
+        self._bootstrapped = False
+
+    ###########################################################################
+
+    def _index(self, dt):
+        """ Position of a date in the vector of curve evaluation dates. """
+
+        key = dt._excel_dt
+        if key not in self._eval_index:
+            self._eval_index[key] = len(self._eval_dts)
+            self._eval_dts.append(dt)
+
+        return self._eval_index[key]
+
+    ###########################################################################
+
+    @staticmethod
+    def _disc_dfs(discount_curve, dts):
+        """ Discount factors of the payment dates on the discount curve. """
+
+        if len(dts) == 0:
+            return np.zeros(0)
+
+        return np.array(discount_curve.df(dts), dtype=np.float64).reshape(-1)
+
+    ###########################################################################
+
+    def update_quote(self,
+                     index: int,
+                     quote: float):
+        """ Change the rate of the deposit or FRA or the fixed coupon of the
+        swap at this position in the order deposits, FRAs and swaps. """
+
+        inst = self._inst
+        num_two = len(inst.two_k)
+
+        if index < num_two:
+            inst.two_k[index] = 1.0 + self._two_acc[index] * quote
+        else:
+            i = index - num_two
+            start = inst.fix_ptr[i]
+            end = inst.fix_ptr[i + 1]
+            inst.fix_amt[start:end] = self._fix_yf[start:end] * quote + \
+                self._fix_prin[start:end]
+
+    ###########################################################################
+
+    def solve(self,
+              first_pillar: int = 0):
+        """ Solve for the pillar unknowns starting from the last solution and
+        return the pillar times and discount factors including time zero. If
+        the interpolation is local then the pillars before the first pillar
+        are held fixed and only those after it are solved for. """
+
+        if self._interp_type not in g_local_interp_types:
+            first_pillar = 0
+
+        self._u = _newton_solve(self._u, self._inst, first_pillar,
+                                g_solver_tol, g_solver_max_iter)
+
+        dfs = np.exp(-self._u * self._pillar_scale)
+        dfs = np.concatenate((np.array([1.0]), dfs))
+
+        return self._times.copy(), dfs
+
+    ###########################################################################
+
+    def set_pillar_dfs(self,
+                       dfs: np.ndarray,
+                       bootstrapped: bool = False):
+        """ Set the solution to the pillar discount factors of a curve that
+        has been built in some other way. These include time zero. If the
+        curve was bootstrapped pillar by pillar then its risk is found from
+        the sequential solve in which each instrument is only repriced on the
+        curve up to its own pillar. """
+
+        self._u = -np.log(dfs[1:]) / self._pillar_scale
+        self._bootstrapped = bootstrapped
+
+    ###########################################################################
+
+    def _instrument_indices(self,
+                            i: int):
+        """ Positions in the vector of curve evaluation dates of the dates
+        read by instrument i in the order deposits, FRAs and swaps. """
+
+        inst = self._inst
+        num_two = len(inst.two_k)
+
+        if i < num_two:
+            return inst.two_idx[i]
+
+        j = i - num_two
+        fix = slice(inst.fix_ptr[j], inst.fix_ptr[j + 1])
+        flt = slice(inst.flt_ptr[j], inst.flt_ptr[j + 1])
+
+        return np.unique(np.concatenate((inst.fix_pay[fix],
+                                         inst.flt_start[flt],
+                                         inst.flt_end[flt],
+                                         inst.flt_pay[flt])))
+
+    ###########################################################################
+
+    def _risk_system(self):
+        """ Return the Jacobian of the repricing errors with respect to the
+        pillar unknowns and the derivative of each repricing error with
+        respect to its own quote at the current solution. When a curve with a
+        non-local interpolation is bootstrapped, instrument i is repriced on
+        the curve fitted to pillars 0 to i only. Its row of the Jacobian is
+        then taken from that curve and the system is lower triangular. The
+        start date of a deposit or FRA found in closed form is read from the
+        curve fitted to the pillars before its own. """
+
+        if not self._bootstrapped or \
+                self._interp_type in g_local_interp_types:
+            _, jac = _residuals_jacobian(self._u, self._inst)
+            dr_dq = _quote_derivatives(self._u, self._inst, self._two_acc,
+                                       self._fix_yf)
+            return jac, dr_dq
+
+        inst = self._inst
+        num_pillars = len(self._u)
+        eval_times = DayCount(DayCountTypes.ACT_ACT_ISDA).year_fracs(
+            self._value_dt, self._eval_dts)[0]
+
+        jac = np.zeros((num_pillars, num_pillars))
+        dr_dq = np.zeros(num_pillars)
+
+        for i in range(0, num_pillars):
+            weights, _ = _interp_weights(self._times[0:i + 2], eval_times,
+                                         self._interp_type)
+            # Only the dates of instrument i are read from this curve
+            used = self._instrument_indices(i)
+            padded = np.zeros((len(eval_times), num_pillars))
+            padded[used, 0:i + 1] = weights[used]
+
+            if i < len(self._two_prev) and self._two_prev[i]:
+                start = inst.two_idx[i, 0]
+                padded[start, :] = 0.0
+                if i > 0:
+                    prev, _ = _interp_weights(self._times[0:i + 1],
+                                              eval_times[start:start + 1],
+                                              self._interp_type)
+                    padded[start, 0:i] = prev[0]
+            inst_i = inst._replace(weights=padded)
+
+            _, jac_i = _residuals_jacobian(self._u, inst_i)
+            jac[i, 0:i + 1] = jac_i[i, 0:i + 1]
+            dr_dq[i] = _quote_derivatives(self._u, inst_i, self._two_acc,
+                                          self._fix_yf)[i]
+
+        return jac, dr_dq
+
+    ###########################################################################
+
+    def quote_jacobian(self):
+        """ Return the matrix of derivatives of the pillar discount factors
+        excluding time zero with respect to the market quotes. This uses the
+        implicit function theorem at the current solution and so needs just
+        one factorisation of the Jacobian of the solver. """
+
+        jac, dr_dq = self._risk_system()
+
+        du_dq = -np.linalg.solve(jac, np.diag(dr_dq))
+        ddf_du = -np.exp(-self._u * self._pillar_scale) * self._pillar_scale
+
+        return ddf_du[:, np.newaxis] * du_dq
+
+    ###########################################################################
+
+    def quote_sensitivity(self,
+                          df_grad: np.ndarray):
+        """ Convert the gradient of a value with respect to the pillar
+        discount factors excluding time zero into its gradient with respect
+        to the market quotes. This is an adjoint calculation which needs a
+        single linear solve whatever the number of quotes. """
+
+        jac, dr_dq = self._risk_system()
+
+        ddf_du = -np.exp(-self._u * self._pillar_scale) * self._pillar_scale
+        adjoint = np.linalg.solve(jac.T, df_grad * ddf_du)
+
+        return -adjoint * dr_dq
+
+###############################################################################
+
+
+def instrument_quote(inst):
+    """ The market quote of a curve instrument. This is the rate of a
+    deposit or FRA and the fixed coupon of a swap. """
+
+    if isinstance(inst, IborDeposit):
+        return inst._deposit_rate
+    elif isinstance(inst, IborFRA):
+        return inst._fra_rate
+    else:
+        return inst._fixed_leg._cpn
+
+###############################################################################
+
+
+def set_instrument_quote(inst, quote):
+    """ Set the market quote of a curve instrument. The fixed leg payments of
+    a swap are recalculated from the new coupon. The dates do not change. """
+
+    if isinstance(inst, IborDeposit):
+        inst._deposit_rate = quote
+    elif isinstance(inst, IborFRA):
+        inst._fra_rate = quote
+    else:
+        leg = inst._fixed_leg
+        leg._cpn = quote
+        leg._rates = [quote] * len(leg._rates)
+        leg._payments = [year_frac * leg._notional * quote
+                         for year_frac in leg._year_fracs]
+
+###############################################################################
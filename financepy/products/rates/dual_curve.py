@@ -16,6 +16,10 @@ from ...market.curves.discount_curve import DiscountCurve
 from ...products.rates.ibor_deposit import IborDeposit
 from ...products.rates.ibor_fra import IborFRA
 from ...products.rates.ibor_swap import IborSwap
+from ...products.rates.curve_solver import CurveSolverTypes
+from ...products.rates.curve_solver import GlobalCurveSolver
+from ...products.rates.curve_solver import instrument_quote
+from ...products.rates.curve_solver import set_instrument_quote
 
 swaptol = 1e-10
 
@@ -78,7 +82,8 @@ class IborDualCurve(DiscountCurve):
                  ibor_fras: list,
                  ibor_swaps: list,
                  interp_type: InterpTypes = InterpTypes.FLAT_FWD_RATES,
-                 check_refit: bool = False):  # Set to True to test it works
+                 check_refit: bool = False,  # Set to True to test it works
+                 solver_type: CurveSolverTypes = CurveSolverTypes.BOOTSTRAP):
         """ Create an instance of a Ibor curve given a valuation date and
         a set of ibor deposits, ibor FRAs and ibor_swaps. Some of these may
         be left None and the algorithm will just use what is provided. An
@@ -87,6 +92,11 @@ class IborDualCurve(DiscountCurve):
         flat forwards between these coupon dates.
 
         The curve will assign a discount factor of 1.0 to the valuation date.
+
+        The solver type chooses between the pillar by pillar bootstrap and a
+        global solver that finds all of the pillars together. The global
+        solver supports the flat forward, linear zero rate and cubic spline
+        schemes but not PCHIP or linear forward interpolation.
         """
 
         check_argument_types(getattr(self, _func_name(), None), locals())
@@ -96,6 +106,7 @@ class IborDualCurve(DiscountCurve):
         self._validate_inputs(ibor_deposits, ibor_fras, ibor_swaps)
         self._interp_type = interp_type
         self._check_refit = check_refit
+        self._solver_type = solver_type
         self._build_curve()
 
 ###############################################################################
@@ -103,7 +114,13 @@ class IborDualCurve(DiscountCurve):
     def _build_curve(self):
         """ Build curve based on interpolation. """
 
-        self._build_curve_using_1d_solver()
+        if self._solver_type == CurveSolverTypes.GLOBAL_NEWTON:
+            self._build_curve_using_global_solver()
+        else:
+            self._build_curve_using_1d_solver()
+
+        self._quotes = np.array([instrument_quote(inst)
+                                 for inst in self._instruments()])
 
 ###############################################################################
 
@@ -284,31 +301,46 @@ class IborDualCurve(DiscountCurve):
 
 ###############################################################################
 
-    def _build_curve_using_1d_solver(self):
+    def _build_curve_using_1d_solver(self, first_pillar=0):
         """ Construct the discount curve using a bootstrap approach. This is
         the non-linear slower method that allows the user to choose a number
         of interpolation approaches between the swap rates and other rates. It
-        involves the use of a solver. """
+        involves the use of a solver. The pillars are solved in order and so
+        the discount factors before the first pillar are kept. The previous
+        solution is the initial guess for the pillars that are re-solved. """
 
-        self._interpolator = Interpolator(self._interp_type)
+        old_dfs = None
 
-        self._times = np.array([])
-        self._dfs = np.array([])
+        if first_pillar > 0:
+            old_dfs = self._dfs
+            self._times = self._times[0:first_pillar + 1].copy()
+            self._dfs = self._dfs[0:first_pillar + 1].copy()
+        else:
+            self._times = np.array([])
+            self._dfs = np.array([])
 
-        # time zero is now.
-        t_mat = 0.0
-        df_mat = 1.0
-        self._times = np.append(self._times, 0.0)
-        self._dfs = np.append(self._dfs, df_mat)
+            # time zero is now.
+            self._times = np.append(self._times, 0.0)
+            self._dfs = np.append(self._dfs, 1.0)
+
+        self._interpolator = Interpolator(self._interp_type)
         self._interpolator.fit(self._times, self._dfs)
 
+        t_mat = 0.0
+        df_mat = self._dfs[-1]
+        pillar = 0
+
         # A deposit is not margined and not indexed to Libor so should
         # probably not be used to build an indexed Libor curve from
         for depo in self._usedDeposits:
+            t_mat = (depo._maturity_dt - self._value_dt) / gDaysInYear
+            pillar += 1
+
+            if pillar <= first_pillar:
+                continue
 
             df_settle = self.df(depo._start_dt)
             df_mat = depo._maturity_df() * df_settle
-            t_mat = (depo._maturity_dt - self._value_dt) / gDaysInYear
             self._times = np.append(self._times, t_mat)
             self._dfs = np.append(self._dfs, df_mat)
             self._interpolator.fit(self._times, self._dfs)
@@ -316,6 +348,13 @@ class IborDualCurve(DiscountCurve):
         oldt_mat = t_mat
 
         for fra in self._usedFRAs:
+            pillar += 1
+
+            if pillar <= first_pillar:
+                continue
+
+            if old_dfs is not None:
+                df_mat = old_dfs[pillar]
 
             t_set = (fra._start_dt - self._value_dt) / gDaysInYear
             t_mat = (fra._maturity_dt - self._value_dt) / gDaysInYear
@@ -337,6 +376,14 @@ class IborDualCurve(DiscountCurve):
                                         maxiter=50, fprime2=None)
 
         for swap in self._usedSwaps:
+            pillar += 1
+
+            if pillar <= first_pillar:
+                continue
+
+            if old_dfs is not None:
+                df_mat = old_dfs[pillar]
+
             # I use the lastPaymentDate in case a date has been adjusted fwd
             # over a holiday as the maturity date is usually not adjusted CHECK
             maturity_dt = swap._fixed_leg._payment_dts[-1]
@@ -354,6 +401,78 @@ class IborDualCurve(DiscountCurve):
         if self._check_refit is True:
             self._check_refits(1e-10, swaptol, 1e-5)
 
+###############################################################################
+
+    def _build_curve_using_global_solver(self):
+        """ Construct the discount curve by solving for all of the pillar
+        discount factors at the same time. The cash flows of every instrument
+        are converted to arrays once and a compiled Newton solver with an
+        analytic Jacobian then refits all of the instruments together. """
+
+        self._solver = GlobalCurveSolver(self._value_dt,
+                                         self._usedDeposits,
+                                         self._usedFRAs,
+                                         self._usedSwaps,
+                                         self._interp_type,
+                                         self._dc_type,
+                                         self._discount_curve)
+
+        self._times, self._dfs = self._solver.solve()
+        self._interpolator = Interpolator(self._interp_type)
+        self._interpolator.fit(self._times, self._dfs)
+
+        if self._check_refit is True:
+            self._check_refits(1e-10, swaptol, 1e-5)
+
+###############################################################################
+
+    def _instruments(self):
+        """ The calibration instruments in the order of the pillars. """
+
+        return self._usedDeposits + self._usedFRAs + self._usedSwaps
+
+###############################################################################
+
+    def update_quotes(self,
+                      quotes: dict):
+        """ Change the market quotes of some of the calibration instruments
+        and re-solve the curve. The dictionary maps the position of each
+        instrument in the quote vector to its new rate. The quote vector holds
+        the deposit rates, then the FRA rates and then the swap coupons. Only
+        the pillars from the first changed instrument onwards are re-solved
+        and the previous solution is used as the initial guess. The discount
+        curve is assumed to be unchanged. """
+
+        if len(quotes) == 0:
+            return
+
+        instruments = self._instruments()
+
+        for index, quote in quotes.items():
+            if index < 0 or index >= len(instruments):
+                raise FinError("Quote index out of range.")
+
+            set_instrument_quote(instruments[index], quote)
+
+        first_pillar = min(quotes.keys())
+
+        if self._solver_type == CurveSolverTypes.GLOBAL_NEWTON:
+
+            for index, quote in quotes.items():
+                self._solver.update_quote(index, quote)
+
+            self._times, self._dfs = self._solver.solve(first_pillar)
+            self._interpolator.fit(self._times, self._dfs)
+
+            if self._check_refit is True:
+                self._check_refits(1e-10, swaptol, 1e-5)
+
+        else:
+            self._build_curve_using_1d_solver(first_pillar)
+
+        self._quotes = np.array([instrument_quote(inst)
+                                 for inst in instruments])
+
 ###############################################################################
 
     # def _build_curve_linear_swap_rate_interpolation(self):
@@ -10,6 +10,7 @@ from ...utils.calendar import BusDayAdjustTypes
 from ...utils.day_count import DayCount
 from ...utils.day_count import DayCountTypes
 from ...utils.helpers import label_to_string, check_argument_types
+from ...market.curves.curve_adjoint import df_adjoint
 
 
 ###############################################################################
@@ -112,6 +113,29 @@ class IborDeposit:
 
     ###########################################################################
 
+    def value_and_gradient(self,
+                           value_dt: Date,
+                           libor_curve):
+        """ Value the Libor Deposit and return this value with its gradient
+        with respect to the pillar discount factors of the Libor curve. """
+
+        value = self.value(value_dt, libor_curve)
+
+        df_settle = libor_curve.df(self._start_dt)
+        df_maturity = libor_curve.df(self._maturity_dt)
+
+        # Backward sweep
+        df_maturity_bar = value / df_maturity
+        df_settle_bar = -value / df_settle
+
+        grad = df_adjoint(libor_curve,
+                          [self._maturity_dt, self._start_dt],
+                          [df_maturity_bar, df_settle_bar])
+
+        return value, grad
+
+    ###########################################################################
+
     def print_payments(self,
                        value_dt: Date):
         """ Print the date and size of the future repayment. """
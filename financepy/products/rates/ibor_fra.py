@@ -11,6 +11,7 @@ from ...utils.calendar import BusDayAdjustTypes
 from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.helpers import label_to_string, check_argument_types
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.curves.curve_adjoint import df_adjoint
 
 ###############################################################################
 
@@ -113,6 +114,54 @@ class IborFRA:
 
     ##########################################################################
 
+    def value_and_gradient(self,
+                           value_dt: Date,
+                           discount_curve: DiscountCurve,
+                           index_curve: DiscountCurve = None):
+        """ Value the FRA and return this value with its gradients with
+        respect to the pillar discount factors of the discount curve and of
+        the index curve. If the two curves are the same then the total
+        gradient is the sum of the two. """
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        sign = 1.0
+        if self._pay_fixed_rate is True:
+            sign = -1.0
+
+        dc = DayCount(self._dc_type)
+        acc_factor = dc.year_frac(self._start_dt, self._maturity_dt)[0]
+        df_index1 = index_curve.df(self._start_dt)
+        df_index2 = index_curve.df(self._maturity_dt)
+        libor_fwd = (df_index1 / df_index2 - 1.0) / acc_factor
+
+        df_discount2 = discount_curve.df(self._maturity_dt)
+        df_to_value_dt = discount_curve.df(value_dt)
+
+        v = sign * acc_factor * (libor_fwd - self._fra_rate) * df_discount2
+        v = v * self._notional / df_to_value_dt
+
+        # Backward sweep
+        df_discount2_bar = v / df_discount2
+        df_to_value_dt_bar = -v / df_to_value_dt
+        libor_fwd_bar = sign * acc_factor * df_discount2 * self._notional
+        libor_fwd_bar = libor_fwd_bar / df_to_value_dt
+        df_index1_bar = libor_fwd_bar / acc_factor / df_index2
+        df_index2_bar = -df_index1_bar * df_index1 / df_index2
+
+        discount_grad = df_adjoint(discount_curve,
+                                   [self._maturity_dt, value_dt],
+                                   [df_discount2_bar, df_to_value_dt_bar])
+
+        index_grad = df_adjoint(index_curve,
+                                [self._start_dt, self._maturity_dt],
+                                [df_index1_bar, df_index2_bar])
+
+        return v, discount_grad, index_grad
+
+    ##########################################################################
+
     def maturity_df(self, index_curve):
         """ Determine the maturity date index discount factor needed to refit
         the market FRA rate. In a dual-curve world, this is not the discount
@@ -136,6 +136,34 @@ class IborSwap:
 
     ###########################################################################
 
+    def value_and_gradient(self,
+                           value_dt: Date,
+                           discount_curve: DiscountCurve,
+                           index_curve: DiscountCurve = None,
+                           firstFixingRate=None):
+        """ Value the interest rate swap and return this value with its
+        gradients with respect to the pillar discount factors of the discount
+        curve and of the index curve. These are found using a backward sweep
+        through each leg. If the two curves are the same then the total
+        gradient is the sum of the two. """
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        fixed_leg_value, fixed_grad = \
+            self._fixed_leg.value_and_gradient(value_dt, discount_curve)
+
+        float_leg_value, float_grad, index_grad = \
+            self._float_leg.value_and_gradient(value_dt,
+                                               discount_curve,
+                                               index_curve,
+                                               firstFixingRate)
+
+        value = fixed_leg_value + float_leg_value
+        return value, fixed_grad + float_grad, index_grad
+
+    ###########################################################################
+
     def pv01(self, value_dt, discount_curve):
         """ Calculate the value of 1 basis point coupon on the fixed leg. """
 
@@ -0,0 +1,339 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+from scipy.stats import norm
+
+from ...utils.calendar import CalendarTypes
+from ...utils.calendar import BusDayAdjustTypes
+from ...utils.calendar import DateGenRuleTypes
+from ...utils.day_count import DayCountTypes
+from ...utils.frequency import FrequencyTypes
+from ...utils.global_vars import gDaysInYear, gSmall
+from ...utils.math import ONE_MILLION, n_vect
+from ...utils.error import FinError
+from ...utils.helpers import label_to_string, check_argument_types
+from ...utils.date import Date, DateArray
+from ...utils.global_types import SwapTypes
+
+from ...market.curves.discount_curve import DiscountCurve
+from ...market.volatility.swaption_vol_surface import SwaptionVolSurface
+from ...products.rates.swap_fixed_leg import SwapFixedLeg
+
+from ...models.black import Black
+from ...models.black_shifted import BlackShifted
+from ...models.bachelier import Bachelier
+from ...models.sabr import SABR, vol_function_sabr
+from ...models.sabr_shifted import SABRShifted, vol_function_shifted_sabr
+
+###############################################################################
+# The fixed leg schedules of the swaps underlying a grid of European
+# swaptions are generated once and held as flat arrays. Valuation then needs
+# a single call to the discount curve for all of the dates in the grid after
+# which every expiry, tenor and strike is priced in one array calculation.
+# The formulae and conventions are those used by IborSwaption.value.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _sabr_vols(params, f, k, t, shifted):
+    """ Return the SABR Black volatility of each option. Row i of params holds
+    the SABR parameters of option i with the shift last if shifted. """
+
+    num_options = len(f)
+    vols = np.empty(num_options)
+
+    for i in range(0, num_options):
+        if shifted:
+            vols[i] = vol_function_shifted_sabr(params[i], f[i], k[i], t[i])
+        else:
+            vols[i] = vol_function_sabr(params[i], f[i], k[i], t[i])
+
+    return vols
+
+###############################################################################
+
+
+def _black_prices(f, k, t, v, is_call):
+    """ Undiscounted Black prices of arrays of options with the same guards
+    as the Black model. """
+
+    if np.any(f <= 0.0):
+        raise FinError("Forward is zero.")
+
+    if np.any(k <= 0.0):
+        raise FinError("Strike is zero.")
+
+    t = np.maximum(t, gSmall)
+    v = np.maximum(v, gSmall)
+    k = np.maximum(k, gSmall)
+    sqrt_t = np.sqrt(t)
+
+    d1 = (np.log(f/k) + v * v * t / 2.0) / (v * sqrt_t)
+    d2 = d1 - v * sqrt_t
+
+    if is_call:
+        return f * n_vect(d1) - k * n_vect(d2)
+    else:
+        return k * n_vect(-d2) - f * n_vect(-d1)
+
+###############################################################################
+
+
+class IborSwaptionGrid():
+    """ A grid of European-style swaptions with one swaption for each pair of
+    exercise date and swap tenor. The forward swap rates and annuities of all
+    of the underlying swaps are found together and every strike can then be
+    valued in one array calculation using the Black, BlackShifted, SABR,
+    SABRShifted or Bachelier models. This is much faster than valuing each
+    swaption with IborSwaption when marking a swaption volatility cube. """
+
+    def __init__(self,
+                 settle_dt: Date,
+                 exercise_dts: (list, SwaptionVolSurface),
+                 swap_tenors: list,
+                 fixed_freq_type: FrequencyTypes,
+                 fixed_dc_type: DayCountTypes,
+                 notional: float = ONE_MILLION,
+                 cal_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 bd_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
+                 dg_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD):
+        """ Create the grid of swaptions from a list of exercise dates and a
+        list of tenors of the underlying swaps such as "1Y" or "10Y". The
+        exercise dates of a SwaptionVolSurface can be used by passing in the
+        surface. The fixed leg details are the same for every swap and the
+        swap schedules are generated here once. """
+
+        check_argument_types(self.__init__, locals())
+
+        if isinstance(exercise_dts, SwaptionVolSurface):
+            exercise_dts = exercise_dts._expiry_dts
+
+        if len(exercise_dts) == 0 or len(swap_tenors) == 0:
+            raise FinError("Need at least one exercise date and tenor.")
+
+        for exercise_dt in exercise_dts:
+            if settle_dt > exercise_dt:
+                raise FinError("Settlement date must be before expiry date")
+
+        self._settle_dt = settle_dt
+        self._exercise_dts = exercise_dts
+        self._swap_tenors = swap_tenors
+        self._fixed_freq_type = fixed_freq_type
+        self._fixed_dc_type = fixed_dc_type
+        self._notional = notional
+        self._cal_type = cal_type
+        self._bd_type = bd_type
+        self._dg_type = dg_type
+
+        num_exercises = len(exercise_dts)
+        num_tenors = len(swap_tenors)
+
+        pay_serials = []
+        year_fracs = []
+        flow_ptr = [0]
+        maturity_serials = []
+
+        for exercise_dt in exercise_dts:
+            for tenor in swap_tenors:
+
+                leg = SwapFixedLeg(exercise_dt,
+                                   tenor,
+                                   SwapTypes.PAY,
+                                   0.0,
+                                   fixed_freq_type,
+                                   fixed_dc_type,
+                                   1.0,
+                                   0.0,
+                                   0,
+                                   cal_type,
+                                   bd_type,
+                                   dg_type)
+
+                pay_serials += list(leg._pay_serials)
+                year_fracs += leg._year_fracs
+                flow_ptr.append(len(pay_serials))
+                maturity_serials.append(leg._maturity_dt._excel_dt)
+
+        self._pay_serials = np.array(pay_serials)
+        self._year_fracs = np.array(year_fracs)
+        self._flow_ptr = np.array(flow_ptr)
+        self._exercise_serials = np.array([dt._excel_dt
+                                           for dt in exercise_dts])
+        self._maturity_serials = np.array(maturity_serials)
+
+        self._t_exp = np.array([(dt - settle_dt) / gDaysInYear
+                                for dt in exercise_dts])
+
+        self._shape = (num_exercises, num_tenors)
+
+###############################################################################
+
+    def fwd_swap_rates(self,
+                       value_dt: Date,
+                       discount_curve: DiscountCurve):
+        """ Return the PV01 per unit notional and the forward swap rate of the
+        swap underlying each swaption as two arrays with a row for each
+        exercise date and a column for each tenor. These are the same as the
+        pv01 and swap_rate of the underlying IborSwap. The discount factors
+        are found with one call to the curve. """
+
+        num_swaps = len(self._maturity_serials)
+        num_exercises = len(self._exercise_serials)
+        num_flows = len(self._pay_serials)
+
+        serials = np.concatenate((self._pay_serials,
+                                  self._maturity_serials,
+                                  self._exercise_serials))
+
+        dfs = np.array(discount_curve.df(DateArray(serials))).reshape(-1)
+        df_value = discount_curve.df(value_dt)
+
+        pay_dfs = dfs[0:num_flows]
+        maturity_dfs = dfs[num_flows:num_flows + num_swaps]
+        exercise_dfs = dfs[num_flows + num_swaps:]
+
+        # The fixed leg only includes payments after the value date
+        is_future = self._pay_serials > value_dt._excel_dt
+        pv = np.where(is_future, self._year_fracs * pay_dfs / df_value, 0.0)
+        cum_pv = np.concatenate(([0.0], np.cumsum(pv)))
+        pv01 = cum_pv[self._flow_ptr[1:]] - cum_pv[self._flow_ptr[:-1]]
+
+        if np.any(np.abs(pv01) < gSmall):
+            raise FinError("PV01 is zero. Cannot compute swap rate.")
+
+        # The floating leg starts on the exercise date unless this has passed
+        df0 = np.where(self._exercise_serials > value_dt._excel_dt,
+                       exercise_dfs, df_value)
+        df0 = np.repeat(df0, num_swaps // num_exercises)
+
+        fwds = (df0 - maturity_dfs) / pv01
+
+        return pv01.reshape(self._shape), fwds.reshape(self._shape)
+
+###############################################################################
+
+    def value(self,
+              value_dt: Date,
+              discount_curve: DiscountCurve,
+              strikes: np.ndarray,
+              model,
+              fixed_leg_type: SwapTypes = SwapTypes.PAY):
+        """ Value every swaption in the grid at each strike. The strikes can
+        be a vector applied to every swaption or an array with a row for each
+        exercise date, a column for each tenor and the strikes in the last
+        dimension. The model parameters can be scalars or arrays that have or
+        broadcast to this shape so that a volatility cube can be used. The
+        values are returned in an array with the same shape. """
+
+        strikes = np.asarray(strikes, dtype=np.float64)
+
+        if strikes.ndim == 1:
+            strikes = strikes[np.newaxis, np.newaxis, :]
+        elif strikes.ndim != 3:
+            raise FinError("Strikes must be a vector or a 3D array.")
+
+        shape = self._shape + (strikes.shape[2],)
+
+        pv01, fwds = self.fwd_swap_rates(value_dt, discount_curve)
+
+        f = np.broadcast_to(fwds[:, :, np.newaxis], shape)
+        k = np.broadcast_to(strikes, shape)
+        t = np.broadcast_to(self._t_exp[:, np.newaxis, np.newaxis], shape)
+
+        if fixed_leg_type == SwapTypes.PAY:
+            is_call = True
+        elif fixed_leg_type == SwapTypes.RECEIVE:
+            is_call = False
+        else:
+            raise FinError("Unknown swaption option type" +
+                           str(fixed_leg_type))
+
+        # Discounting is done via the PV01 annuity so no discounting here
+        if isinstance(model, Black):
+
+            v = np.broadcast_to(model._volatility, shape)
+            prices = _black_prices(f, k, t, v, is_call)
+
+        elif isinstance(model, BlackShifted):
+
+            s = np.broadcast_to(model._shift, shape)
+            v = np.broadcast_to(model._volatility, shape)
+            sqrt_t = np.sqrt(t)
+
+            d1 = np.log((f+s)/(k+s)) + v * v * t / 2
+            d1 = d1 / (v * sqrt_t)
+            d2 = d1 - v * sqrt_t
+
+            if is_call:
+                prices = (f+s) * n_vect(d1) - (k+s) * n_vect(d2)
+            else:
+                prices = (k+s) * n_vect(-d2) - (f+s) * n_vect(-d1)
+
+        elif isinstance(model, (SABR, SABRShifted)):
+
+            shifted = isinstance(model, SABRShifted)
+
+            params = [model._alpha, model._beta, model._rho, model._nu]
+            if shifted:
+                params.append(model._shift)
+
+            params = np.stack([np.broadcast_to(p, shape).ravel()
+                               for p in params], axis=1)
+            params = params.astype(np.float64)
+
+            v = _sabr_vols(params, f.ravel(), k.ravel(), t.ravel(), shifted)
+            v = v.reshape(shape)
+            sqrt_t = np.sqrt(t)
+
+            # As in the SABR models the Black formula uses unshifted rates
+            d1 = (np.log(f/k) + v * v * t / 2) / (v * sqrt_t)
+            d2 = d1 - v * sqrt_t
+
+            if is_call:
+                prices = f * n_vect(d1) - k * n_vect(d2)
+            else:
+                prices = k * n_vect(-d2) - f * n_vect(-d1)
+
+        elif isinstance(model, Bachelier):
+
+            v = np.broadcast_to(model._volatility, shape)
+            root_t = np.sqrt(t)
+            d = (f - k) / (v * root_t)
+
+            if is_call:
+                prices = (f - k) * norm.cdf(d) + v * root_t * norm.pdf(d)
+            else:
+                prices = (k - f) * norm.cdf(-d) + v * root_t * norm.pdf(d)
+
+        else:
+            raise FinError("Unknown swaption model " + str(model))
+
+        # The exchange of cash occurs on the settlement date
+        df_settle = discount_curve.df(self._settle_dt)
+        prices = prices * pv01[:, :, np.newaxis] * self._notional / df_settle
+        return prices
+
+###############################################################################
+
+    def __repr__(self):
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("SETTLEMENT DATE", self._settle_dt)
+        s += label_to_string("EXERCISE DATES", self._exercise_dts)
+        s += label_to_string("SWAP TENORS", self._swap_tenors)
+        s += label_to_string("FIXED FREQUENCY", self._fixed_freq_type)
+        s += label_to_string("FIXED DAY COUNT", self._fixed_dc_type)
+        s += label_to_string("NOTIONAL", self._notional)
+        s += label_to_string("CALENDAR", self._cal_type)
+        s += label_to_string("BUS DAY ADJUST", self._bd_type)
+        s += label_to_string("DATE GEN TYPE", self._dg_type)
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
@@ -154,6 +154,28 @@ class OIS:
         value = fixed_leg_value + float_leg_value
         return value
 
+###############################################################################
+
+    def value_and_gradient(self,
+                           value_dt: Date,
+                           ois_curve: DiscountCurve,
+                           first_fixing_rate=None):
+        """ Value the OIS and return this value with its gradient with
+        respect to the pillar discount factors of the OIS curve. This is found
+        using a backward sweep through each leg. """
+
+        fixed_leg_value, fixed_grad = \
+            self._fixed_leg.value_and_gradient(value_dt, ois_curve)
+
+        float_leg_value, float_grad, index_grad = \
+            self._float_leg.value_and_gradient(value_dt,
+                                               ois_curve,
+                                               ois_curve,
+                                               first_fixing_rate)
+
+        value = fixed_leg_value + float_leg_value
+        return value, fixed_grad + float_grad + index_grad
+
 ##########################################################################
 
     def pv01(self, value_dt, discount_curve):
@@ -0,0 +1,547 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import time
+from typing import Optional, Union
+
+import numpy as np
+from numba import njit
+from scipy.optimize import least_squares
+
+from ...utils.error import FinError
+from ...utils.date import Date
+from ...utils.day_count import DayCount
+from ...utils.global_vars import gDaysInYear
+from ...utils.math import N, nprime
+from ...utils.helpers import label_to_string, check_argument_types
+from ...utils.global_types import SwapTypes, FinCapFloorTypes
+from ...utils.global_types import FinExerciseTypes
+from ...market.curves.discount_curve import DiscountCurve
+from ...market.curves.interpolator import InterpTypes, _uinterpolate
+from ...market.curves.jit_curve import flat_fwd_curve
+from ...models.hw_tree import HWTree
+from ...models.bk_tree import BKTree
+from ...models.bk_tree import option_exercise_types_to_int
+from ...models.bdt_tree import BDTTree
+from ...models.bk_tree import build_tree_fast as bk_build_tree_fast
+from ...models.bdt_tree import build_tree_fast as bdt_build_tree_fast
+from ...models.bk_tree import bermudan_swaption_tree_fast as bk_swaption_fast
+from ...models.bdt_tree import bermudan_swaption_tree_fast \
+    as bdt_swaption_fast
+from .ibor_swap import IborSwap
+
+interp = InterpTypes.FLAT_FWD_RATES.value
+
+###############################################################################
+# Each calibration instrument is held as an option to exchange a unit of
+# principal at the exercise time for a strip of fixed flows, which is how the
+# tree models value a European swaption. A caplet is an option of this type
+# with a single flow. The Hull-White prices use Jamshidian's decomposition
+# with the analytic derivative with respect to sigma. At the critical short
+# rate the strike terms of this derivative cancel so only the volatility of
+# each zero coupon bond option contributes. The tree models are calibrated by
+# building one tree for each trial set of parameters on a fixed time grid and
+# then valuing all of the instruments on that tree.
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _hw_prices(sigma, a, t_exps, flow_ptr, flow_times, flow_amounts,
+               is_payer, df_times, df_values):
+    """ Jamshidian prices per unit face of options to pay (payer) or receive
+    (receiver) the fixed flows against par at the exercise time together
+    with their derivatives with respect to sigma. """
+
+    if abs(a) < 1e-10:
+        a = 1e-10
+
+    num_options = len(t_exps)
+    prices = np.zeros(num_options)
+    vegas = np.zeros(num_options)
+
+    delta = 1e-6
+
+    for i in range(0, num_options):
+
+        t_exp = t_exps[i]
+        pt_exp = _uinterpolate(t_exp, df_times, df_values, interp)
+        pt_delta = _uinterpolate(t_exp + delta, df_times, df_values, interp)
+
+        first = flow_ptr[i]
+        last = flow_ptr[i + 1]
+        num_flows = last - first
+
+        log_a = np.zeros(num_flows)
+        b_hat = np.zeros(num_flows)
+        pts = np.zeros(num_flows)
+        cpns = np.zeros(num_flows)
+
+        b_delta = (1.0 - np.exp(-a * delta)) / a
+        var_term = sigma * sigma * (1.0 - np.exp(-2.0 * a * t_exp)) / (4.0 * a)
+
+        for j in range(0, num_flows):
+            t = flow_times[first + j]
+            cpns[j] = flow_amounts[first + j]
+            pts[j] = _uinterpolate(t, df_times, df_values, interp)
+            b_t = (1.0 - np.exp(-a * (t - t_exp))) / a
+            log_a[j] = np.log(pts[j] / pt_exp) \
+                - (b_t / b_delta) * np.log(pt_delta / pt_exp) \
+                - var_term * b_t * (b_t - b_delta)
+            b_hat[j] = (b_t / b_delta) * delta
+
+        # The principal is paid with the last flow
+        cpns[num_flows - 1] += 1.0
+
+        # Newton search for the short rate that sets the flows to par
+        r = 0.0
+        for _ in range(0, 100):
+            f = -1.0
+            df = 0.0
+            for j in range(0, num_flows):
+                p = cpns[j] * np.exp(log_a[j] - b_hat[j] * r)
+                f += p
+                df -= b_hat[j] * p
+            step = f / df
+            r -= step
+            if abs(step) < 1e-14:
+                break
+
+        price = 0.0
+        vega = 0.0
+
+        for j in range(0, num_flows):
+
+            t = flow_times[first + j]
+            strike = np.exp(log_a[j] - b_hat[j] * r)
+
+            sigmap = (sigma / a) * (1.0 - np.exp(-a * (t - t_exp)))
+            sigmap *= np.sqrt((1.0 - np.exp(-2.0 * a * t_exp)) / 2.0 / a)
+
+            if abs(sigmap) < 1e-10:
+                sigmap = 1e-10
+
+            h = np.log(pts[j] / (strike * pt_exp)) / sigmap + sigmap / 2.0
+
+            if is_payer[i]:
+                v = strike * pt_exp * N(-h + sigmap) - pts[j] * N(-h)
+            else:
+                v = pts[j] * N(h) - strike * pt_exp * N(h - sigmap)
+
+            price += cpns[j] * v
+            vega += cpns[j] * pts[j] * nprime(h) * sigmap / sigma
+
+        prices[i] = price
+        vegas[i] = vega
+
+    return prices, vegas
+
+###############################################################################
+
+
+class RatesModelCalibrator():
+    """ Calibrate the Hull-White, Black-Karasinski or Black-Derman-Toy short
+    rate models to the market prices of a strip of European swaptions and of
+    caps or floors. The instruments are converted once into arrays of flows
+    and the model prices of the whole strip are found together. The Hull-
+    White model uses Jamshidian's analytic prices and analytic derivatives
+    with respect to sigma. The tree models build one tree for each trial set
+    of parameters and value all of the instruments on it. """
+
+    def __init__(self,
+                 value_dt: Date,
+                 discount_curve: DiscountCurve,
+                 swaptions: list,
+                 swaption_prices: (list, np.ndarray),
+                 caps: Optional[list] = None,
+                 cap_prices: Optional[Union[list, np.ndarray]] = None):
+        """ Create the calibrator from a value date, the discount curve used
+        to value the instruments and lists of IborSwaption and IborCapFloor
+        objects with their market prices. These are the prices given by the
+        value functions of these products for the same notional. """
+
+        check_argument_types(self.__init__, locals())
+
+        if caps is None:
+            caps = []
+
+        if cap_prices is None:
+            cap_prices = []
+
+        if len(swaptions) != len(swaption_prices):
+            raise FinError("Need one market price for each swaption.")
+
+        if len(caps) != len(cap_prices):
+            raise FinError("Need one market price for each cap.")
+
+        if len(swaptions) + len(caps) == 0:
+            raise FinError("No calibration instruments.")
+
+        self._value_dt = value_dt
+        self._discount_curve = discount_curve
+        self._df_times = discount_curve._times
+        self._dfs = discount_curve._dfs
+
+        t_exps = []
+        flow_times = []
+        flow_amounts = []
+        flow_ptr = [0]
+        is_payer = []
+        scales = []
+        offsets = []
+
+        for swaption in swaptions:
+            self._add_swaption(swaption, t_exps, flow_times, flow_amounts,
+                               flow_ptr, is_payer, scales, offsets)
+
+        # The caplets of each cap are options that are added together
+        self._cap_index = []
+        for i_cap, cap in enumerate(caps):
+            self._add_cap(cap, len(swaptions) + i_cap, t_exps, flow_times,
+                          flow_amounts, flow_ptr, is_payer, scales)
+            offsets.append(self._first_caplet_value(cap))
+
+        self._t_exps = np.array(t_exps)
+        self._flow_times = np.array(flow_times)
+        self._flow_amounts = np.array(flow_amounts)
+        self._flow_ptr = np.array(flow_ptr)
+        self._is_payer = np.array(is_payer)
+        self._scales = np.array(scales)
+        self._offsets = np.array(offsets)
+
+        self._num_instruments = len(swaptions) + len(caps)
+        self._option_index = np.array(list(range(0, len(swaptions))) +
+                                      self._cap_index)
+
+        self._market_prices = np.concatenate((np.array(swaption_prices,
+                                                       dtype=np.float64),
+                                              np.array(cap_prices,
+                                                       dtype=np.float64)))
+
+        if np.any(self._market_prices <= 0.0):
+            raise FinError("Market prices must be positive.")
+
+        self._tree_maturity = np.max(self._flow_times)
+
+###############################################################################
+
+    def _add_swaption(self, swaption, t_exps, flow_times, flow_amounts,
+                      flow_ptr, is_payer, scales, offsets):
+        """ Convert a European swaption into its fixed flows after expiry in
+        the same way as IborSwaption.value. """
+
+        swap = IborSwap(swaption._exercise_dt,
+                        swaption._maturity_dt,
+                        swaption._fixed_leg_type,
+                        swaption._fixed_coupon,
+                        swaption._fixed_freq_type,
+                        swaption._fixed_dc_type,
+                        swaption._notional,
+                        0.0,
+                        swaption._float_freq_type,
+                        swaption._float_dc_type,
+                        swaption._cal_type,
+                        swaption._bd_type,
+                        swaption._dg_type)
+
+        value_dt = self._value_dt
+        t_exp = (swaption._exercise_dt - swaption._settle_dt) / gDaysInYear
+
+        fixed_leg = swap._fixed_leg
+
+        for flow_dt, payment in zip(fixed_leg._payment_dts,
+                                    fixed_leg._payments):
+            if flow_dt > swaption._exercise_dt:
+                flow_times.append((flow_dt - value_dt) / gDaysInYear)
+                flow_amounts.append(payment / swaption._notional)
+
+        if len(flow_times) == flow_ptr[-1]:
+            raise FinError("Swaption has no flows after expiry.")
+
+        t_exps.append(t_exp)
+        flow_ptr.append(len(flow_times))
+        is_payer.append(swaption._fixed_leg_type == SwapTypes.PAY)
+
+        df_settle = self._discount_curve.df(swaption._settle_dt)
+        scales.append(swaption._notional / df_settle)
+        offsets.append(0.0)
+
+###############################################################################
+
+    def _add_cap(self, cap, index, t_exps, flow_times, flow_amounts,
+                 flow_ptr, is_payer, scales):
+        """ Convert each caplet or floorlet after the first into an option on
+        a single flow in the same way as IborCapFloor.value. """
+
+        cap._generate_dts()
+        dts = cap._capFloorLetDates
+        day_counter = DayCount(cap._dc_type)
+        k = cap._strike_rate
+
+        if len(dts) <= 2:
+            raise FinError("Cap must have at least two caplets.")
+
+        for i in range(2, len(dts)):
+
+            start_dt = dts[i - 1]
+            end_dt = dts[i]
+            alpha = day_counter.year_frac(start_dt, end_dt)[0]
+
+            t_exps.append((start_dt - cap._start_dt) / gDaysInYear)
+            flow_times.append((end_dt - self._value_dt) / gDaysInYear)
+            flow_amounts.append(k * alpha)
+            flow_ptr.append(len(flow_times))
+            is_payer.append(cap._option_type == FinCapFloorTypes.CAP)
+            scales.append(cap._notional)
+            self._cap_index.append(index)
+
+###############################################################################
+
+    def _first_caplet_value(self, cap):
+        """ The first caplet has a known payoff as in IborCapFloor.value. """
+
+        curve = self._discount_curve
+        start_dt = cap._capFloorLetDates[0]
+        end_dt = cap._capFloorLetDates[1]
+
+        if cap._last_fixing is None:
+            fwd_rate = curve.fwd_rate(start_dt, end_dt, cap._dc_type)
+        else:
+            fwd_rate = cap._last_fixing
+
+        alpha = DayCount(cap._dc_type).year_frac(start_dt, end_dt)[0]
+        df = curve.df(end_dt)
+
+        if cap._option_type == FinCapFloorTypes.CAP:
+            v = df * alpha * max(fwd_rate - cap._strike_rate, 0.0)
+        else:
+            v = df * alpha * max(cap._strike_rate - fwd_rate, 0.0)
+
+        return v * cap._notional
+
+###############################################################################
+
+    def _sum_options(self, option_prices):
+        """ Add the option prices of each instrument together. """
+
+        values = self._offsets.copy()
+        np.add.at(values, self._option_index,
+                  option_prices * self._scales)
+        return values
+
+###############################################################################
+
+    def _tree_grid(self, num_time_steps):
+        """ Tree times out to the last flow and the discount factors on them.
+        These do not change during the calibration. """
+
+        tree_mat = self._tree_maturity
+        tree_mat = tree_mat * (num_time_steps + 1) / num_time_steps
+        tree_times = np.linspace(0.0, tree_mat, num_time_steps + 2)
+
+        tree_dfs = np.zeros(num_time_steps + 2)
+        tree_dfs[0] = 1.0
+        for i in range(1, num_time_steps + 2):
+            tree_dfs[i] = _uinterpolate(tree_times[i], self._df_times,
+                                        self._dfs, interp)
+
+        return tree_times, tree_dfs
+
+###############################################################################
+
+    def _tree_prices(self, model, sigma, a, tree_times, tree_dfs):
+        """ Build one BK or BDT tree for the model parameters and value every
+        option on it as a European swaption. """
+
+        num_time_steps = model._num_time_steps
+        num_options = len(self._t_exps)
+        prices = np.zeros(num_options)
+        ex_int = option_exercise_types_to_int(FinExerciseTypes.EUROPEAN)
+
+        if isinstance(model, BKTree):
+            curve = flat_fwd_curve(self._df_times, self._dfs)
+            Q, pu, pm, pd, rt, dt = bk_build_tree_fast(a, sigma, tree_times,
+                                                       num_time_steps, curve)
+        else:
+            Q, rt, dt = bdt_build_tree_fast(sigma, tree_times,
+                                            num_time_steps, tree_dfs)
+
+        for i in range(0, num_options):
+
+            first = self._flow_ptr[i]
+            last = self._flow_ptr[i + 1]
+
+            cpn_times = np.concatenate(([self._t_exps[i]],
+                                        self._flow_times[first:last]))
+            cpn_flows = np.concatenate(([0.0],
+                                        self._flow_amounts[first:last]))
+
+            t_exp = self._t_exps[i]
+            t_mat = cpn_times[-1]
+
+            if isinstance(model, BKTree):
+                pay, rec = bk_swaption_fast(t_exp, t_mat, 1.0, 1.0,
+                                            cpn_times, cpn_flows, ex_int,
+                                            self._df_times, self._dfs,
+                                            tree_times, Q, pu, pm, pd, rt,
+                                            dt, a)
+            else:
+                pay, rec = bdt_swaption_fast(t_exp, t_mat, 1.0, 1.0,
+                                             cpn_times, cpn_flows, ex_int,
+                                             self._df_times, self._dfs,
+                                             tree_times, Q, rt, dt)
+
+            prices[i] = pay if self._is_payer[i] else rec
+
+        return prices
+
+###############################################################################
+
+    def model_prices(self,
+                     model):
+        """ Return the price of each calibration instrument using a HWTree,
+        BKTree or BDTTree model. The Hull-White model uses Jamshidian's
+        analytic prices. The tree models value all of the instruments on one
+        tree that extends to the last flow of the strip. """
+
+        if isinstance(model, HWTree):
+            prices, _ = _hw_prices(model._sigma, model._a, self._t_exps,
+                                   self._flow_ptr, self._flow_times,
+                                   self._flow_amounts, self._is_payer,
+                                   self._df_times, self._dfs)
+        elif isinstance(model, BKTree):
+            tree_times, tree_dfs = self._tree_grid(model._num_time_steps)
+            prices = self._tree_prices(model, model._sigma, model._a,
+                                       tree_times, tree_dfs)
+        elif isinstance(model, BDTTree):
+            tree_times, tree_dfs = self._tree_grid(model._num_time_steps)
+            prices = self._tree_prices(model, model._sigma, 0.0,
+                                       tree_times, tree_dfs)
+        else:
+            raise FinError("Unknown model type " + str(model))
+
+        return self._sum_options(prices)
+
+###############################################################################
+
+    def calibrate(self,
+                  model,
+                  fix_a: bool = True,
+                  tol: float = 1e-10):
+        """ Calibrate the volatility of a HWTree, BKTree or BDTTree model, and
+        also its mean reversion a if fix_a is False, so that the squared
+        relative differences between the model and market prices are as small
+        as possible. The model passed in gives the starting parameters and is
+        not changed. A dictionary holds the calibrated model, its parameters,
+        the pricing errors, the number of function and Jacobian evaluations
+        and the time taken in seconds. """
+
+        start = time.time()
+
+        market = self._market_prices
+        is_hw = isinstance(model, HWTree)
+        is_bdt = isinstance(model, BDTTree)
+
+        if not (is_hw or is_bdt or isinstance(model, BKTree)):
+            raise FinError("Unknown model type " + str(model))
+
+        if is_bdt:
+            fix_a = True
+            a0 = 0.0
+        else:
+            a0 = model._a
+
+        if fix_a:
+            x0 = np.array([model._sigma])
+            lower = [1e-8]
+            upper = [np.inf]
+        else:
+            x0 = np.array([model._sigma, a0])
+            lower = [1e-8, 1e-6]
+            upper = [np.inf, np.inf]
+
+        def params(x):
+            if fix_a:
+                return x[0], a0
+            return x[0], x[1]
+
+        if is_hw:
+
+            def hw_values(x):
+                sigma, a = params(x)
+                prices, vegas = _hw_prices(sigma, a, self._t_exps,
+                                           self._flow_ptr, self._flow_times,
+                                           self._flow_amounts,
+                                           self._is_payer, self._df_times,
+                                           self._dfs)
+                return self._sum_options(prices), \
+                    self._sum_options(vegas) - self._offsets
+
+            def fn(x):
+                return hw_values(x)[0] / market - 1.0
+
+            def jac(x):
+                sigma, a = params(x)
+                derivs = np.zeros((self._num_instruments, len(x)))
+                derivs[:, 0] = hw_values(x)[1] / market
+
+                # The mean reversion derivative uses a central difference
+                if not fix_a:
+                    h = 1e-6
+                    up = hw_values(np.array([sigma, a + h]))[0]
+                    down = hw_values(np.array([sigma, a - h]))[0]
+                    derivs[:, 1] = (up - down) / (2.0 * h) / market
+
+                return derivs
+
+        else:
+
+            tree_times, tree_dfs = self._tree_grid(model._num_time_steps)
+
+            def fn(x):
+                sigma, a = params(x)
+                prices = self._tree_prices(model, sigma, a,
+                                           tree_times, tree_dfs)
+                return self._sum_options(prices) / market - 1.0
+
+            jac = '2-point'
+
+        result = least_squares(fn, x0, jac=jac, bounds=(lower, upper),
+                               xtol=tol, ftol=tol, gtol=tol)
+
+        sigma, a = params(result.x)
+
+        if is_hw:
+            calibrated = HWTree(sigma, a, model._num_time_steps,
+                                model._europeanCalcType)
+        elif is_bdt:
+            calibrated = BDTTree(sigma, model._num_time_steps)
+        else:
+            calibrated = BKTree(sigma, a, model._num_time_steps)
+
+        errors = result.fun * market
+
+        return {'model': calibrated,
+                'sigma': sigma,
+                'a': a,
+                'errors': errors,
+                'num_fn_evals': result.nfev,
+                'num_jac_evals': result.njev,
+                'time': time.time() - start}
+
+###############################################################################
+
+    def __repr__(self):
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("VALUE DATE", self._value_dt)
+        s += label_to_string("NUM INSTRUMENTS", self._num_instruments)
+        s += label_to_string("NUM OPTIONS", len(self._t_exps))
+        s += label_to_string("LAST FLOW TIME", self._tree_maturity)
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
@@ -2,8 +2,10 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.error import FinError
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.math import ONE_MILLION
 from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.frequency import FrequencyTypes
@@ -13,6 +15,7 @@ from ...utils.schedule import Schedule
 from ...utils.helpers import format_table, label_to_string, check_argument_types
 from ...utils.global_types import SwapTypes
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.curves.curve_adjoint import df_adjoint
 
 ##########################################################################
 
@@ -77,6 +80,7 @@ class SwapFixedLeg:
         self._year_fracs = []
         self._accrued_days = []
         self._rates = []
+        self._valuation = None
 
         self.generate_payments()
 
@@ -116,7 +120,14 @@ class SwapFixedLeg:
         day_counter = DayCount(self._dc_type)
         calendar = Calendar(self._cal_type)
 
-        for next_dt in scheduleDates[1:]:
+        # The accrual factors of all periods are found in one call
+        (year_fracs, nums, _) = day_counter.year_fracs(scheduleDates[:-1],
+                                                       scheduleDates[1:])
+        year_fracs = year_fracs.tolist()
+        nums = nums.tolist()
+
+        for next_dt, year_frac, num in zip(scheduleDates[1:], year_fracs,
+                                           nums):
 
             self._start_accrued_dts.append(prev_dt)
             self._end_accrued_dts.append(next_dt)
@@ -129,9 +140,6 @@ class SwapFixedLeg:
 
             self._payment_dts.append(payment_dt)
 
-            (year_frac, num, den) = day_counter.year_frac(prev_dt,
-                                                          next_dt)
-
             self._rates.append(self._cpn)
 
             payment = year_frac * self._notional * self._cpn
@@ -142,36 +150,73 @@ class SwapFixedLeg:
 
             prev_dt = next_dt
 
+        # Serials used to value the leg without looping over Dates
+        self._pay_serials = np.array([dt._excel_dt
+                                      for dt in self._payment_dts])
+        self._valuation = None
+
 ###############################################################################
 
     def value(self,
               value_dt: Date,
               discount_curve: DiscountCurve):
+        """ Value the fixed leg on a value date using a discount curve. All of
+        the future payment dates are discounted in one call to the curve. The
+        discount factors are kept so that the table of payment values can be
+        filled in later by print_valuation. """
+
+        df_value = discount_curve.df(value_dt)
+
+        is_future = self._pay_serials > value_dt._excel_dt
+        dfs = np.zeros(0)
+        leg_pv = 0.0
+
+        if np.any(is_future):
+
+            pmnt_dts = DateArray(self._pay_serials[is_future])
+            dfs = np.array(discount_curve.df(pmnt_dts)).reshape(-1)
+            dfs = dfs / df_value
+
+            # The payments are the single source of the coupon amounts
+            amounts = np.array(self._payments)[is_future]
+
+            leg_pv = np.sum(amounts * dfs)
+            leg_pv += self._principal * dfs[-1] * self._notional
+
+        self._valuation = (is_future, dfs)
+
+        if self._leg_type == SwapTypes.PAY:
+            leg_pv = leg_pv * (-1.0)
+
+        return float(leg_pv)
+
+##########################################################################
+
+    def _fill_valuation_table(self):
+        """ Fill in the discount factor, present value and cumulative present
+        value of each payment from the last valuation. """
+
+        is_future, dfs = self._valuation
 
         self._paymentDfs = []
         self._payment_pvs = []
         self._cumulativePVs = []
 
-        notional = self._notional
-        dfValue = discount_curve.df(value_dt)
         leg_pv = 0.0
-        numPayments = len(self._payment_dts)
-
-        dfPmnt = 0.0
+        i_df = 0
 
-        for iPmnt in range(0, numPayments):
+        for iPmnt in range(0, len(self._payment_dts)):
 
-            pmntDate = self._payment_dts[iPmnt]
-            pmntAmount = self._payments[iPmnt]
+            if is_future[iPmnt]:
 
-            if pmntDate > value_dt:
+                dfPmnt = dfs[i_df]
+                i_df += 1
 
-                dfPmnt = discount_curve.df(pmntDate) / dfValue
-                pmntPV = pmntAmount * dfPmnt
+                pmntPV = self._payments[iPmnt] * dfPmnt
                 leg_pv += pmntPV
 
                 self._paymentDfs.append(dfPmnt)
-                self._payment_pvs.append(pmntAmount*dfPmnt)
+                self._payment_pvs.append(pmntPV)
                 self._cumulativePVs.append(leg_pv)
 
             else:
@@ -180,16 +225,53 @@ class SwapFixedLeg:
                 self._payment_pvs.append(0.0)
                 self._cumulativePVs.append(0.0)
 
-        if pmntDate > value_dt:
-            payment_pv = self._principal * dfPmnt * notional
+        if is_future[-1]:
+            payment_pv = self._principal * dfs[-1] * self._notional
             self._payment_pvs[-1] += payment_pv
             leg_pv += payment_pv
             self._cumulativePVs[-1] = leg_pv
 
+##########################################################################
+
+    def value_and_gradient(self,
+                           value_dt: Date,
+                           discount_curve: DiscountCurve):
+        """ Value the fixed leg and return this value with its gradient with
+        respect to the pillar discount factors of the discount curve. The
+        gradient is found in a single backward sweep through the payments. """
+
+        sign = 1.0
         if self._leg_type == SwapTypes.PAY:
-            leg_pv = leg_pv * (-1.0)
+            sign = -1.0
+
+        pmnt_dts = []
+        amounts = []
+
+        for pmnt_dt, amount in zip(self._payment_dts, self._payments):
+            if pmnt_dt > value_dt:
+                pmnt_dts.append(pmnt_dt)
+                amounts.append(amount)
 
-        return leg_pv
+        if len(pmnt_dts) == 0:
+            return 0.0, df_adjoint(discount_curve, [], [])
+
+        amounts = np.array(amounts)
+        amounts[-1] += self._principal * self._notional
+
+        df_value = discount_curve.df(value_dt)
+        dfs = np.array(discount_curve.df(pmnt_dts)).reshape(-1)
+
+        leg_pv = sign * np.sum(amounts * dfs) / df_value
+
+        # Backward sweep
+        dfs_bar = sign * amounts / df_value
+        df_value_bar = -leg_pv / df_value
+
+        grad = df_adjoint(discount_curve,
+                          pmnt_dts + [value_dt],
+                          np.append(dfs_bar, df_value_bar))
+
+        return leg_pv, grad
 
 ##########################################################################
 
@@ -242,10 +324,12 @@ class SwapFixedLeg:
         print("FREQUENCY:", str(self._freq_type))
         print("DAY COUNT:", str(self._dc_type))
 
-        if len(self._payments) == 0:
+        if self._valuation is None:
             print("Payments not calculated.")
             return
 
+        self._fill_valuation_table()
+
         header = ["PAY_NUM", "PAY_dt", "NOTIONAL",
                   "RATE", "PMNT", "DF", "PV", "CUM_PV"]
 
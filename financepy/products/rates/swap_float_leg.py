@@ -2,8 +2,10 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.error import FinError
-from ...utils.date import Date
+from ...utils.date import Date, DateArray
 from ...utils.math import ONE_MILLION
 from ...utils.day_count import DayCount, DayCountTypes
 from ...utils.frequency import FrequencyTypes
@@ -13,6 +15,7 @@ from ...utils.schedule import Schedule
 from ...utils.helpers import format_table, label_to_string, check_argument_types
 from ...utils.global_types import SwapTypes
 from ...market.curves.discount_curve import DiscountCurve
+from ...market.curves.curve_adjoint import df_adjoint
 
 ##########################################################################
 
@@ -77,6 +80,7 @@ class SwapFloatLeg:
         self._payments = []
         self._year_fracs = []
         self._accrued_days = []
+        self._valuation = None
 
         self.generate_payment_dts()
 
@@ -110,8 +114,15 @@ class SwapFloatLeg:
         day_counter = DayCount(self._dc_type)
         calendar = Calendar(self._cal_type)
 
+        # The accrual factors of all periods are found in one call
+        (year_fracs, nums, _) = day_counter.year_fracs(scheduleDates[:-1],
+                                                       scheduleDates[1:])
+        year_fracs = year_fracs.tolist()
+        nums = nums.tolist()
+
         # All of the lists end up with the same length
-        for next_dt in scheduleDates[1:]:
+        for next_dt, year_frac, num in zip(scheduleDates[1:], year_fracs,
+                                           nums):
 
             self._startAccruedDates.append(prev_dt)
             self._endAccruedDates.append(next_dt)
@@ -124,14 +135,22 @@ class SwapFloatLeg:
 
             self._payment_dts.append(payment_dt)
 
-            (year_frac, num, _) = day_counter.year_frac(prev_dt,
-                                                        next_dt)
-
             self._year_fracs.append(year_frac)
             self._accrued_days.append(num)
 
             prev_dt = next_dt
 
+        # Arrays used to value the leg without looping over Dates
+        self._start_serials = np.array([dt._excel_dt
+                                        for dt in self._startAccruedDates])
+        self._end_serials = np.array([dt._excel_dt
+                                      for dt in self._endAccruedDates])
+        self._pay_serials = np.array([dt._excel_dt
+                                      for dt in self._payment_dts])
+        self._accrual_factors = np.array(self._year_fracs)
+        self._index_alphas_cache = {}
+        self._valuation = None
+
 ###############################################################################
 
     def value(self,
@@ -142,7 +161,9 @@ class SwapFloatLeg:
         """ Value the floating leg with payments from an index curve and
         discounting based on a supplied discount curve as of the valuation date
         supplied. For an existing swap, the user must enter the next fixing
-        coupon. """
+        coupon. The discount factors needed are found in one call to each
+        curve and are kept so that the table of payment values can be filled
+        in later by print_valuation. """
 
         if discount_curve is None:
             raise FinError("Discount curve is None")
@@ -150,59 +171,118 @@ class SwapFloatLeg:
         if index_curve is None:
             index_curve = discount_curve
 
-        self._rates = []
-        self._payments = []
-        self._paymentDfs = []
-        self._paymentPVs = []
-        self._cumulativePVs = []
-
-        dfValue = discount_curve.df(value_dt)
-        leg_pv = 0.0
         numPayments = len(self._payment_dts)
-        firstPayment = False
 
         if not len(self._notional_array):
             self._notional_array = [self._notional] * numPayments
 
-        index_basis = index_curve._dc_type
-        index_day_counter = DayCount(index_basis)
+        is_future = self._pay_serials > value_dt._excel_dt
+        future = np.nonzero(is_future)[0]
+        num_future = len(future)
+
+        if num_future == 0:
+            self._valuation = (is_future, np.zeros(0), np.zeros(0),
+                               np.zeros(0))
+            return 0.0
 
-        for iPmnt in range(0, numPayments):
+        # The first coupon may already have been fixed
+        fixed_first = firstFixingRate is not None
+        projected = future[1:] if fixed_first else future
+        num_projected = len(projected)
 
-            pmntDate = self._payment_dts[iPmnt]
+        pmnt_serials = self._pay_serials[future]
+        index_serials = np.concatenate((self._start_serials[projected],
+                                        self._end_serials[projected]))
 
-            if pmntDate > value_dt:
+        df_value = discount_curve.df(value_dt)
 
-                startAccruedDt = self._startAccruedDates[iPmnt]
-                endAccruedDt = self._endAccruedDates[iPmnt]
-                pay_alpha = self._year_fracs[iPmnt]
+        if index_curve is discount_curve:
+            dts = DateArray(np.concatenate((pmnt_serials, index_serials)))
+            all_dfs = np.array(discount_curve.df(dts)).reshape(-1)
+            dfs = all_dfs[0:num_future]
+            index_dfs = all_dfs[num_future:]
+        else:
+            dfs = discount_curve.df(DateArray(pmnt_serials))
+            dfs = np.array(dfs).reshape(-1)
+            if num_projected > 0:
+                index_dfs = index_curve.df(DateArray(index_serials))
+                index_dfs = np.array(index_dfs).reshape(-1)
+            else:
+                index_dfs = np.zeros(0)
 
-                (index_alpha, num, _) = index_day_counter.year_frac(startAccruedDt,
-                                                                    endAccruedDt)
+        dfs = dfs / df_value
 
-                if firstPayment is False and firstFixingRate is not None:
+        index_alphas = self._index_alphas(index_curve)[projected]
+        df_starts = index_dfs[0:num_projected]
+        df_ends = index_dfs[num_projected:]
+        fwd_rates = (df_starts / df_ends - 1.0) / index_alphas
 
-                    fwd_rate = firstFixingRate
-                    firstPayment = True
+        if fixed_first:
+            fwd_rates = np.append(firstFixingRate, fwd_rates)
 
-                else:
+        notionals = np.array(self._notional_array)
+        amounts = (fwd_rates + self._spread) * \
+            self._accrual_factors[future] * notionals[future]
 
-                    df_start = index_curve.df(startAccruedDt)
-                    dfEnd = index_curve.df(endAccruedDt)
-                    fwd_rate = (df_start / dfEnd - 1.0) / index_alpha
+        leg_pv = np.sum(amounts * dfs)
+        leg_pv += self._principal * dfs[-1] * notionals[-1]
+
+        self._valuation = (is_future, fwd_rates, amounts, dfs)
+
+        if self._leg_type == SwapTypes.PAY:
+            leg_pv = leg_pv * (-1.0)
 
-                pmntAmount = (fwd_rate + self._spread) * pay_alpha * self._notional_array[iPmnt]
+        return float(leg_pv)
 
-                dfPmnt = discount_curve.df(pmntDate) / dfValue
-                pmntPV = pmntAmount * dfPmnt
+##########################################################################
+
+    def _index_alphas(self,
+                      index_curve: DiscountCurve):
+        """ Accrual factors of the index periods using the day count of the
+        index curve. These are kept for reuse by later valuations. """
+
+        dc_type = index_curve._dc_type
+
+        if dc_type not in self._index_alphas_cache:
+            day_counter = DayCount(dc_type)
+            alphas = day_counter.year_fracs(DateArray(self._start_serials),
+                                            DateArray(self._end_serials))[0]
+            self._index_alphas_cache[dc_type] = alphas
+
+        return self._index_alphas_cache[dc_type]
+
+##########################################################################
+
+    def _fill_valuation_table(self):
+        """ Fill in the rate, amount, discount factor, present value and
+        cumulative present value of each payment from the last valuation. """
+
+        is_future, fwd_rates, amounts, dfs = self._valuation
+
+        self._rates = []
+        self._payments = []
+        self._paymentDfs = []
+        self._paymentPVs = []
+        self._cumulativePVs = []
+
+        leg_pv = 0.0
+        i_flow = 0
+
+        for iPmnt in range(0, len(self._payment_dts)):
+
+            if is_future[iPmnt]:
+
+                pmntPV = amounts[i_flow] * dfs[i_flow]
                 leg_pv += pmntPV
 
-                self._rates.append(fwd_rate)
-                self._payments.append(pmntAmount)
-                self._paymentDfs.append(dfPmnt)
+                self._rates.append(fwd_rates[i_flow])
+                self._payments.append(amounts[i_flow])
+                self._paymentDfs.append(dfs[i_flow])
                 self._paymentPVs.append(pmntPV)
                 self._cumulativePVs.append(leg_pv)
 
+                i_flow += 1
+
             else:
 
                 self._rates.append(0.0)
@@ -211,16 +291,105 @@ class SwapFloatLeg:
                 self._paymentPVs.append(0.0)
                 self._cumulativePVs.append(leg_pv)
 
-        if pmntDate > value_dt:
-            paymentPV = self._principal * dfPmnt * self._notional_array[-1]
+        if is_future[-1]:
+            paymentPV = self._principal * dfs[-1] * self._notional_array[-1]
             self._paymentPVs[-1] += paymentPV
             leg_pv += paymentPV
             self._cumulativePVs[-1] = leg_pv
 
+##########################################################################
+
+    def value_and_gradient(self,
+                           value_dt: Date,
+                           discount_curve: DiscountCurve,
+                           index_curve: DiscountCurve = None,
+                           firstFixingRate: float = None):
+        """ Value the floating leg and return this value with its gradients
+        with respect to the pillar discount factors of the discount curve and
+        of the index curve. These are found in a single backward sweep through
+        the payments. If the two curves are the same then the total gradient
+        is the sum of the two. """
+
+        if discount_curve is None:
+            raise FinError("Discount curve is None")
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        sign = 1.0
         if self._leg_type == SwapTypes.PAY:
-            leg_pv = leg_pv * (-1.0)
+            sign = -1.0
+
+        num_payments = len(self._payment_dts)
+
+        notionals = self._notional_array
+        if len(notionals) == 0:
+            notionals = [self._notional] * num_payments
+
+        future = [i for i in range(0, num_payments)
+                  if self._payment_dts[i] > value_dt]
 
-        return leg_pv
+        if len(future) == 0:
+            return 0.0, df_adjoint(discount_curve, [], []), \
+                df_adjoint(index_curve, [], [])
+
+        # The first coupon may already have been fixed
+        fixed_first = firstFixingRate is not None
+        projected = future[1:] if fixed_first else future
+
+        start_dts = [self._startAccruedDates[i] for i in projected]
+        end_dts = [self._endAccruedDates[i] for i in projected]
+        pmnt_dts = [self._payment_dts[i] for i in future]
+
+        num_projected = len(projected)
+        df_starts = np.zeros(num_projected)
+        df_ends = np.ones(num_projected)
+        index_alphas = np.ones(num_projected)
+
+        if num_projected > 0:
+            day_counter = DayCount(index_curve._dc_type)
+            index_alphas = day_counter.year_fracs(start_dts, end_dts)[0]
+            index_dfs = index_curve.df(start_dts + end_dts)
+            index_dfs = np.array(index_dfs).reshape(-1)
+            df_starts = index_dfs[0:num_projected]
+            df_ends = index_dfs[num_projected:]
+
+        fwd_rates = (df_starts / df_ends - 1.0) / index_alphas
+
+        if fixed_first:
+            fwd_rates = np.append(firstFixingRate, fwd_rates)
+
+        accruals = np.array([self._year_fracs[i] * notionals[i]
+                             for i in future])
+
+        amounts = (fwd_rates + self._spread) * accruals
+        amounts[-1] += self._principal * notionals[-1]
+
+        df_value = discount_curve.df(value_dt)
+        dfs = np.array(discount_curve.df(pmnt_dts)).reshape(-1)
+
+        leg_pv = sign * np.sum(amounts * dfs) / df_value
+
+        # Backward sweep
+        dfs_bar = sign * amounts / df_value
+        df_value_bar = -leg_pv / df_value
+        fwd_rates_bar = sign * accruals * dfs / df_value
+
+        if fixed_first:
+            fwd_rates_bar = fwd_rates_bar[1:]
+
+        df_starts_bar = fwd_rates_bar / index_alphas / df_ends
+        df_ends_bar = -df_starts_bar * df_starts / df_ends
+
+        discount_grad = df_adjoint(discount_curve,
+                                   pmnt_dts + [value_dt],
+                                   np.append(dfs_bar, df_value_bar))
+
+        index_grad = df_adjoint(index_curve,
+                                start_dts + end_dts,
+                                np.append(df_starts_bar, df_ends_bar))
+
+        return leg_pv, discount_grad, index_grad
 
 ##########################################################################
 
@@ -270,10 +439,12 @@ class SwapFloatLeg:
         print("FREQUENCY:", str(self._freq_type))
         print("DAY COUNT:", str(self._dc_type))
 
-        if len(self._payments) == 0:
+        if self._valuation is None:
             print("Payments not calculated.")
             return
 
+        self._fill_valuation_table()
+
         header = [ "PAY_NUM", "PAY_dt",  "NOTIONAL",
                   "IBOR", "PMNT", "DF", "PV", "CUM_PV"]
 
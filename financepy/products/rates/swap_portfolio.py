@@ -0,0 +1,309 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from numba import njit
+
+from ...utils.error import FinError
+from ...utils.date import Date, DateArray
+from ...utils.day_count import DayCount
+from ...utils.helpers import check_argument_types, label_to_string
+from ...utils.global_types import SwapTypes
+from ...market.curves.discount_curve import DiscountCurve
+
+###############################################################################
+# A portfolio of fixed versus floating swaps is compiled once into flat
+# columns of flows. Each flow points into a table of the distinct dates of the
+# portfolio and each trade points to its first and last flow. The curves are
+# then read once per distinct date and all of the trades are valued together
+# by a compiled loop which releases the GIL so that it can run on many
+# threads at once.
+###############################################################################
+
+SwapColumns = namedtuple("SwapColumns",
+                         "fix_ptr fix_pay fix_accr cpns fix_sign fix_prin "
+                         "notionals "
+                         "flt_ptr flt_start flt_end flt_pay flt_accr "
+                         "spreads flt_sign flt_prin")
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _value_trades(first, last, cols, serials, value_serial, disc_dfs,
+                  index_dfs, index_alphas, has_fixings, first_fixings, pvs,
+                  pv01s, par_rates):
+    """ Value trades first to last - 1 given the discount and index curve
+    discount factors on each date of the date table. The discount factors
+    are already divided by the discount factor to the valuation date. The
+    PV, PV01 and par rate of each trade are written into the output arrays.
+    """
+
+    for i in range(first, last):
+
+        # Fixed leg annuity and principal per unit coupon
+        annuity = 0.0
+        last_df = 0.0
+
+        for f in range(cols.fix_ptr[i], cols.fix_ptr[i + 1]):
+            q = cols.fix_pay[f]
+            if serials[q] > value_serial:
+                annuity += cols.fix_accr[f] * disc_dfs[q]
+                last_df = disc_dfs[q]
+
+        fix_prin_pv = cols.fix_prin[i] * last_df
+
+        # Floating leg with the first future coupon possibly fixed
+        float_pv = 0.0
+        is_first = True
+        last_df = 0.0
+
+        for g in range(cols.flt_ptr[i], cols.flt_ptr[i + 1]):
+            q = cols.flt_pay[g]
+            if serials[q] > value_serial:
+
+                if is_first and has_fixings[i]:
+                    fwd = first_fixings[i]
+                else:
+                    s = cols.flt_start[g]
+                    e = cols.flt_end[g]
+                    fwd = (index_dfs[s] / index_dfs[e] - 1.0) / index_alphas[g]
+
+                is_first = False
+                float_pv += (fwd + cols.spreads[i]) * cols.flt_accr[g] * \
+                    disc_dfs[q]
+                last_df = disc_dfs[q]
+
+        float_pv += cols.flt_prin[i] * last_df
+        float_pv *= cols.flt_sign[i]
+
+        fixed_pv = cols.fix_sign[i] * (cols.cpns[i] * annuity + fix_prin_pv)
+
+        pvs[i] = fixed_pv + float_pv
+
+        # The PV01 is per unit of notional as in IborSwap.pv01
+        pv01s[i] = annuity / cols.notionals[i]
+
+        # The fixed coupon at which the swap has zero value
+        if annuity != 0.0:
+            par_rates[i] = -(float_pv + cols.fix_sign[i] * fix_prin_pv) / \
+                (cols.fix_sign[i] * annuity)
+        else:
+            par_rates[i] = np.nan
+
+###############################################################################
+
+
+class SwapPortfolio:
+    """ A portfolio of IborSwap and OIS trades held as flat columns of cash
+    flows so that all of the trades can be valued together. The PV, PV01 and
+    par swap rate of every trade are calculated in one compiled pass over the
+    flows which can be split across threads. """
+
+    def __init__(self,
+                 swaps: list):
+        """ Create the portfolio from a list of IborSwap or OIS trades. The
+        cash flows of the trades are compiled into arrays once here and the
+        trades are not used again. """
+
+        check_argument_types(self.__init__, locals())
+
+        if len(swaps) == 0:
+            raise FinError("No swaps have been supplied.")
+
+        fix_ptr = [0]
+        fix_pay = []
+        fix_accr = []
+        cpns = []
+        fix_notionals = []
+        fix_sign = []
+        fix_prin = []
+
+        flt_ptr = [0]
+        flt_start = []
+        flt_end = []
+        flt_pay = []
+        flt_accr = []
+        spreads = []
+        flt_sign = []
+        flt_prin = []
+
+        for swap in swaps:
+
+            fixed_leg = swap._fixed_leg
+            float_leg = swap._float_leg
+            notional = fixed_leg._notional
+
+            fix_pay += [dt._excel_dt for dt in fixed_leg._payment_dts]
+            fix_accr += [yf * notional for yf in fixed_leg._year_fracs]
+            fix_ptr.append(len(fix_pay))
+            cpns.append(fixed_leg._cpn)
+            fix_prin.append(fixed_leg._principal * notional)
+            fix_notionals.append(notional)
+
+            if fixed_leg._leg_type == SwapTypes.PAY:
+                fix_sign.append(-1.0)
+            else:
+                fix_sign.append(1.0)
+
+            notionals = float_leg._notional_array
+            if len(notionals) == 0:
+                notionals = [float_leg._notional] * \
+                    len(float_leg._payment_dts)
+
+            flt_start += [dt._excel_dt for dt in float_leg._startAccruedDates]
+            flt_end += [dt._excel_dt for dt in float_leg._endAccruedDates]
+            flt_pay += [dt._excel_dt for dt in float_leg._payment_dts]
+            flt_accr += [yf * n for yf, n in zip(float_leg._year_fracs,
+                                                 notionals)]
+            flt_ptr.append(len(flt_pay))
+            spreads.append(float_leg._spread)
+            flt_prin.append(float_leg._principal * notionals[-1])
+
+            if float_leg._leg_type == SwapTypes.PAY:
+                flt_sign.append(-1.0)
+            else:
+                flt_sign.append(1.0)
+
+        # The flows point into one table of the distinct dates
+        num_fix = len(fix_pay)
+        num_flt = len(flt_pay)
+
+        all_dts = np.array(fix_pay + flt_start + flt_end + flt_pay,
+                           dtype=np.int64)
+        serials, index = np.unique(all_dts, return_inverse=True)
+        index = index.astype(np.int64)
+
+        self._serials = serials
+        self._flt_start_serials = np.array(flt_start, dtype=np.int64)
+        self._flt_end_serials = np.array(flt_end, dtype=np.int64)
+        self._index_alphas = {}
+        self._num_trades = len(swaps)
+
+        n = num_fix
+        self._cols = SwapColumns(
+            np.array(fix_ptr, dtype=np.int64),
+            index[0:n],
+            np.array(fix_accr, dtype=np.float64),
+            np.array(cpns, dtype=np.float64),
+            np.array(fix_sign, dtype=np.float64),
+            np.array(fix_prin, dtype=np.float64),
+            np.array(fix_notionals, dtype=np.float64),
+            np.array(flt_ptr, dtype=np.int64),
+            index[n:n + num_flt],
+            index[n + num_flt:n + 2 * num_flt],
+            index[n + 2 * num_flt:n + 3 * num_flt],
+            np.array(flt_accr, dtype=np.float64),
+            np.array(spreads, dtype=np.float64),
+            np.array(flt_sign, dtype=np.float64),
+            np.array(flt_prin, dtype=np.float64))
+
+    ###########################################################################
+
+    def _alphas(self,
+                index_curve: DiscountCurve):
+        """ Accrual factors of the index periods using the day count of the
+        index curve as in SwapFloatLeg.value. These are kept for reuse. """
+
+        dc_type = index_curve._dc_type
+
+        if dc_type not in self._index_alphas:
+            day_counter = DayCount(dc_type)
+            alphas = day_counter.year_fracs(
+                DateArray(self._flt_start_serials),
+                DateArray(self._flt_end_serials))[0]
+            self._index_alphas[dc_type] = np.ascontiguousarray(alphas)
+
+        return self._index_alphas[dc_type]
+
+    ###########################################################################
+
+    def value(self,
+              value_dt: Date,
+              discount_curve: DiscountCurve,
+              index_curve: DiscountCurve = None,
+              first_fixings: np.ndarray = None,
+              num_threads: int = 1):
+        """ Value all of the swaps on a value date given a discount curve and
+        an index curve which defaults to the discount curve. An array of the
+        first floating rate fixing of each swap can be given where NaN means
+        that the fixing is projected from the index curve. A dictionary with
+        arrays of the PV, the PV01 per unit notional and the par swap rate of
+        each trade is returned. The trades are split across num_threads. """
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        num_trades = self._num_trades
+
+        if first_fixings is None:
+            first_fixings = np.full(num_trades, np.nan)
+        else:
+            first_fixings = np.asarray(first_fixings, dtype=np.float64)
+            if len(first_fixings) != num_trades:
+                raise FinError("First fixings must have one per trade.")
+
+        if num_threads < 1:
+            raise FinError("Number of threads must be at least one.")
+
+        # Curves are read on the dates from the value date onwards. A swap
+        # with a past start date needs its first fixing or gets a NaN value.
+        live = self._serials >= value_dt._excel_dt
+        dts = DateArray(self._serials[live])
+        df_value = discount_curve.df(value_dt)
+
+        disc_dfs = np.full(len(self._serials), np.nan)
+        index_dfs = np.full(len(self._serials), np.nan)
+
+        if np.any(live):
+            disc_dfs[live] = np.array(discount_curve.df(dts)).reshape(-1)
+            disc_dfs[live] /= df_value
+            index_dfs[live] = np.array(index_curve.df(dts)).reshape(-1)
+
+        index_alphas = self._alphas(index_curve)
+
+        pvs = np.zeros(num_trades)
+        pv01s = np.zeros(num_trades)
+        par_rates = np.zeros(num_trades)
+
+        # The kernel uses fastmath so the NaN fixings are flagged here
+        has_fixings = np.logical_not(np.isnan(first_fixings))
+        first_fixings = np.where(has_fixings, first_fixings, 0.0)
+
+        args = (self._cols, self._serials, value_dt._excel_dt, disc_dfs,
+                index_dfs, index_alphas, has_fixings, first_fixings, pvs,
+                pv01s, par_rates)
+
+        if num_threads == 1:
+            _value_trades(0, num_trades, *args)
+        else:
+            bounds = np.linspace(0, num_trades, num_threads + 1).astype(int)
+            with ThreadPoolExecutor(max_workers=num_threads) as executor:
+                jobs = [executor.submit(_value_trades, bounds[k],
+                                        bounds[k + 1], *args)
+                        for k in range(0, num_threads)]
+                for job in jobs:
+                    job.result()
+
+        return {'pv': pvs, 'pv01': pv01s, 'par_rate': par_rates}
+
+    ###########################################################################
+
+    def __repr__(self):
+        s = label_to_string("OBJECT TYPE", type(self).__name__)
+        s += label_to_string("NUM TRADES", self._num_trades)
+        s += label_to_string("NUM FIXED FLOWS", len(self._cols.fix_pay))
+        s += label_to_string("NUM FLOAT FLOWS", len(self._cols.flt_pay))
+        s += label_to_string("NUM DATES", len(self._serials))
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
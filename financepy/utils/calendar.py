@@ -9,10 +9,12 @@
 
 import datetime
 from enum import Enum
-from .date import Date
-from .error import FinError
 
-# from numba import njit, jit, int64, boolean
+import numpy as np
+
+from . import date as date_module
+from .date import Date, DateArray
+from .error import FinError
 
 easterMondayDay = [98, 90, 103, 95, 114, 106, 91, 111, 102, 87,
                    107, 99, 83, 103, 95, 115, 99, 91, 111, 96, 87,
@@ -76,6 +78,344 @@ class DateGenRuleTypes(Enum):
     FORWARD = 1
     BACKWARD = 2
 
+
+class CalendarJoinTypes(Enum):
+    UNION = 1  # A holiday in any of the calendars
+    INTERSECTION = 2  # A holiday in all of the calendars
+
+###############################################################################
+
+
+class JointCalendarType():
+    """ A calendar type made by joining the holidays of several calendar
+    types. With a UNION join a date is a holiday if it is a holiday in any of
+    the calendars so a business day must be a business day in all of the
+    financial centres. With an INTERSECTION join a date is only a holiday if
+    it is a holiday in all of them. It can be used wherever a CalendarTypes
+    is passed to a Calendar, Schedule or product. """
+
+    def __init__(self,
+                 cal_types: (list, tuple),
+                 join_type: CalendarJoinTypes = CalendarJoinTypes.UNION):
+        """ Create a joint calendar type from a list of calendar types and a
+        rule for joining their holidays. """
+
+        if len(cal_types) == 0:
+            raise FinError("Joint calendar needs at least one calendar type")
+
+        for cal_type in cal_types:
+            if isinstance(cal_type, CalendarTypes) is False:
+                raise FinError("Need to pass CalendarTypes and not " +
+                               str(cal_type))
+
+        if isinstance(join_type, CalendarJoinTypes) is False:
+            raise FinError("Need to pass CalendarJoinTypes and not " +
+                           str(join_type))
+
+        # The order in which the calendars are given does not matter
+        self._cal_types = tuple(sorted(set(cal_types),
+                                       key=lambda cal_type: cal_type.value))
+        self._join_type = join_type
+
+    ###########################################################################
+
+    @property
+    def cal_types(self):
+        return self._cal_types
+
+    @property
+    def join_type(self):
+        return self._join_type
+
+    @property
+    def name(self):
+        if self._join_type == CalendarJoinTypes.UNION:
+            separator = "+"
+        else:
+            separator = "&"
+        return separator.join(cal_type.name for cal_type in self._cal_types)
+
+    ###########################################################################
+
+    def __eq__(self, other):
+        if isinstance(other, JointCalendarType) is False:
+            return False
+        return self._cal_types == other._cal_types and \
+            self._join_type == other._join_type
+
+    def __hash__(self):
+        return hash((self._cal_types, self._join_type))
+
+    ###########################################################################
+
+    def __repr__(self):
+        return "JointCalendarType(" + self.name + ")"
+
+###############################################################################
+
+
+def _to_serials(dts):
+    """ Excel serials of a Date, DateArray or array of serials. """
+
+    if isinstance(dts, Date):
+        return int(dts._excel_dt)
+    elif isinstance(dts, DateArray):
+        return dts.excel_dt()
+    elif isinstance(dts, np.ndarray):
+        return dts.astype(np.int64)
+    else:
+        raise FinError("Dates must be a Date, DateArray or array of serials")
+
+
+def _from_serials(serials, like):
+    """ Return serials in the same form as the input they came from. """
+
+    if isinstance(like, DateArray):
+        return DateArray(serials)
+    elif isinstance(like, Date):
+        return date_module._date_from_serial(int(serials))
+    else:
+        return serials
+
+
+def _months(serials):
+    """ Month numbers (1-12) of an array of Excel serials. """
+    idx = date_module.g_serial_to_index[serials]
+    return 1 + (idx // 31) % 12
+
+###############################################################################
+
+# The holiday rules are tabulated for these years. The Easter Monday table
+# does not go beyond 2100 so later dates fall back to the rules.
+g_table_start_year = 1900
+g_table_end_year = 2100
+
+# One table per calendar type, shared by all Calendar objects of that type
+g_business_day_tables = {}
+
+# Longest run of consecutive non-business days that a table lookup assumes
+g_max_holiday_run = 15
+
+###############################################################################
+
+
+def _serial(d, m, y):
+    """ Excel serial of a valid day, month and year. """
+    idx = (y - date_module.g_start_year) * 372 + (m - 1) * 31 + d - 1
+    return date_module.g_date_counter_list[idx]
+
+
+def _year_of_serial(serial):
+    """ Calendar year of an Excel serial. """
+    idx = int(date_module.g_serial_to_index[serial])
+    return date_module.g_start_year + idx // 372
+
+###############################################################################
+
+
+class _BusinessDayTable():
+    """ Holiday and business day flags for a calendar indexed by Excel serial.
+    Each year is evaluated once with the holiday rules of the calendar the
+    first time it is needed. The years built so far form one contiguous
+    block over which we also hold the cumulative business day count and the
+    next and previous business day of every date. This turns business day
+    tests, adjustments and business day arithmetic into array lookups. """
+
+    def __init__(self,
+                 holiday_rule):
+        """ Create an empty table from a function that takes a Date and
+        returns True if it is a holiday. """
+
+        self._holiday_rule = holiday_rule
+
+        num_serials = _serial(31, 12, g_table_end_year) + 1
+
+        self._is_holiday = np.zeros(num_serials, dtype=np.bool_)
+        self._is_business = np.zeros(num_serials, dtype=np.bool_)
+        self._num_business = np.zeros(num_serials, dtype=np.int64)
+        self._next_business = np.zeros(num_serials, dtype=np.int64)
+        self._prev_business = np.zeros(num_serials, dtype=np.int64)
+
+        self._y_lo = None
+        self._y_hi = None
+        self._s_lo = 1
+        self._s_hi = 0
+
+    ###########################################################################
+
+    def ensure(self,
+               serial_lo: int,
+               serial_hi: int,
+               margin: int = 0):
+        """ Extend the block of built years to cover the two serials and, as
+        far as the tabulated years allow, a margin of days either side.
+        Returns False if the serials lie outside the tabulated years. """
+
+        if serial_lo - margin >= self._s_lo and \
+                serial_hi + margin <= self._s_hi:
+            return True
+
+        if serial_lo < 1 or serial_hi >= len(self._is_business):
+            return False
+
+        serial_lo = max(1, serial_lo - margin)
+        serial_hi = min(len(self._is_business) - 1, serial_hi + margin)
+
+        y_lo = _year_of_serial(serial_lo)
+        y_hi = _year_of_serial(serial_hi)
+
+        if self._y_lo is not None:
+            y_lo = min(y_lo, self._y_lo)
+            y_hi = max(y_hi, self._y_hi)
+
+        for y in range(y_lo, y_hi + 1):
+            if self._y_lo is None or y < self._y_lo or y > self._y_hi:
+                self._build_year(y)
+
+        self._y_lo = y_lo
+        self._y_hi = y_hi
+        self._s_lo = _serial(1, 1, y_lo)
+        self._s_hi = _serial(31, 12, y_hi)
+        self._build_lookups()
+        return True
+
+    ###########################################################################
+
+    def _build_year(self,
+                    y: int):
+        """ Evaluate the holiday rules on every day of year y. """
+
+        for serial in range(_serial(1, 1, y), _serial(31, 12, y) + 1):
+
+            # Excel's 29 Feb 1900 is not a valid Date
+            if serial == 60:
+                continue
+
+            dt = date_module._date_from_serial(serial)
+            is_holiday = self._holiday_rule(dt)
+            self._is_holiday[serial] = is_holiday
+            self._is_business[serial] = not is_holiday and not dt.is_weekend()
+
+    ###########################################################################
+
+    def _build_lookups(self):
+        """ Cumulative counts and next/previous business days over the block.
+        A next (previous) business day beyond the block is set to a serial
+        after (before) the block. """
+
+        lo = self._s_lo
+        hi = self._s_hi + 1
+
+        is_business = self._is_business[lo:hi]
+        serials = np.arange(lo, hi)
+
+        self._num_business[lo:hi] = np.cumsum(is_business)
+
+        nxt = np.where(is_business, serials, hi)
+        self._next_business[lo:hi] = np.minimum.accumulate(nxt[::-1])[::-1]
+
+        prv = np.where(is_business, serials, lo - 1)
+        self._prev_business[lo:hi] = np.maximum.accumulate(prv)
+
+    ###########################################################################
+
+    def roll(self,
+             serials: (int, np.ndarray),
+             step: int):
+        """ Move each serial to the nearest business day on or after it if
+        step is positive, or on or before it if step is negative. """
+
+        if step > 0:
+            return self._next_business[serials]
+        else:
+            return self._prev_business[serials]
+
+    ###########################################################################
+
+    def shift(self,
+              serials: (int, np.ndarray),
+              num_days: (int, np.ndarray)):
+        """ Move each serial forward by num_days business days, or backward
+        if num_days is negative. A zero shift returns the serial itself. """
+
+        cum = self._num_business[serials]
+        before = cum - self._is_business[serials]
+        target = np.where(num_days > 0, cum + num_days, before + num_days + 1)
+
+        block = self._num_business[self._s_lo:self._s_hi + 1]
+        new_serials = np.searchsorted(block, target, 'left') + self._s_lo
+
+        # Mark a move back beyond the start of the block as not found
+        new_serials = np.where(target < 1, self._s_lo - 1, new_serials)
+        return np.where(num_days == 0, serials, new_serials)
+
+    ###########################################################################
+
+    def check_found(self,
+                    serials: np.ndarray):
+        """ Raise if a lookup has run off the end of the tabulated years. """
+
+        if np.any(serials < self._s_lo) or np.any(serials > self._s_hi):
+            raise FinError("Calendar lookup beyond the tabulated years " +
+                           str(g_table_start_year) + " to " +
+                           str(g_table_end_year))
+
+    ###########################################################################
+
+    def count(self,
+              start_serials: (int, np.ndarray),
+              end_serials: (int, np.ndarray)):
+        """ Number of business days on or after the start and before the
+        end. It is negative if the end is before the start. """
+
+        before_end = self._num_business[end_serials] - \
+            self._is_business[end_serials]
+        before_start = self._num_business[start_serials] - \
+            self._is_business[start_serials]
+        return before_end - before_start
+
+###############################################################################
+
+
+class _JointBusinessDayTable(_BusinessDayTable):
+    """ Business day table of a joint calendar. Each year is compiled from
+    the tables of the component calendars into one set of holiday flags so
+    that lookups cost the same as for a single calendar. """
+
+    def __init__(self,
+                 holiday_rule,
+                 tables: list,
+                 join_type: CalendarJoinTypes):
+        """ Create an empty table from the component calendar tables and the
+        rule used to join their holidays. """
+
+        super().__init__(holiday_rule)
+        self._tables = tables
+        self._join_type = join_type
+
+    ###########################################################################
+
+    def _build_year(self,
+                    y: int):
+        """ Combine the holiday flags of the component calendars over year y.
+        All calendars share the same weekend. """
+
+        lo = _serial(1, 1, y)
+        hi = _serial(31, 12, y) + 1
+
+        for table in self._tables:
+            table.ensure(lo, hi - 1)
+
+        holidays = [table._is_holiday[lo:hi] for table in self._tables]
+        business = [table._is_business[lo:hi] for table in self._tables]
+
+        if self._join_type == CalendarJoinTypes.UNION:
+            self._is_holiday[lo:hi] = np.logical_or.reduce(holidays)
+            self._is_business[lo:hi] = np.logical_and.reduce(business)
+        else:
+            self._is_holiday[lo:hi] = np.logical_and.reduce(holidays)
+            self._is_business[lo:hi] = np.logical_or.reduce(business)
+
 ###############################################################################
 
 
@@ -84,13 +424,20 @@ class Calendar:
     a regional or country-specific calendar convention specified by the user.
     It also supplies an adjustment method which takes in an adjustment
     convention and then applies that to any date that falls on a holiday in the
-    specified calendar. """
+    specified calendar.
+
+    The holiday rules are evaluated once per year and calendar type and held
+    in a table that is shared by all calendars of that type. Business day
+    tests, adjustments and business day arithmetic are lookups into this
+    table. They also accept a DateArray or a numpy array of Excel serials and
+    then return an array. """
 
     def __init__(self,
-                 cal_type: CalendarTypes):
-        """ Create a calendar based on a specified calendar type. """
+                 cal_type: (CalendarTypes, JointCalendarType)):
+        """ Create a calendar based on a specified calendar type or a joint
+        calendar type made from several of them. """
 
-        if cal_type not in CalendarTypes:
+        if isinstance(cal_type, (CalendarTypes, JointCalendarType)) is False:
             raise FinError(
                 "Need to pass FinCalendarType and not " +
                 str(cal_type))
@@ -99,11 +446,85 @@ class Calendar:
 
     ###########################################################################
 
+    def _table(self):
+        """ The shared business day table for this calendar type. A joint
+        calendar type has its own table compiled from those of its
+        components. """
+
+        table = g_business_day_tables.get(self._cal_type)
+
+        if table is None:
+            rule_calendar = Calendar(self._cal_type)
+
+            if isinstance(self._cal_type, JointCalendarType):
+                tables = [Calendar(cal_type)._table()
+                          for cal_type in self._cal_type.cal_types]
+                table = _JointBusinessDayTable(
+                    rule_calendar._is_holiday_by_rule,
+                    tables,
+                    self._cal_type.join_type)
+            else:
+                table = _BusinessDayTable(rule_calendar._is_holiday_by_rule)
+
+            g_business_day_tables[self._cal_type] = table
+
+        return table
+
+    ###########################################################################
+
+    def _vector_table(self,
+                      serials: np.ndarray,
+                      margin: int = 0):
+        """ Table covering all of the serials plus a margin of days either
+        side. Vectorised methods need the tabulated years. """
+
+        table = self._table()
+
+        if len(serials) > 0:
+            serial_lo = int(np.min(serials))
+            serial_hi = int(np.max(serials))
+            if table.ensure(serial_lo, serial_hi, margin) is False:
+                raise FinError("Vectorised calendar functions need dates in " +
+                               str(g_table_start_year) + " to " +
+                               str(g_table_end_year))
+
+        return table
+
+    ###########################################################################
+
+    def _roll(self,
+              dt: Date,
+              step: int):
+        """ Return dt if it is a business day, otherwise the first business
+        day after it (step = +1) or before it (step = -1). """
+
+        serial = int(dt._excel_dt)
+        table = self._table()
+
+        if table.ensure(serial, serial, g_max_holiday_run):
+
+            new_serial = int(table.roll(serial, step))
+
+            if new_serial == serial:
+                return dt
+
+            if table._s_lo <= new_serial <= table._s_hi:
+                return date_module._date_from_serial(new_serial)
+
+        # Outside the tabulated years we step one day at a time
+        while self.is_business_day(dt) is False:
+            dt = dt.add_days(step)
+
+        return dt
+
+    ###########################################################################
+
     def adjust(self,
-               dt: Date,
+               dt: (Date, DateArray, np.ndarray),
                bd_type: BusDayAdjustTypes):
         """ Adjust a payment date if it falls on a holiday according to the
-        specified business day convention. """
+        specified business day convention. A DateArray or an array of Excel
+        serials is adjusted in one step and returned as the same type. """
 
         if type(bd_type) != BusDayAdjustTypes:
             raise FinError("Invalid type passed. Need Finbd_type")
@@ -115,83 +536,114 @@ class Calendar:
         if bd_type == BusDayAdjustTypes.NONE:
             return dt
 
-        elif bd_type == BusDayAdjustTypes.FOLLOWING:
+        if isinstance(dt, (DateArray, np.ndarray)):
+            return self._adjust_vector(dt, bd_type)
 
-            # step forward until we find a business day
-            while self.is_business_day(dt) is False:
-                dt = dt.add_days(1)
+        if bd_type == BusDayAdjustTypes.FOLLOWING:
 
-            return dt
+            # step forward until we find a business day
+            return self._roll(dt, +1)
 
         elif bd_type == BusDayAdjustTypes.MODIFIED_FOLLOWING:
 
-            d_start = dt.d()
-            m_start = dt.m()
-            y_start = dt.y()
-
             # step forward until we find a business day
-            while self.is_business_day(dt) is False:
-                dt = dt.add_days(1)
+            new_dt = self._roll(dt, +1)
 
             # if the business day is in a different month look back
-            # for previous first business day one day at a time
-            # TODO: I could speed this up by starting it at initial date
-            if dt._m != m_start:
-                dt = Date(d_start, m_start, y_start)
-                while self.is_business_day(dt) is False:
-                    dt = dt.add_days(-1)
+            # for previous first business day from the initial date
+            if new_dt._m != dt._m:
+                new_dt = self._roll(dt, -1)
 
-            return dt
+            return new_dt
 
         elif bd_type == BusDayAdjustTypes.PRECEDING:
 
-            # if the business day is in the next month look back
-            # for previous first business day one day at a time
-            while self.is_business_day(dt) is False:
-                dt = dt.add_days(-1)
-
-            return dt
+            # step back until we find a business day
+            return self._roll(dt, -1)
 
         elif bd_type == BusDayAdjustTypes.MODIFIED_PRECEDING:
 
-            d_start = dt.d()
-            m_start = dt.m()
-            y_start = dt.y()
-
             # step backward until we find a business day
-            while self.is_business_day(dt) is False:
-                dt = dt.add_days(-1)
+            new_dt = self._roll(dt, -1)
 
             # if the business day is in a different month look forward
-            # for previous first business day one day at a time
-            # I could speed this up by starting it at initial date
-            if dt._m != m_start:
-                dt = Date(d_start, m_start, y_start)
-                while self.is_business_day(dt) is False:
-                    dt = dt.add_days(+1)
+            # for the next business day from the initial date
+            if new_dt._m != dt._m:
+                new_dt = self._roll(dt, +1)
 
-            return dt
+            return new_dt
 
         else:
 
             raise FinError("Unknown adjustment convention" +
                            str(bd_type))
 
-        return dt
+    ###########################################################################
 
-###############################################################################
+    def _adjust_vector(self,
+                       dts: (DateArray, np.ndarray),
+                       bd_type: BusDayAdjustTypes):
+        """ Vectorised adjust of a DateArray or array of Excel serials. """
 
-    def add_business_days(self,
-                          start_dt: Date,
-                          numDays: int):
-        """ Returns a new date that is numDays business days after Date.
-        All holidays in the chosen calendar are assumed not business days. """
+        serials = _to_serials(dts)
+        table = self._vector_table(serials, g_max_holiday_run)
+
+        if bd_type == BusDayAdjustTypes.FOLLOWING:
+            new_serials = table.roll(serials, +1)
+        elif bd_type == BusDayAdjustTypes.PRECEDING:
+            new_serials = table.roll(serials, -1)
+        elif bd_type in (BusDayAdjustTypes.MODIFIED_FOLLOWING,
+                         BusDayAdjustTypes.MODIFIED_PRECEDING):
+
+            if bd_type == BusDayAdjustTypes.MODIFIED_FOLLOWING:
+                step = +1
+            else:
+                step = -1
+
+            new_serials = table.roll(serials, step)
+            other_serials = table.roll(serials, -step)
+            table.check_found(new_serials)
+            month_changed = _months(new_serials) != _months(serials)
+            new_serials = np.where(month_changed, other_serials, new_serials)
+        else:
+            raise FinError("Unknown adjustment convention" +
+                           str(bd_type))
 
-        # TODO: REMOVE DATETIME DEPENDENCE HERE ???
+        table.check_found(new_serials)
+        return _from_serials(new_serials, dts)
 
-        if isinstance(numDays, int) is False:
+    ###########################################################################
+
+    def add_business_days(self,
+                          start_dt: (Date, DateArray, np.ndarray),
+                          num_days: (int, np.ndarray)):
+        """ Returns a new date that is num_days business days after Date.
+        All holidays in the chosen calendar are assumed not business days.
+        A DateArray or array of Excel serials is shifted in one step and the
+        number of days can then also be an array. """
+
+        if isinstance(start_dt, (DateArray, np.ndarray)):
+            serials = _to_serials(start_dt)
+            num_days = np.asarray(num_days, dtype=np.int64)
+            reach = 2 * int(np.max(np.abs(num_days))) + g_max_holiday_run
+            table = self._vector_table(serials, reach)
+            new_serials = table.shift(serials, num_days)
+            table.check_found(new_serials)
+            return _from_serials(new_serials, start_dt)
+
+        if isinstance(num_days, int) is False:
             raise FinError("Num days must be an integer")
 
+        serial = int(start_dt._excel_dt)
+        reach = 2 * abs(num_days) + g_max_holiday_run
+        table = self._table()
+
+        if table.ensure(serial, serial, reach):
+            new_serial = int(table.shift(serial, num_days))
+            if table._s_lo <= new_serial <= table._s_hi:
+                return date_module._date_from_serial(new_serial)
+
+        # Outside the tabulated years we step one day at a time
         dt = datetime.date(start_dt._y, start_dt._m, start_dt._d)
         d = dt.day
         m = dt.month
@@ -199,11 +651,11 @@ class Calendar:
         newDt = Date(d, m, y)
 
         s = +1
-        if numDays < 0:
-            numDays = -1 * numDays
+        if num_days < 0:
+            num_days = -1 * num_days
             s = -1
 
-        while numDays > 0:
+        while num_days > 0:
             dt = dt + s * datetime.timedelta(days=1)
             d = dt.day
             m = dt.month
@@ -211,34 +663,95 @@ class Calendar:
             newDt = Date(d, m, y)
 
             if self.is_business_day(newDt) is True:
-                numDays -= 1
+                num_days -= 1
 
         return newDt
 
-###############################################################################
+    ###########################################################################
+
+    def business_days_between(self,
+                              start_dt: (Date, DateArray, np.ndarray),
+                              end_dt: (Date, DateArray, np.ndarray)):
+        """ Number of business days on or after the start date and before
+        the end date. This is negative if the end date is before the start
+        date. Either input can be a DateArray or array of Excel serials in
+        which case an array of counts is returned. """
+
+        start_serials = _to_serials(start_dt)
+        end_serials = _to_serials(end_dt)
+
+        all_serials = np.append(np.atleast_1d(start_serials),
+                                np.atleast_1d(end_serials))
+        table = self._vector_table(all_serials)
+        num_days = table.count(start_serials, end_serials)
+
+        if isinstance(num_days, np.ndarray) and num_days.ndim > 0:
+            return num_days
+        else:
+            return int(num_days)
+
+    ###########################################################################
 
     def is_business_day(self,
-                        dt: Date):
+                        dt: (Date, DateArray, np.ndarray)):
         """ Determines if a date is a business day according to the specified
-        calendar. If it is it returns True, otherwise False. """
+        calendar. If it is it returns True, otherwise False. A DateArray or
+        array of Excel serials returns a boolean array. """
+
+        if isinstance(dt, (DateArray, np.ndarray)):
+            serials = _to_serials(dt)
+            return self._vector_table(serials)._is_business[serials]
+
+        serial = int(dt._excel_dt)
+        table = self._table()
+
+        if table.ensure(serial, serial):
+            return bool(table._is_business[serial])
 
         # For all calendars so far, SAT and SUN are not business days
         # If this ever changes I will need to add a filter here.
         if dt.is_weekend():
             return False
 
-        if self.is_holiday(dt) is True:
+        if self._is_holiday_by_rule(dt) is True:
             return False
         else:
             return True
 
-###############################################################################
+    ###########################################################################
 
     def is_holiday(self,
-                   dt: Date):
+                   dt: (Date, DateArray, np.ndarray)):
         """ Determines if a date is a Holiday according to the specified
         calendar. Weekends are not holidays unless the holiday falls on a
-        weekend date. """
+        weekend date. A DateArray or array of Excel serials returns a boolean
+        array. """
+
+        if isinstance(dt, (DateArray, np.ndarray)):
+            serials = _to_serials(dt)
+            return self._vector_table(serials)._is_holiday[serials]
+
+        serial = int(dt._excel_dt)
+        table = self._table()
+
+        if table.ensure(serial, serial):
+            return bool(table._is_holiday[serial])
+
+        return self._is_holiday_by_rule(dt)
+
+    ###########################################################################
+
+    def _is_holiday_by_rule(self,
+                            dt: Date):
+        """ Apply the holiday rules of the calendar to a single date. """
+
+        if isinstance(self._cal_type, JointCalendarType):
+            is_holiday = [Calendar(cal_type)._is_holiday_by_rule(dt)
+                          for cal_type in self._cal_type.cal_types]
+            if self._cal_type.join_type == CalendarJoinTypes.UNION:
+                return any(is_holiday)
+            else:
+                return all(is_holiday)
 
         start_dt = Date(1, 1, dt.y())
         self._day_in_year = dt.excel_dt() - start_dt.excel_dt() + 1
@@ -106,6 +106,8 @@ def parse_dt(date_str, date_format):
 
 
 g_date_counter_list = None
+g_date_counter_array = None
+g_serial_to_index = None
 g_start_year = 1900
 g_end_year = 2100
 
@@ -122,6 +124,8 @@ def calculate_list():
     max_days = 0
 
     global g_date_counter_list
+    global g_date_counter_array
+    global g_serial_to_index
     global g_start_year
     global g_end_year
 
@@ -156,6 +160,58 @@ def calculate_list():
                 if yy >= g_start_year:
                     g_date_counter_list.append(-999)
 
+    # Numpy versions of the lookup used by the vectorised DateArray. The
+    # second maps an Excel serial back to its index in the padded list.
+    g_date_counter_array = np.array(g_date_counter_list, dtype=np.int32)
+    valid = g_date_counter_array > 0
+    g_serial_to_index = np.full(g_date_counter_array.max() + 1, -1,
+                                dtype=np.int32)
+    g_serial_to_index[g_date_counter_array[valid]] = np.nonzero(valid)[0]
+
+calculate_list()
+
+###############################################################################
+# OPTIONAL INTERN CACHE OF DATES KEYED ON THE EXCEL SERIAL
+###############################################################################
+
+g_date_cache = None
+g_date_cache_size = 0
+
+
+def set_date_cache_size(max_size: int = 100000):
+    """ Switch on interning of whole-day Dates. Creating a Date that is
+    already held returns the existing object, so repeated dates in schedules
+    and calendars share storage. The cache holds at most max_size dates and
+    drops the oldest when full. A size of zero switches interning off. """
+
+    global g_date_cache
+    global g_date_cache_size
+
+    if max_size < 0:
+        raise FinError("Date cache size cannot be negative")
+
+    if max_size == 0:
+        g_date_cache = None
+    else:
+        g_date_cache = {}
+
+    g_date_cache_size = max_size
+
+
+def _intern_date(dt):
+    """ Add a new whole-day Date to the intern cache, evicting the oldest
+    entry if the cache is full. """
+
+    serial = int(dt._excel_dt)
+
+    if serial in g_date_cache:
+        return
+
+    if len(g_date_cache) >= g_date_cache_size:
+        del g_date_cache[next(iter(g_date_cache))]
+
+    g_date_cache[serial] = dt
+
 ###############################################################################
 # The index in these functions is not the Excel date index used as the
 # internal representation of the date but the index of that date in the
@@ -194,8 +250,41 @@ def weekday(day_count):
 ###############################################################################
 
 
+_DAYS = 1
+_WEEKS = 2
+_MONTHS = 3
+_YEARS = 4
+
+
+def _parse_tenor(tenor_str: str):
+    """ Split a tenor string such as '3M' into a period type and a signed
+    number of periods. ON and TN are treated as one day. """
+
+    tenor_str = tenor_str.upper()
+
+    if tenor_str == "ON":   # overnight - should be used only if spot days = 0
+        return _DAYS, 1
+    elif tenor_str == "TN":  # overnight - should be used when spot days > 0
+        return _DAYS, 1
+    elif tenor_str[-1] == "D":
+        return _DAYS, int(tenor_str[0:-1])
+    elif tenor_str[-1] == "W":
+        return _WEEKS, int(tenor_str[0:-1])
+    elif tenor_str[-1] == "M":
+        return _MONTHS, int(tenor_str[0:-1])
+    elif tenor_str[-1] == "Y":
+        return _YEARS, int(tenor_str[0:-1])
+    else:
+        raise FinError("Unknown tenor type in " + tenor_str)
+
+###############################################################################
+
+
 def vectorisation_helper(func):
     def wrapper(self_, other):
+        if isinstance(other, DateArray):
+            # Let the DateArray handle the reflected operation
+            return NotImplemented
         if isinstance(other, Iterable):
             # Store the type of other, then cast the output to be the same type
             output_type = type(other)
@@ -211,6 +300,9 @@ class Date():
     """ A date class to manage dates that is simple to use and includes a
     number of useful date functions used frequently in Finance. """
 
+    __slots__ = ('_y', '_m', '_d', '_hh', '_mm', '_ss', '_excel_dt',
+                 '_weekday')
+
     MON = 0
     TUE = 1
     WED = 2
@@ -221,6 +313,24 @@ class Date():
 
     ###########################################################################
 
+    def __new__(cls, d, m, y, hh=0, mm=0, ss=0):
+        """ Return the interned Date for this day if the intern cache is
+        switched on and holds it. Otherwise create a new object. """
+
+        if g_date_cache is not None and hh == 0 and mm == 0 and ss == 0 \
+                and 0 < m < 13 and 0 < d < 32 \
+                and g_start_year < y <= g_end_year:
+
+            idx = (y - g_start_year) * 372 + (m - 1) * 31 + d - 1
+            dt = g_date_cache.get(g_date_counter_list[idx])
+
+            if dt is not None and type(dt) is cls:
+                return dt
+
+        return object.__new__(cls)
+
+    ###########################################################################
+
     def __init__(self, d, m, y, hh=0, mm=0, ss=0):
         """ Create a date given a day of month, month and year. The arguments
         must be in the order of day (of month), month number and then the year.
@@ -234,15 +344,35 @@ class Date():
         global g_start_year
         global g_end_year
 
+        # Fast path for a whole day inside the lookup table. An invalid day
+        # maps to a negative counter and falls through to full validation.
+        if hh == 0 and mm == 0 and ss == 0 and 0 < m < 13 and 0 < d < 32 \
+                and g_start_year < y <= g_end_year:
+
+            idx = (y - g_start_year) * 372 + (m - 1) * 31 + d - 1
+            days_since_first_jan_1900 = g_date_counter_list[idx]
+
+            if days_since_first_jan_1900 > 0:
+                self._y = y
+                self._m = m
+                self._d = d
+                self._hh = 0
+                self._mm = 0
+                self._ss = 0
+                self._excel_dt = days_since_first_jan_1900 + 0.0
+                self._weekday = (days_since_first_jan_1900 + 5) % 7
+
+                if g_date_cache is not None:
+                    _intern_date(self)
+
+                return
+
         # If the date has been entered as y, m, d we flip it to d, m, y
         # This message should be removed after a few releases
         if d >= g_start_year and d < g_end_year and y > 0 and y <= 31:
             raise FinError(
                 "Date arguments must now be in the order Date(dd, mm, yyyy)")
 
-        if g_date_counter_list is None:
-            calculate_list()
-
         if y < 1900:
             raise FinError("Year cannot be before 1900")
 
@@ -304,6 +434,12 @@ class Date():
 
     ###########################################################################
 
+    def __getnewargs__(self):
+        """ Arguments passed to __new__ when a Date is copied or unpickled. """
+        return (self._d, self._m, self._y, self._hh, self._mm, self._ss)
+
+    ###########################################################################
+
     def d(self):
         ''' Get day of month as integer '''
         return self._d
@@ -485,6 +621,16 @@ class Date():
         """ Returns a new date that is num_days after the Date. I also make
         it possible to go backwards a number of days. """
 
+        # Step through the serials directly when the target is in the table
+        serial = int(self._excel_dt) + int(num_days)
+        if 0 < serial < len(g_serial_to_index):
+            idx = int(g_serial_to_index[serial])
+            if idx >= 0:
+                y = g_start_year + idx // 372
+                m = 1 + (idx // 31) % 12
+                d = 1 + idx % 31
+                return Date(d, m, y)
+
         idx = date_index(self._d, self._m, self._y)
 
         step = +1
@@ -795,45 +941,17 @@ class Date():
 
         for tenor_str in tenor:
 
-            tenor_str = tenor_str.upper()
-            DAYS = 1
-            WEEKS = 2
-            MONTHS = 3
-            YEARS = 4
-
-            period_type = 0
-            num_periods = 0
-
-            if tenor_str == "ON":   # overnight - should be used only if spot days = 0
-                period_type = DAYS
-                num_periods = 1
-            elif tenor_str == "TN":  # overnight - should be used when spot days > 0
-                period_type = DAYS
-                num_periods = 1
-            elif tenor_str[-1] == "D":
-                period_type = DAYS
-                num_periods = int(tenor_str[0:-1])
-            elif tenor_str[-1] == "W":
-                period_type = WEEKS
-                num_periods = int(tenor_str[0:-1])
-            elif tenor_str[-1] == "M":
-                period_type = MONTHS
-                num_periods = int(tenor_str[0:-1])
-            elif tenor_str[-1] == "Y":
-                period_type = YEARS
-                num_periods = int(tenor_str[0:-1])
-            else:
-                raise FinError("Unknown tenor type in " + tenor)
+            period_type, num_periods = _parse_tenor(tenor_str)
 
             new_date = Date(self._d, self._m, self._y)
 
-            if period_type == DAYS:
+            if period_type == _DAYS:
                 for _ in range(0, abs(num_periods)):
                     new_date = new_date.add_days(math.copysign(1, num_periods))
-            elif period_type == WEEKS:
+            elif period_type == _WEEKS:
                 for _ in range(0, abs(num_periods)):
                     new_date = new_date.add_days(math.copysign(7, num_periods))
-            elif period_type == MONTHS:
+            elif period_type == _MONTHS:
                 for _ in range(0, abs(num_periods)):
                     new_date = new_date.add_months(math.copysign(1, num_periods))
 
@@ -843,7 +961,7 @@ class Date():
                 d = min(self.d(), new_date.eom()._d)
                 new_date = Date(d, m, y)
 
-            elif period_type == YEARS:
+            elif period_type == _YEARS:
                 for _ in range(0, abs(num_periods)):
                     new_date = new_date.add_months(math.copysign(12, num_periods))
 
@@ -1077,3 +1195,324 @@ def test_type():
     print("TEST TYPE", g_date_type_format)
 
 ###############################################################################
+# VECTORISED DATES
+###############################################################################
+
+
+def _days_in_months(m: np.ndarray,
+                    y: np.ndarray):
+    """ Number of days in each month m (1-12) of year y for arrays m and y. """
+
+    leap = ((y % 4 == 0) & (y % 100 != 0)) | (y % 400 == 0)
+    month_days = np.where(leap[..., None],
+                          np.array(month_days_leap_year),
+                          np.array(month_days_not_leap_year))
+    return np.take_along_axis(month_days, (m - 1)[..., None], -1)[..., 0]
+
+###############################################################################
+
+
+def _serials_from_dmy(d: np.ndarray,
+                      m: np.ndarray,
+                      y: np.ndarray):
+    """ Map arrays of day, month and year onto Excel serials using the same
+    padded lookup table as the Date class. The year range of the table is
+    extended if required. """
+
+    global g_end_year
+
+    if g_date_counter_array is None:
+        calculate_list()
+
+    if len(y) > 0:
+
+        if np.min(y) < g_start_year:
+            raise FinError("Year cannot be before 1900")
+
+        y_max = int(np.max(y))
+
+        if y_max > g_end_year:
+            g_end_year = y_max
+            calculate_list()
+
+    idx = (y - g_start_year) * 12 * 31 + (m - 1) * 31 + (d - 1)
+    serials = g_date_counter_array[idx]
+
+    if np.any(serials < 0):
+        raise FinError("DateArray: day not valid for month.")
+
+    return serials
+
+###############################################################################
+
+
+def _date_from_serial(serial: int):
+    """ Create a Date from an integer Excel serial. """
+
+    idx = int(g_serial_to_index[serial])
+    y = g_start_year + idx // 372
+    m = 1 + (idx // 31) % 12
+    d = 1 + idx % 31
+    return Date(d, m, y)
+
+###############################################################################
+
+
+class DateArray():
+    """ A vector of dates held as a numpy array of integer Excel serials. It
+    supports the same date arithmetic as Date but applies it to all of the
+    dates at once so that large numbers of dates can be generated, shifted,
+    compared and differenced without creating a Date object per element.
+    Intraday times are not held - each element is a whole day. """
+
+    # Make numpy defer to our reflected operators
+    __array_priority__ = 1000
+
+    ###########################################################################
+
+    def __init__(self,
+                 dts):
+        """ Create a DateArray from a list of Dates, another DateArray or
+        a numpy array of integer Excel serials.
+
+        Example Input:
+        dts = DateArray([Date(1, 1, 2018), Date(1, 7, 2018)])
+        """
+
+        if g_date_counter_array is None:
+            calculate_list()
+
+        if isinstance(dts, DateArray):
+            serials = dts._serials
+        elif isinstance(dts, Date):
+            serials = np.array([dts._excel_dt], dtype=np.int32)
+        elif isinstance(dts, np.ndarray):
+            serials = dts.astype(np.int32)
+            if np.any(serials < 1) or \
+                    np.any(serials >= len(g_serial_to_index)) or \
+                    np.any(g_serial_to_index[serials] < 0):
+                raise FinError("DateArray: serial outside valid date range.")
+        else:
+            serials = np.array([int(dt._excel_dt) for dt in dts],
+                               dtype=np.int32)
+
+        self._serials = serials
+
+    ###########################################################################
+
+    @classmethod
+    def from_dmy(cls,
+                 d: np.ndarray,
+                 m: np.ndarray,
+                 y: np.ndarray):
+        """ Create a DateArray from arrays of day, month and year. """
+
+        d = np.asarray(d, dtype=np.int64)
+        m = np.asarray(m, dtype=np.int64)
+        y = np.asarray(y, dtype=np.int64)
+
+        if np.any(m < 1) or np.any(m > 12):
+            raise FinError("DateArray: month must be 1-12")
+
+        if np.any(d < 1) or np.any(d > _days_in_months(m, y)):
+            raise FinError("DateArray: day not valid for month.")
+
+        return cls(_serials_from_dmy(d, m, y))
+
+    ###########################################################################
+
+    def _indices(self):
+        return g_serial_to_index[self._serials].astype(np.int64)
+
+    def d(self):
+        ''' Get days of month as an integer array '''
+        return 1 + self._indices() % 31
+
+    def m(self):
+        ''' Get months of year as an integer array '''
+        return 1 + (self._indices() // 31) % 12
+
+    def y(self):
+        ''' Get years as an integer array '''
+        return g_start_year + self._indices() // 372
+
+    def excel_dt(self):
+        ''' Get the dates as an integer array of Excel serials '''
+        return self._serials
+
+    def weekday(self):
+        ''' Get days of week as an integer array (MON = 0) '''
+        return (self._serials + 5) % 7
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._serials)
+
+    def __iter__(self):
+        for serial in self._serials:
+            yield _date_from_serial(serial)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return _date_from_serial(self._serials[key])
+
+        return DateArray(self._serials[key])
+
+    def to_list(self):
+        """ Returns the dates as a list of Date objects. """
+        return list(self)
+
+    ###########################################################################
+
+    def _other_serials(self, other):
+        """ Serials of the other operand of a comparison or subtraction. """
+
+        if isinstance(other, DateArray):
+            return other._serials
+        elif isinstance(other, Date):
+            return other._excel_dt
+        elif isinstance(other, list):
+            return DateArray(other)._serials
+        else:
+            raise FinError("Cannot combine DateArray with " +
+                           str(type(other)))
+
+    ###########################################################################
+
+    def __gt__(self, other):
+        return self._serials > self._other_serials(other)
+
+    def __lt__(self, other):
+        return self._serials < self._other_serials(other)
+
+    def __ge__(self, other):
+        return self._serials >= self._other_serials(other)
+
+    def __le__(self, other):
+        return self._serials <= self._other_serials(other)
+
+    def __eq__(self, other):
+        return self._serials == self._other_serials(other)
+
+    def __ne__(self, other):
+        return self._serials != self._other_serials(other)
+
+    __hash__ = None
+
+    ###########################################################################
+
+    def __sub__(self, other):
+        """ Number of days from other to each date in the array. """
+        return self._serials - self._other_serials(other)
+
+    def __rsub__(self, other):
+        """ Number of days from each date in the array to other. """
+        return self._other_serials(other) - self._serials
+
+    ###########################################################################
+
+    def is_weekend(self):
+        """ returns True for each date that falls on a weekend. """
+        return self.weekday() >= Date.SAT
+
+    ###########################################################################
+
+    def is_eom(self):
+        """ returns True for each date that falls on a month end. """
+        return self.d() == _days_in_months(self.m(), self.y())
+
+    ###########################################################################
+
+    def eom(self):
+        """ returns the last date of the month of each date. """
+        m = self.m()
+        y = self.y()
+        return DateArray(_serials_from_dmy(_days_in_months(m, y), m, y))
+
+    ###########################################################################
+
+    def add_days(self,
+                 num_days: (int, np.ndarray) = 1):
+        """ Returns a new DateArray with each date moved by num_days, which
+        may be an integer or an array with one entry per date. """
+
+        serials = self._serials + np.asarray(num_days, dtype=np.int64)
+        return DateArray(serials)
+
+    ###########################################################################
+
+    def add_months(self,
+                   mm: (int, np.ndarray)):
+        """ Returns a new DateArray that is mm months after each date. If the
+        day of the month does not exist in the new month it is set to the last
+        day of that month, as in Date.add_months. """
+
+        mm = np.asarray(mm)
+
+        if np.any(mm != np.round(mm)):
+            raise FinError("Must only pass integers or float integers.")
+
+        total = self.y() * 12 + (self.m() - 1) + mm.astype(np.int64)
+        y = total // 12
+        m = total % 12 + 1
+        d = np.minimum(self.d(), _days_in_months(m, y))
+        return DateArray(_serials_from_dmy(d, m, y))
+
+    ###########################################################################
+
+    def add_years(self,
+                  yy: (int, np.ndarray)):
+        """ Returns a new DateArray that is a whole number yy of years after
+        each date. """
+
+        yy = np.asarray(yy)
+
+        if np.any(yy != np.round(yy)):
+            raise FinError("Must only pass integers or float integers.")
+
+        return self.add_months(12 * yy)
+
+    ###########################################################################
+
+    def add_tenor(self,
+                  tenor: str):
+        """ Returns a new DateArray with each date moved by the tenor, which
+        is a string such as '3M' or '10Y'. The result matches Date.add_tenor
+        applied to each date - it is NOT holiday adjusted. """
+
+        if isinstance(tenor, str) is False:
+            raise FinError("Tenor must be a string e.g. '5Y'")
+
+        period_type, num_periods = _parse_tenor(tenor)
+
+        if period_type == _DAYS:
+            return self.add_days(num_periods)
+        elif period_type == _WEEKS:
+            return self.add_days(7 * num_periods)
+        elif period_type == _MONTHS:
+            return self.add_months(num_periods)
+        else:
+            # Date.add_tenor moves a year at a time so that a 29th February
+            # lands on the 28th and stays there in later leap years
+            new_dts = self.add_months(12 * num_periods)
+
+            if num_periods != 0:
+                d = self.d()
+                m = self.m()
+                feb29 = (d == 29) & (m == 2)
+                if np.any(feb29):
+                    serials = new_dts._serials.copy()
+                    new_d = new_dts.d()
+                    serials[feb29 & (new_d == 29)] -= 1
+                    new_dts = DateArray(serials)
+
+            return new_dts
+
+    ###########################################################################
+
+    def __repr__(self):
+        """ returns a formatted string of the dates """
+        return "DateArray(" + str(self.to_list()) + ")"
+
+###############################################################################
@@ -2,11 +2,16 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from .date import Date
+import numpy as np
+from numba import njit
+
+from . import date as date_module
+from .date import Date, DateArray
 from .date import datediff
 from .date import is_leap_year
 from .error import FinError
 from .frequency import FrequencyTypes, annual_frequency
+from .calendar import Calendar, CalendarTypes
 from .global_vars import gDaysInYear
 
 from enum import Enum
@@ -44,6 +49,7 @@ def is_last_day_of_feb(dt: Date):
 #    ACT_365F = 7  # Denominator is always Fixed at 365, even in a leap year
 #    ACT_360 = 8
 #    ACT_365L = 9  # the 29 Feb is counted if it is in the date range
+#    BUS_252 = 11  # Business days in the period divided by 252 (Brazil)
 ###############################################################################
 
 
@@ -59,6 +65,212 @@ class DayCountTypes(Enum):
     ACT_360 = 8
     ACT_365L = 9
     SIMPLE = 10  # actual divided by gDaysInYear
+    BUS_252 = 11  # business days divided by 252
+
+###############################################################################
+
+
+
+
+def _date_fields(dts):
+    """ Day, month, year and Excel date arrays of a Date, a list of Dates or
+    a DateArray. Intraday times in Dates are kept in the Excel date. """
+
+    if isinstance(dts, DateArray):
+        return (dts.d().astype(np.int64), dts.m().astype(np.int64),
+                dts.y().astype(np.int64), dts.excel_dt().astype(np.float64))
+    elif isinstance(dts, Date):
+        dts = [dts]
+    elif not isinstance(dts, list):
+        raise FinError("Dates must be a Date, a list of Dates or a DateArray")
+
+    d = np.array([dt._d for dt in dts], dtype=np.int64)
+    m = np.array([dt._m for dt in dts], dtype=np.int64)
+    y = np.array([dt._y for dt in dts], dtype=np.int64)
+    t = np.array([dt._excel_dt for dt in dts], dtype=np.float64)
+    return d, m, y, t
+
+###############################################################################
+
+
+def _jan1_serials(y: np.ndarray):
+    """ Excel serials of 1 January of each year in y. """
+    ones = np.ones(len(y), dtype=np.int64)
+    return date_module._serials_from_dmy(ones, ones, y).astype(np.float64)
+
+
+def _feb29_serials(y: np.ndarray):
+    """ Excel serials of 29 February of each year in y. Set to 1 Jan 1900 if
+    the year is not a leap year. """
+    leap = ((y % 4 == 0) & (y % 100 != 0)) | (y % 400 == 0)
+    d = np.where(leap, 29, 1)
+    m = np.where(leap, 2, 1)
+    y = np.where(leap, y, 1900)
+    return date_module._serials_from_dmy(d, m, y).astype(np.float64)
+
+###############################################################################
+# No fastmath so that each year fraction is bitwise the same as year_frac
+###############################################################################
+
+
+@njit(cache=True)
+def _is_leap(y):
+    return ((y % 4 == 0) and (y % 100 != 0) or (y % 400 == 0))
+
+
+@njit(cache=True)
+def _is_last_day_of_feb(d, m, y):
+    if m == 2:
+        if _is_leap(y):
+            return d == 29
+        else:
+            return d == 28
+    return False
+
+
+@njit(cache=True)
+def _year_fracs(dcc, d1, m1, y1, t1, d2, m2, y2, t2, y3, t3, jan1_next1,
+                jan1_2, feb29, freq, is_termination):
+    """ Year fractions, numerators and denominators of the day count with
+    integer value dcc for arrays of start and end dates given as day, month,
+    year and Excel date. Auxiliary serials are only filled in for the day
+    counts that need them. """
+
+    n = len(t1)
+    acc_factors = np.zeros(n)
+    nums = np.zeros(n)
+    dens = np.zeros(n)
+
+    for i in range(0, n):
+
+        dd1 = d1[i]
+        dd2 = d2[i]
+        mm2 = m2[i]
+
+        if dcc == 1:  # THIRTY_360_BOND
+
+            if dd1 == 31:
+                dd1 = 30
+
+            if dd2 == 31 and dd1 == 30:
+                dd2 = 30
+
+            num = 360 * (y2[i] - y1[i]) + 30 * (mm2 - m1[i]) + (dd2 - dd1)
+            nums[i] = num
+            dens[i] = 360
+            acc_factors[i] = num / 360
+
+        elif dcc == 2:  # THIRTY_E_360
+
+            if dd1 == 31:
+                dd1 = 30
+
+            if dd2 == 31:
+                dd2 = 30
+
+            num = 360 * (y2[i] - y1[i]) + 30 * (mm2 - m1[i]) + (dd2 - dd1)
+            nums[i] = num
+            dens[i] = 360
+            acc_factors[i] = num / 360
+
+        elif dcc == 3:  # THIRTY_E_360_ISDA
+
+            if dd1 == 31:
+                dd1 = 30
+
+            if _is_last_day_of_feb(d1[i], m1[i], y1[i]):
+                dd1 = 30
+
+            if dd2 == 31:
+                dd2 = 30
+
+            if _is_last_day_of_feb(d2[i], mm2, y2[i]) and \
+                    not is_termination[i]:
+                dd2 = 30
+
+            num = 360 * (y2[i] - y1[i]) + 30 * (mm2 - m1[i]) + (dd2 - dd1)
+            nums[i] = num
+            dens[i] = 360
+            acc_factors[i] = num / 360
+
+        elif dcc == 4:  # THIRTY_E_PLUS_360
+
+            if dd1 == 31:
+                dd1 = 30
+
+            if dd2 == 31:
+                mm2 = mm2 + 1  # May roll to 13 but we are doing a difference
+                dd2 = 1
+
+            num = 360 * (y2[i] - y1[i]) + 30 * (mm2 - m1[i]) + (dd2 - dd1)
+            nums[i] = num
+            dens[i] = 360
+            acc_factors[i] = num / 360
+
+        elif dcc == 5 or dcc == 0:  # ACT_ACT_ISDA or ZERO
+
+            if _is_leap(y1[i]):
+                denom1 = 366
+            else:
+                denom1 = 365
+
+            if _is_leap(y2[i]):
+                denom2 = 366
+            else:
+                denom2 = 365
+
+            if y1[i] == y2[i]:
+                nums[i] = t2[i] - t1[i]
+                dens[i] = denom1
+                acc_factors[i] = (t2[i] - t1[i]) / denom1
+            else:
+                day_years_1 = int(jan1_next1[i] - t1[i])
+                day_years_2 = int(t2[i] - jan1_2[i])
+                acc_factor1 = day_years_1 / denom1
+                acc_factor2 = day_years_2 / denom2
+                year_diff = y2[i] - y1[i] - 1.0
+                nums[i] = day_years_1 + day_years_2
+                dens[i] = denom1 + denom2
+                acc_factors[i] = acc_factor1 + acc_factor2 + year_diff
+
+        elif dcc == 6:  # ACT_ACT_ICMA
+
+            num = t2[i] - t1[i]
+            den = freq * (t3[i] - t1[i])
+            nums[i] = num
+            dens[i] = den
+            acc_factors[i] = num / den
+
+        elif dcc == 7:  # ACT_365F
+
+            nums[i] = t2[i] - t1[i]
+            dens[i] = 365
+            acc_factors[i] = (t2[i] - t1[i]) / 365
+
+        elif dcc == 8:  # ACT_360
+
+            nums[i] = t2[i] - t1[i]
+            dens[i] = 360
+            acc_factors[i] = (t2[i] - t1[i]) / 360
+
+        elif dcc == 9:  # ACT_365L
+
+            num = t2[i] - t1[i]
+            den = 365
+
+            if freq == 1:
+                if feb29[i] > t1[i] and feb29[i] <= t3[i]:
+                    den = 366
+            else:
+                if _is_leap(y3[i]):
+                    den = 366
+
+            nums[i] = num
+            dens[i] = den
+            acc_factors[i] = num / den
+
+    return acc_factors, nums, dens
+
 
 ###############################################################################
 
@@ -68,13 +280,16 @@ class DayCount:
     specified day count convention. """
 
     def __init__(self,
-                 dccType: DayCountTypes):
-        """ Create Day Count convention by passing in the Day Count Type. """
+                 dccType: DayCountTypes,
+                 cal_type: CalendarTypes = CalendarTypes.WEEKEND):
+        """ Create Day Count convention by passing in the Day Count Type. The
+        calendar is only used by BUS_252 to count business days. """
 
         if dccType not in DayCountTypes:
             raise FinError("Need to pass FinDayCountType")
 
         self._type = dccType
+        self._cal_type = cal_type
 
 ###############################################################################
 
@@ -284,11 +499,120 @@ class DayCount:
             acc_factor = num / den
             return acc_factor, num, den
 
+        elif self._type == DayCountTypes.BUS_252:
+
+            # Business days from dt1 (inclusive) to dt2 (exclusive) using
+            # the cumulative business day counts of the calendar
+            calendar = Calendar(self._cal_type)
+            num = calendar.business_days_between(dt1, dt2)
+            den = 252
+            acc_factor = num / den
+            return acc_factor, num, den
+
         else:
 
             raise FinError(str(self._type) +
                            " is not one of DayCountTypes")
 
+###############################################################################
+
+    def year_fracs(self,
+                   dt1s: (Date, list, DateArray),
+                   dt2s: (Date, list, DateArray),
+                   dt3s: (Date, list, DateArray) = None,
+                   freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
+                   isTerminationDate: (bool, list, np.ndarray) = False):
+        """ Vectorised version of year_frac for many periods at once. Each of
+        the dates can be a list of Dates, a DateArray or a single Date that
+        applies to every period. The year fractions, numerators and
+        denominators are calculated in a compiled loop and returned as three
+        numpy arrays. They are the same as those given by year_frac. """
+
+        d1, m1, y1, t1 = _date_fields(dt1s)
+        d2, m2, y2, t2 = _date_fields(dt2s)
+
+        if dt3s is None:
+            has_dt3 = False
+            y3 = y2
+            t3 = t2
+        else:
+            has_dt3 = True
+            _, _, y3, t3 = _date_fields(dt3s)
+
+        is_termination = np.asarray(isTerminationDate, dtype=np.bool_)
+
+        # A single date or flag applies to all of the periods
+        (d1, m1, y1, t1, d2, m2, y2, t2, y3, t3, is_termination) = \
+            [np.array(x) for x in np.broadcast_arrays(d1, m1, y1, t1,
+                                                      d2, m2, y2, t2,
+                                                      y3, t3,
+                                                      is_termination)]
+
+        num_periods = len(t1)
+        jan1_next1 = jan1_2 = feb29 = np.zeros(num_periods)
+
+        freq = annual_frequency(freq_type)
+
+        if self._type in [DayCountTypes.ACT_ACT_ISDA, DayCountTypes.ZERO]:
+
+            jan1_next1 = _jan1_serials(y1 + 1)
+            jan1_2 = _jan1_serials(y2)
+
+        elif self._type == DayCountTypes.ACT_ACT_ICMA:
+
+            if dt3s is None or freq is None:
+                raise FinError("ACT_ACT_ICMA requires three dates and a freq")
+
+        elif self._type == DayCountTypes.ACT_365L:
+
+            # The leap year of the start date is used before that of the end
+            y_feb29 = np.where(((y1 % 4 == 0) & (y1 % 100 != 0)) |
+                               (y1 % 400 == 0), y1, y3)
+            feb29 = _feb29_serials(y_feb29)
+
+            if freq == 1 and has_dt3 is False and np.any(feb29 > t1):
+                raise FinError("ACT_365L with an annual frequency needs "
+                               "the end of coupon period dates")
+
+        elif self._type == DayCountTypes.SIMPLE:
+
+            nums = t2 - t1
+            dens = np.full(num_periods, gDaysInYear)
+            return nums / dens, nums, dens
+
+        elif self._type == DayCountTypes.BUS_252:
+
+            calendar = Calendar(self._cal_type)
+            nums = calendar.business_days_between(
+                DateArray(t1.astype(np.int64)), DateArray(t2.astype(np.int64)))
+            dens = np.full(num_periods, 252)
+            return nums / dens, nums, dens
+
+        elif self._type not in DayCountTypes:
+
+            raise FinError(str(self._type) +
+                           " is not one of DayCountTypes")
+
+        if freq is None:
+            freq = np.nan
+
+        acc_factors, nums, dens = _year_fracs(self._type.value,
+                                              d1, m1, y1, t1,
+                                              d2, m2, y2, t2,
+                                              y3, t3, jan1_next1, jan1_2,
+                                              feb29,
+                                              float(freq), is_termination)
+
+        # The numerators of the 30/360 conventions are whole days
+        if self._type in [DayCountTypes.THIRTY_360_BOND,
+                          DayCountTypes.THIRTY_E_360,
+                          DayCountTypes.THIRTY_E_360_ISDA,
+                          DayCountTypes.THIRTY_E_PLUS_360]:
+            nums = nums.astype(np.int64)
+            dens = dens.astype(np.int64)
+
+        return acc_factors, nums, dens
+
 ###############################################################################
 
     def __repr__(self):
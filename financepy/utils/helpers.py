@@ -2,13 +2,15 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import os
 import sys
 import numpy as np
 from numba import njit, float64
 from typing import Union
+from enum import Enum
 from prettytable import PrettyTable
 
-from .date import Date
+from .date import Date, DateArray
 from .global_vars import gDaysInYear, gSmall
 from .error import FinError
 from .day_count import DayCountTypes, DayCount
@@ -78,13 +80,15 @@ def pv01_times(t: float,
 ###############################################################################
 
 
-def times_from_dates(dt: (Date, list),
+def times_from_dates(dt: (Date, list, DateArray),
                      value_dt: Date,
                      day_count_type: DayCountTypes = None):
     """ If a single date is passed in then return the year from valuation date
     but if a whole vector of dates is passed in then convert to a vector of
     times from the valuation date. The output is always a numpy vector of times
-    which has only one element if the input is only one date. """
+    which has only one element if the input is only one date. A DateArray is
+    converted without creating individual Date objects when no day count is
+    given. """
 
     if isinstance(value_dt, Date) is False:
         raise FinError("Valuation date is not a Date")
@@ -105,17 +109,23 @@ def times_from_dates(dt: (Date, list),
         return times[0]
 
     elif isinstance(dt, list) and isinstance(dt[0], Date):
+        if dc_counter is not None:
+            return dc_counter.year_fracs(value_dt, dt)[0]
+
         num_dates = len(dt)
         times = []
         for i in range(0, num_dates):
-            if dc_counter is None:
-                t = (dt[i] - value_dt) / gDaysInYear
-            else:
-                t = dc_counter.year_frac(value_dt, dt[i])[0]
+            t = (dt[i] - value_dt) / gDaysInYear
             times.append(t)
 
         return np.array(times)
 
+    elif isinstance(dt, DateArray):
+        if dc_counter is None:
+            return (dt.excel_dt() - value_dt.excel_dt()) / gDaysInYear
+        else:
+            return dc_counter.year_fracs(value_dt, dt)[0]
+
     elif isinstance(dt, np.ndarray):
         raise FinError("You passed an ndarray instead of dates.")
     else:
@@ -494,10 +504,105 @@ def accrued_tree(grid_times: np.ndarray,
 ###############################################################################
 
 
+class ValidationTypes(Enum):
+    OFF = 1  # No checking of argument types
+    CACHED = 2  # Types resolved once per function and then reused
+    STRICT = 3  # Types resolved from the annotations on every call
+
+###############################################################################
+# The level can be set with the FINANCEPY_VALIDATION environment variable to
+# one of OFF, CACHED or STRICT before the library is imported, or at any time
+# with set_validation_level.
+###############################################################################
+
+
+def _validation_level_from_env():
+    """ Read the validation level from the environment. """
+
+    name = os.environ.get("FINANCEPY_VALIDATION", "CACHED").upper()
+
+    if name not in ValidationTypes.__members__:
+        raise FinError("FINANCEPY_VALIDATION must be one of OFF, CACHED or "
+                       "STRICT and not " + name)
+
+    return ValidationTypes[name]
+
+
+g_validation_level = _validation_level_from_env()
+
+# Resolved argument types for each function checked at the CACHED level
+g_argument_types = {}
+
+
+def set_validation_level(level: ValidationTypes):
+    """ Set how check_argument_types checks the arguments of constructors and
+    methods. Switching validation OFF removes the cost of the checks from
+    code that is already known to be correct. """
+
+    global g_validation_level
+
+    if isinstance(level, ValidationTypes) is False:
+        raise FinError("Validation level must be a ValidationTypes")
+
+    g_validation_level = level
+
+
+def get_validation_level():
+    """ Return the level at which argument types are checked. """
+    return g_validation_level
+
+###############################################################################
+
+
+def _argument_type_error(func, value_name, value, usable_type):
+    """ Report an argument of the wrong type and raise. """
+
+    print("ERROR with function arguments for", func.__name__)
+    print("This is in module", func.__module__)
+    print("Please check inputs for argument >>", value_name, "<<")
+    print("You have input an argument", value, "of type", type(value))
+    print("The allowed types are", usable_type)
+    print("It is none of these so FAILS. Please amend.")
+    raise FinError("Argument Type Error")
+
+
+def _resolved_argument_types(func):
+    """ The annotated argument names of a function with their types in a form
+    that isinstance accepts. These are worked out on the first call and then
+    held per function. """
+
+    # A bound method is a new object on each access so key on the function
+    key = getattr(func, "__func__", func)
+    argument_types = g_argument_types.get(key)
+
+    if argument_types is None:
+        argument_types = tuple((value_name, to_usable_type(annotation_type))
+                               for value_name, annotation_type
+                               in func.__annotations__.items()
+                               if value_name != "return")
+        g_argument_types[key] = argument_types
+
+    return argument_types
+
+
 def check_argument_types(func, values):
     """ Check that all values passed into a function are of the same type
     as the function annotations. If a value has not been annotated, it
-    will not be checked. """
+    will not be checked. How this is done depends on the validation level. """
+
+    if g_validation_level == ValidationTypes.OFF:
+        return
+
+    if g_validation_level == ValidationTypes.CACHED:
+
+        for value_name, usable_type in _resolved_argument_types(func):
+            if value_name in values:
+                value = values[value_name]
+                if not isinstance(value, usable_type):
+                    _argument_type_error(func, value_name, value, usable_type)
+
+        return
+
     for value_name, annotation_type in func.__annotations__.items():
 
         if value_name in values:
@@ -505,13 +610,6 @@ def check_argument_types(func, values):
             usable_type = to_usable_type(annotation_type)
 
         if (not isinstance(value, usable_type)):
-
-            print("ERROR with function arguments for", func.__name__)
-            print("This is in module", func.__module__)
-            print("Please check inputs for argument >>", value_name, "<<")
-            print("You have input an argument", value, "of type", type(value))
-            print("The allowed types are", usable_type)
-            print("It is none of these so FAILS. Please amend.")
-            raise FinError("Argument Type Error")
+            _argument_type_error(func, value_name, value, usable_type)
 
 ###############################################################################
@@ -2,10 +2,12 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+from collections import OrderedDict, namedtuple
+from bisect import bisect_left
 
 from .error import FinError
 from .date import Date
-from .calendar import (Calendar, CalendarTypes)
+from .calendar import (Calendar, CalendarTypes, JointCalendarType)
 from .calendar import (BusDayAdjustTypes, DateGenRuleTypes)
 from .frequency import (annual_frequency, FrequencyTypes)
 from .helpers import label_to_string
@@ -16,6 +18,138 @@ from .helpers import check_argument_types
 # TODO: Start and end date to allow for long stubs
 ###############################################################################
 
+###############################################################################
+# A schedule is generated each time a swap, CDS or bond is created but a book
+# of trades has only a few distinct sets of contract terms. The adjusted dates
+# are held in a store that is shared across the process and which evicts the
+# least recently used entry when it is full.
+###############################################################################
+
+ScheduleCacheInfo = namedtuple("ScheduleCacheInfo",
+                               ["hits", "misses", "max_size", "curr_size"])
+
+g_schedule_cache = OrderedDict()
+g_schedule_cache_size = 10000
+g_schedule_cache_hits = 0
+g_schedule_cache_misses = 0
+
+
+def set_schedule_cache_size(max_size: int = 10000):
+    """ Set the number of distinct sets of schedule terms held in the cache.
+    A size of zero switches the cache off. """
+
+    global g_schedule_cache_size
+
+    if max_size < 0:
+        raise FinError("Schedule cache size cannot be negative")
+
+    g_schedule_cache_size = max_size
+
+    while len(g_schedule_cache) > max_size:
+        g_schedule_cache.popitem(last=False)
+
+
+def clear_schedule_cache():
+    """ Remove all entries from the schedule cache and reset its hit and miss
+    counts. """
+
+    global g_schedule_cache_hits
+    global g_schedule_cache_misses
+
+    g_schedule_cache.clear()
+    g_schedule_cache_hits = 0
+    g_schedule_cache_misses = 0
+
+
+def schedule_cache_info():
+    """ Return the hits, misses, maximum size and current size of the
+    schedule cache. """
+
+    return ScheduleCacheInfo(g_schedule_cache_hits,
+                             g_schedule_cache_misses,
+                             g_schedule_cache_size,
+                             len(g_schedule_cache))
+
+
+def _cached(key, build):
+    """ Return the cache entry for key. If there is none it is created by
+    calling build and then stored. """
+
+    global g_schedule_cache_hits
+    global g_schedule_cache_misses
+
+    value = g_schedule_cache.get(key)
+
+    if value is not None:
+        g_schedule_cache.move_to_end(key)
+        g_schedule_cache_hits += 1
+        return value
+
+    g_schedule_cache_misses += 1
+    value = build()
+
+    if g_schedule_cache_size > 0:
+        g_schedule_cache[key] = value
+        if len(g_schedule_cache) > g_schedule_cache_size:
+            g_schedule_cache.popitem(last=False)
+
+    return value
+
+###############################################################################
+
+
+class _BackwardRoll():
+    """ Coupon dates generated by stepping back from a termination date, held
+    both unadjusted and adjusted. The roll is extended back as far as the
+    earliest effective date asked of it. Schedules with the same terms that
+    differ only in their effective date all draw on the same dates. """
+
+    def __init__(self,
+                 termination_dt: Date,
+                 num_months: int,
+                 calendar: Calendar,
+                 bd_type: BusDayAdjustTypes,
+                 end_of_month: bool):
+
+        self._termination_dt = termination_dt
+        self._num_months = num_months
+        self._calendar = calendar
+        self._bd_type = bd_type
+        self._end_of_month = end_of_month
+
+        # In reverse time order. The termination date is not adjusted here.
+        self._unadjusted_dts = [termination_dt]
+        self._adjusted_dts = [termination_dt]
+
+        # Negated so that bisect can search the dates in increasing order
+        self._neg_excel_dts = [-termination_dt._excel_dt]
+
+    ###########################################################################
+
+    def coupon_dts(self,
+                   effective_dt: Date):
+        """ Adjusted coupon dates after the effective date and before the
+        termination date in time order. """
+
+        while self._unadjusted_dts[-1] > effective_dt:
+
+            tot_num_months = self._num_months * len(self._unadjusted_dts)
+            next_dt = self._termination_dt.add_months(-tot_num_months)
+
+            if self._end_of_month is True:
+                next_dt = next_dt.eom()
+
+            self._unadjusted_dts.append(next_dt)
+            self._adjusted_dts.append(self._calendar.adjust(next_dt,
+                                                            self._bd_type))
+            self._neg_excel_dts.append(-next_dt._excel_dt)
+
+        # Number of unadjusted dates after the effective date
+        n = bisect_left(self._neg_excel_dts, -effective_dt._excel_dt)
+        return self._adjusted_dts[n - 1:0:-1]
+
+###############################################################################
+
 
 class Schedule:
     """ A schedule is a set of dates generated according to ISDA standard
@@ -29,7 +163,8 @@ class Schedule:
                  # This is UNADJUSTED (set flag to adjust it)
                  termination_dt: Date,
                  freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
-                 cal_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 cal_type: (CalendarTypes,
+                            JointCalendarType) = CalendarTypes.WEEKEND,
                  bd_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
                  dg_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
                  adjust_termination_dt: bool = True,  # Default is to adjust
@@ -136,66 +271,37 @@ class Schedule:
         frequency = annual_frequency(self._freq_type)
         num_months = int(12 / frequency)
 
-        unadjusted_schedule_dts = []
-        self._adjusted_dts = []
-
         if self._dg_type == DateGenRuleTypes.BACKWARD:
 
-            next_dt = self._termination_dt
-            flow_num = 0
-
-            while next_dt > self._effective_dt:
-
-                unadjusted_schedule_dts.append(next_dt)
-                tot_num_months = num_months * (1 + flow_num)
-                next_dt = self._termination_dt.add_months(-tot_num_months)
-
-                if self._end_of_month is True:
-                    next_dt = next_dt.eom()
-
-                flow_num += 1
-
-            # Add on the Previous Coupon Date
-            unadjusted_schedule_dts.append(next_dt)
-            flow_num += 1
+            # The roll does not depend on the effective date so it is shared
+            # by all schedules with the same termination date and terms
+            key = (DateGenRuleTypes.BACKWARD, self._termination_dt._excel_dt,
+                   num_months, self._cal_type, self._bd_type,
+                   self._end_of_month)
 
-            # reverse order and holiday adjust dates
-            # the first date is not adjusted as this was provided
-            dt = unadjusted_schedule_dts[flow_num - 1]
-            self._adjusted_dts.append(dt)
+            roll = _cached(key, lambda: _BackwardRoll(self._termination_dt,
+                                                      num_months,
+                                                      calendar,
+                                                      self._bd_type,
+                                                      self._end_of_month))
 
+            # The previous coupon date is replaced by the effective date below
             # We adjust all flows after the effective date and before the
             # termination date to fall on business days according to their cal
-            for i in range(1, flow_num - 1):
-                dt = calendar.adjust(unadjusted_schedule_dts[flow_num - i - 1],
-                                     self._bd_type)
-
-                self._adjusted_dts.append(dt)
-
+            self._adjusted_dts = [self._effective_dt]
+            self._adjusted_dts += roll.coupon_dts(self._effective_dt)
             self._adjusted_dts.append(self._termination_dt)
 
         elif self._dg_type == DateGenRuleTypes.FORWARD:
 
-            # This needs checking
-            next_dt = self._effective_dt
-            flow_num = 0
-
-            unadjusted_schedule_dts.append(next_dt)
-            flow_num = 1
+            key = (DateGenRuleTypes.FORWARD, self._effective_dt._excel_dt,
+                   self._termination_dt._excel_dt, num_months,
+                   self._cal_type, self._bd_type)
 
-            while next_dt < self._termination_dt:
-                unadjusted_schedule_dts.append(next_dt)
-                tot_num_months = num_months * (flow_num)
-                next_dt = self._effective_dt.add_months(tot_num_months)
-                flow_num = flow_num + 1
-
-            # The effective date is not adjusted as it is given
-            for i in range(1, flow_num):
-                dt = calendar.adjust(unadjusted_schedule_dts[i],
-                                     self._bd_type)
-
-                self._adjusted_dts.append(dt)
+            forward_dts = _cached(key, lambda: self._forward_dts(calendar,
+                                                                 num_months))
 
+            self._adjusted_dts = list(forward_dts)
             self._adjusted_dts.append(self._termination_dt)
 
         if self._adjusted_dts[0] < self._effective_dt:
@@ -238,6 +344,38 @@ class Schedule:
 
     ###########################################################################
 
+    def _forward_dts(self,
+                     calendar: Calendar,
+                     num_months: int):
+        """ Adjusted dates generated by stepping forward from the effective
+        date. They stop before the termination date. """
+
+        # This needs checking
+        next_dt = self._effective_dt
+        flow_num = 0
+
+        unadjusted_schedule_dts = []
+        unadjusted_schedule_dts.append(next_dt)
+        flow_num = 1
+
+        while next_dt < self._termination_dt:
+            unadjusted_schedule_dts.append(next_dt)
+            tot_num_months = num_months * (flow_num)
+            next_dt = self._effective_dt.add_months(tot_num_months)
+            flow_num = flow_num + 1
+
+        # The effective date is not adjusted as it is given
+        adjusted_dts = []
+        for i in range(1, flow_num):
+            dt = calendar.adjust(unadjusted_schedule_dts[i],
+                                 self._bd_type)
+
+            adjusted_dts.append(dt)
+
+        return tuple(adjusted_dts)
+
+    ###########################################################################
+
     def __repr__(self):
         """ Print out the details of the schedule and the actual dates. This
         can be used for providing transparency on schedule calculations. """
@@ -155,3 +155,23 @@ def test_quantlib_hw():
 
     assert round(v['bondwithoption'], 4) == 68.8665
     assert round(v['bondpure'], 4) == 95.0619
+
+
+def test_tree_cache():
+
+    for model in [HWTree(0.01, 0.1, num_time_steps),
+                  BKTree(0.01, 0.1, num_time_steps)]:
+
+        v = puttable_bond_matlab.value(
+            settle_dt_matlab, discount_curve_matlab, model)
+
+        # The bond is valued on two trees which are then reused
+        cache = model.cache_trees()
+
+        for _ in range(0, 3):
+            v_cached = puttable_bond_matlab.value(
+                settle_dt_matlab, discount_curve_matlab, model)
+            assert v_cached == v
+
+        assert cache._num_misses == 2
+        assert cache._num_hits == 4
@@ -4,10 +4,12 @@
 
 from financepy.products.bonds.zero_curve import BondZeroCurve
 from financepy.products.bonds.bond import Bond
-from financepy.utils.date import Date, from_datetime
+from financepy.utils.date import Date, DateArray, from_datetime
 from financepy.utils.day_count import DayCountTypes
+from financepy.utils.global_vars import gDaysInYear
 from financepy.utils.frequency import FrequencyTypes
 import datetime as dt
+import numpy as np
 import os
 
 
@@ -50,3 +52,22 @@ def test_zero_curve():
     maturity_dt = Date(22, 1, 2060)
     zero_rate = bondCurve.zero_rate(maturity_dt)
     assert round(zero_rate, 4) == 0.0351
+
+
+def test_df_date_array():
+
+    dts = [Date(7, 3, 2013), Date(7, 9, 2019), Date(22, 1, 2060)]
+    dfs = bondCurve.df(DateArray(dts))
+
+    for i in range(0, 3):
+        assert abs(dfs[i] - bondCurve.df(dts[i])) < 1e-12
+
+
+def test_fwd():
+
+    # The closed form forward matches a difference of the discount factors
+    for fwd_dt in [Date(1, 1, 2015), Date(15, 6, 2030), Date(1, 1, 2050)]:
+        t = (fwd_dt - settlement) / gDaysInYear
+        h = 1e-6
+        fwd = np.log(bondCurve.df(t) / bondCurve.df(t + h)) / h
+        assert abs(bondCurve.fwd(fwd_dt) - fwd) < 1e-6
@@ -7,6 +7,9 @@ from financepy.utils.date import Date
 from financepy.utils.math import corr_matrix_generator
 from financepy.products.credit.cds_basket import CDSBasket
 from financepy.products.credit.cds_index_portfolio import CDSIndexPortfolio
+from financepy.models.gauss_copula import default_times_gc
+from financepy.models.gauss_copula import default_time_blocks_gc
+from financepy.models.student_t_copula import StudentTCopula
 import numpy as np
 from os.path import dirname, join
 
@@ -142,3 +145,158 @@ def test_student_t():
                                   seed)
 
     assert round(v[2] * 10000, 4) == 26.5991
+
+
+def test_default_time_blocks():
+
+    num_trials = 20000
+    beta = 0.5
+    beta_vector = np.ones(num_credits) * beta
+    corr_matrix = corr_matrix_generator(beta * beta, num_credits)
+
+    times = default_times_gc(issuer_curves, corr_matrix, num_trials, seed)
+    assert times.shape == (num_credits, 2 * num_trials)
+
+    # One block holding all of the trials gives the full matrix
+    blocks = list(default_time_blocks_gc(issuer_curves, num_trials, seed,
+                                         corr_matrix, block_size=num_trials))
+    assert len(blocks) == 1
+    assert (blocks[0] == times).all()
+
+    blocks = list(default_time_blocks_gc(issuer_curves, num_trials, seed,
+                                         beta_vector=beta_vector,
+                                         block_size=3000))
+    assert len(blocks) == 7
+    assert blocks[-1].shape == (num_credits, 4000)
+
+    # The one factor model has the same default probabilities and pairwise
+    # default correlation as the full correlation matrix
+    one_factor_times = np.concatenate(blocks, axis=1)
+    p5 = np.mean(times < 5.0, axis=1)
+    assert np.max(np.abs(np.mean(one_factor_times < 5.0, axis=1) - p5)) \
+        < 0.01
+
+    q = np.array([c.survival_prob(5.0) for c in issuer_curves])
+    assert np.max(np.abs(p5 - (1.0 - q))) < 0.01
+
+    both = np.mean((times[0] < 5.0) & (times[1] < 5.0))
+    both_1f = np.mean((one_factor_times[0] < 5.0) &
+                      (one_factor_times[1] < 5.0))
+    assert abs(both - both_1f) < 0.005
+
+    model = StudentTCopula()
+    times = model.default_times(issuer_curves, corr_matrix, 5, num_trials,
+                                seed)
+    blocks = list(model.default_time_blocks(issuer_curves, 5, num_trials,
+                                            seed, beta_vector=beta_vector,
+                                            block_size=5000))
+    assert len(blocks) == 4
+
+    one_factor_times = np.concatenate(blocks, axis=1)
+    p5 = np.mean(times < 5.0, axis=1)
+    assert np.max(np.abs(np.mean(one_factor_times < 5.0, axis=1) - p5)) \
+        < 0.01
+
+
+def test_default_time_blocks_threads():
+
+    num_trials = 20000
+    beta_vector = np.ones(num_credits) * 0.5
+    corr_matrix = corr_matrix_generator(0.25, num_credits)
+
+    # Each block has its own stream and so threads give the same blocks
+    for num_threads in [2, 3]:
+
+        serial = default_time_blocks_gc(issuer_curves, num_trials, seed,
+                                        corr_matrix, block_size=3000)
+        threaded = default_time_blocks_gc(issuer_curves, num_trials, seed,
+                                          corr_matrix, block_size=3000,
+                                          num_threads=num_threads)
+        for block, threaded_block in zip(serial, threaded):
+            assert (block == threaded_block).all()
+
+        model = StudentTCopula()
+        serial = model.default_time_blocks(issuer_curves, 5, num_trials,
+                                           seed, beta_vector=beta_vector,
+                                           block_size=3000)
+        threaded = model.default_time_blocks(issuer_curves, 5, num_trials,
+                                             seed, beta_vector=beta_vector,
+                                             block_size=3000,
+                                             num_threads=num_threads)
+        for block, threaded_block in zip(serial, threaded):
+            assert (block == threaded_block).all()
+
+    # The blocks are not repeated
+    blocks = list(default_time_blocks_gc(issuer_curves, num_trials, seed,
+                                         corr_matrix, block_size=3000))
+    assert not np.array_equal(blocks[0], blocks[1][:, 0:6000])
+
+    # With no trials the matrix of default times is empty
+    times = default_times_gc(issuer_curves, corr_matrix, 0, seed)
+    assert times.shape == (num_credits, 0)
+
+    times = model.default_times(issuer_curves, corr_matrix, 5, 0, seed)
+    assert times.shape == (num_credits, 0)
+
+
+def test_value_legs_blocks():
+
+    num_trials = 5000
+    corr_matrix = corr_matrix_generator(0.25, num_credits)
+
+    times = default_times_gc(issuer_curves, corr_matrix, num_trials, seed)
+
+    # Streaming the trials in blocks gives the same legs
+    for ntd in [1, 2, 5]:
+        rpv01, prot = basket.value_legs_mc(value_dt, ntd, times,
+                                           issuer_curves, libor_curve)
+        blocks = [times[:, 0:3000], times[:, 3000:7000], times[:, 7000:]]
+        rpv01_b, prot_b = basket.value_legs_mc(value_dt, ntd, blocks,
+                                               issuer_curves, libor_curve)
+        assert abs(rpv01_b - rpv01) < 1e-10
+        assert abs(prot_b - prot) < 1e-10
+
+    v1 = basket.value_gaussian_mc(value_dt, 2, issuer_curves, corr_matrix,
+                                  libor_curve, num_trials, seed)
+    v2 = basket.value_gaussian_mc(value_dt, 2, issuer_curves, corr_matrix,
+                                  libor_curve, num_trials, seed,
+                                  block_size=1000)
+    assert abs(v1[2] - v2[2]) * 10000 < 2.0
+
+
+def test_value_legs_threads():
+
+    num_trials = 20000
+    corr_matrix = corr_matrix_generator(0.25, num_credits)
+
+    times = default_times_gc(issuer_curves, corr_matrix, num_trials, seed)
+
+    # Splitting the trials across threads gives the same legs
+    for ntd in [1, 2, 5]:
+        rpv01, prot = basket.value_legs_mc(value_dt, ntd, times,
+                                           issuer_curves, libor_curve)
+        rpv01_t, prot_t = basket.value_legs_mc(value_dt, ntd, times,
+                                               issuer_curves, libor_curve,
+                                               num_threads=3)
+        assert abs(rpv01_t - rpv01) < 1e-10
+        assert abs(prot_t - prot) < 1e-10
+
+    # By default the trials are drawn in one block as in default_times_gc
+    v1 = basket.value_gaussian_mc(value_dt, 2, issuer_curves, corr_matrix,
+                                  libor_curve, num_trials, seed)
+    v2 = basket.value_gaussian_mc(value_dt, 2, issuer_curves, corr_matrix,
+                                  libor_curve, num_trials, seed,
+                                  num_threads=3)
+    v3 = basket.value_gaussian_mc(value_dt, 2, issuer_curves, corr_matrix,
+                                  libor_curve, num_trials, seed,
+                                  block_size=num_trials)
+    assert abs(v2[2] - v1[2]) < 1e-12
+    assert abs(v3[2] - v1[2]) < 1e-12
+
+    v1 = basket.value_student_t_mc(value_dt, 2, issuer_curves,
+                                   corr_matrix, 5, libor_curve, num_trials,
+                                   seed, block_size=3000)
+    v2 = basket.value_student_t_mc(value_dt, 2, issuer_curves,
+                                   corr_matrix, 5, libor_curve, num_trials,
+                                   seed, block_size=3000, num_threads=3)
+    assert abs(v2[2] - v1[2]) < 1e-12
@@ -8,8 +8,40 @@ from financepy.utils.day_count import DayCountTypes
 from financepy.utils.frequency import FrequencyTypes
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
 from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.credit.cds_curve import build_cds_curves
 from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.credit.cds import CDS
+from financepy.utils.error import FinError
+from financepy.market.curves.interpolator import InterpTypes
+import numpy as np
+import pytest
+
+curve_dt = Date(20, 12, 2018)
+
+
+def build_libor_curve():
+
+    swaps = []
+
+    for i in range(1, 11):
+        maturity_dt = curve_dt.add_months(12 * i)
+        swap = IborSwap(curve_dt, maturity_dt, SwapTypes.PAY, 0.05,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    return IborSingleCurve(curve_dt, [], [], swaps)
+
+
+def build_cds_contracts():
+
+    cds_contracts = []
+
+    for i in range(1, 11):
+        maturity_dt = curve_dt.add_months(12 * i)
+        cds = CDS(curve_dt, maturity_dt, 0.005 + 0.001 * (i - 1))
+        cds_contracts.append(cds)
+
+    return cds_contracts
 
 
 def test_FinCDSCurve():
@@ -79,3 +111,138 @@ def test_FinCDSCurve():
     v = cds.value(curve_dt, issuer_curve, recovery_rate)
     assert round(v['dirty_pv'] * 1000, 4) == -1.1491
     assert round(v['clean_pv'] * 1000, 4) == -1.1491
+
+
+def test_update_quotes():
+
+    libor_curve = build_libor_curve()
+    cds_contracts = build_cds_contracts()
+
+    issuer_curve = CDSCurve(curve_dt, cds_contracts, libor_curve, 0.40)
+    values = issuer_curve._values.copy()
+
+    issuer_curve.update_quotes({5: 0.0105})
+
+    # The survival probabilities before the changed contract do not move
+    assert issuer_curve._quotes[5] == 0.0105
+    assert (issuer_curve._values[0:6] == values[0:6]).all()
+    assert issuer_curve._values[6] < values[6]
+
+    # The result does not depend on the history of the curve
+    new_curve = CDSCurve(curve_dt, cds_contracts, libor_curve, 0.40)
+    assert (issuer_curve._values == new_curve._values).all()
+
+
+def test_fast_bootstrap():
+
+    libor_curve = build_libor_curve()
+    cds_contracts = build_cds_contracts()
+
+    issuer_curve = CDSCurve(curve_dt, cds_contracts, libor_curve, 0.40)
+    fast_curve = CDSCurve(curve_dt, cds_contracts, libor_curve, 0.40,
+                          fast_bootstrap=True)
+
+    # The standard bootstrap keeps the last point tried by the root search
+    for i in range(0, 11):
+        assert fast_curve._times[i] == issuer_curve._times[i]
+        assert abs(fast_curve._values[i] - issuer_curve._values[i]) < 1e-8
+
+    issuer_curve.update_quotes({5: 0.0105})
+    fast_curve.update_quotes({5: 0.0105})
+
+    for i in range(0, 11):
+        assert abs(fast_curve._values[i] - issuer_curve._values[i]) < 1e-8
+
+
+def test_build_cds_curves():
+
+    libor_curve = build_libor_curve()
+
+    tenors = ["1Y", "3Y", "5Y", "10Y"]
+    spread_matrix = np.array([[0.0050, 0.0060, 0.0070, 0.0080],
+                              [0.0100, 0.0150, 0.0200, 0.0220],
+                              [0.0400, 0.0380, 0.0360, 0.0350]])
+    recovery_rates = [0.40, 0.25, 0.40]
+
+    curves = build_cds_curves(curve_dt, spread_matrix, recovery_rates,
+                              libor_curve, tenors)
+
+    assert len(curves) == 3
+
+    for i in range(0, 3):
+
+        cds_contracts = [CDS(curve_dt, tenor, spread)
+                         for tenor, spread in zip(tenors, spread_matrix[i])]
+
+        issuer_curve = CDSCurve(curve_dt, cds_contracts, libor_curve,
+                                recovery_rates[i])
+
+        assert (curves[i]._times == issuer_curve._times).all()
+        assert np.max(np.abs(curves[i]._values - issuer_curve._values)) \
+            < 1e-6
+        assert (curves[i]._quotes == spread_matrix[i]).all()
+
+        # The premium flows are those of a contract built at the spread
+        for cds, fast_cds in zip(cds_contracts, curves[i]._cds_contracts):
+            assert fast_cds._payment_dts == cds._payment_dts
+            assert np.max(np.abs(np.array(fast_cds._flows)
+                                 - np.array(cds._flows))) < 1e-8
+
+    # No lists are shared between the issuers
+    assert curves[0]._cds_contracts[0]._flows is not \
+        curves[1]._cds_contracts[0]._flows
+    assert curves[0]._cds_contracts[0]._payment_dts is not \
+        curves[1]._cds_contracts[0]._payment_dts
+
+    # Each curve keeps its own contracts and can be re-solved
+    values = curves[0]._values.copy()
+    curves[0].update_quotes({3: 0.0090})
+    assert (curves[0]._values[0:4] == values[0:4]).all()
+    assert curves[0]._values[4] < values[4]
+    assert curves[1]._cds_contracts[3]._running_cpn == 0.0220
+
+    with pytest.raises(FinError):
+        build_cds_curves(curve_dt, spread_matrix, [0.4, 0.4], libor_curve,
+                         tenors)
+
+
+def test_build_cds_curves_threads():
+
+    libor_curve = build_libor_curve()
+
+    tenors = ["1Y", "3Y", "5Y", "10Y"]
+    spreads = np.array([0.0050, 0.0060, 0.0070, 0.0080])
+    spread_matrix = np.outer(np.linspace(1.0, 5.0, 7), spreads)
+
+    curves = build_cds_curves(curve_dt, spread_matrix, 0.40, libor_curve,
+                              tenors)
+
+    # Splitting the issuers across threads gives the same curves
+    threaded = build_cds_curves(curve_dt, spread_matrix, 0.40, libor_curve,
+                                tenors, num_threads=3)
+
+    for curve, threaded_curve in zip(curves, threaded):
+        assert (curve._values == threaded_curve._values).all()
+
+    # The curves interpolate between the pillars with the method given
+    interp_method = InterpTypes.LINEAR_ZERO_RATES
+    curves = build_cds_curves(curve_dt, spread_matrix, 0.40, libor_curve,
+                              tenors, interp_method)
+
+    times = list(np.linspace(0.1, 10.0, 25))
+    cds_contracts = [CDS(curve_dt, tenor, spread)
+                     for tenor, spread in zip(tenors, spread_matrix[2])]
+    issuer_curve = CDSCurve(curve_dt, cds_contracts, libor_curve, 0.40,
+                            interp_method=interp_method)
+
+    assert curves[2]._interp_method == interp_method
+    assert np.max(np.abs(curves[2].survival_prob(times)
+                         - issuer_curve.survival_prob(times))) < 1e-6
+
+    with pytest.raises(FinError):
+        build_cds_curves(curve_dt, spread_matrix, 0.40, libor_curve, tenors,
+                         InterpTypes.NATCUBIC_ZERO_RATES)
+
+    with pytest.raises(FinError):
+        build_cds_curves(curve_dt, spread_matrix, 0.40, libor_curve, tenors,
+                         num_threads=0)
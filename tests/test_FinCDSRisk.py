@@ -0,0 +1,113 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from financepy.utils.global_types import SwapTypes
+from financepy.utils.error import FinError
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.credit.cds_curve import CDSCurve
+from financepy.products.credit.cds_risk import cds_risk
+from financepy.products.credit.cds import CDS
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+import numpy as np
+import pytest
+
+curve_dt = Date(20, 12, 2018)
+
+
+def build_curve():
+
+    swaps = []
+
+    for i in range(1, 11):
+        maturity_dt = curve_dt.add_months(12 * i)
+        swap = IborSwap(curve_dt, maturity_dt, SwapTypes.PAY, 0.05,
+                        FrequencyTypes.SEMI_ANNUAL, DayCountTypes.ACT_365F)
+        swaps.append(swap)
+
+    libor_curve = IborSingleCurve(curve_dt, [], [], swaps)
+
+    cds_contracts = []
+
+    for i in range(1, 11):
+        maturity_dt = curve_dt.add_months(12 * i)
+        cds = CDS(curve_dt, maturity_dt, 0.005 + 0.001 * (i - 1))
+        cds_contracts.append(cds)
+
+    return CDSCurve(curve_dt, cds_contracts, libor_curve, 0.40)
+
+
+def test_cds_risk():
+
+    issuer_curve = build_curve()
+
+    trades = [CDS(curve_dt, Date(20, 3, 2024), 0.01),
+              CDS(curve_dt, Date(20, 6, 2021), 0.005, 2000000, False),
+              CDS(curve_dt, Date(20, 12, 2027), 0.02)]
+
+    risk = cds_risk(trades, curve_dt, issuer_curve, 0.40)
+
+    assert risk['bucketed_cs01'].shape == (3, 10)
+    assert risk['bucketed_interest_dv01'].shape == (3, 10)
+
+    for i, trade in enumerate(trades):
+
+        v = trade.value(curve_dt, issuer_curve, 0.40)
+        assert abs(risk['dirty_pv'][i] - v['dirty_pv']) < 1e-6
+
+        # The bumped risk includes the convexity of a one basis point bump
+        credit_dv01 = trade.credit_dv01(curve_dt, issuer_curve, 0.40)
+        assert abs(risk['credit_dv01'][i] / credit_dv01 - 1.0) < 1e-3
+
+        interest_dv01 = trade.interest_dv01(curve_dt, issuer_curve, 0.40)
+        assert abs(risk['interest_dv01'][i] / interest_dv01 - 1.0) < 1e-3
+
+    # Compare a CS01 bucket with a central difference of rebuilt curves
+    spread = issuer_curve._cds_contracts[4]._running_cpn
+    issuer_curve.update_quotes({4: spread + 0.00005})
+    v_up = trades[0].value(curve_dt, issuer_curve, 0.40)['dirty_pv']
+    issuer_curve.update_quotes({4: spread - 0.00005})
+    v_down = trades[0].value(curve_dt, issuer_curve, 0.40)['dirty_pv']
+    issuer_curve.update_quotes({4: spread})
+    assert abs(risk['bucketed_cs01'][0, 4] - (v_up - v_down)) < 1e-3
+
+    # The contracts beyond the trade maturity carry no credit risk
+    assert np.max(np.abs(risk['bucketed_cs01'][0, 6:])) < 1e-6
+    assert np.max(np.abs(risk['bucketed_cs01'][1, 3:])) < 1e-6
+
+
+def test_cds_risk_flat_libor_curve():
+
+    libor_curve = DiscountCurveFlat(curve_dt, 0.05)
+
+    cds_contracts = [CDS(curve_dt, curve_dt.add_months(12 * i),
+                         0.005 + 0.001 * (i - 1)) for i in range(1, 6)]
+
+    issuer_curve = CDSCurve(curve_dt, cds_contracts, libor_curve, 0.40)
+
+    trade = CDS(curve_dt, Date(20, 3, 2022), 0.01)
+
+    risk = cds_risk([trade], curve_dt, issuer_curve, 0.40)
+
+    credit_dv01 = trade.credit_dv01(curve_dt, issuer_curve, 0.40)
+    assert abs(risk['credit_dv01'][0] / credit_dv01 - 1.0) < 1e-3
+    assert risk['bucketed_cs01'].shape == (1, 5)
+
+    # A flat curve has no quotes so only the pillar gradient is returned
+    assert risk['ibor_df_grad'].shape == (1, len(libor_curve._dfs) - 1)
+    assert 'interest_dv01' not in risk
+
+
+def test_cds_risk_value_dt():
+
+    issuer_curve = build_curve()
+
+    trade = CDS(curve_dt, Date(20, 3, 2024), 0.01)
+
+    # The trades must be valued on the date the issuer curve was built
+    with pytest.raises(FinError):
+        cds_risk([trade], curve_dt.add_days(1), issuer_curve, 0.40)
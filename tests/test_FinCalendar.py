@@ -3,8 +3,12 @@
 ###############################################################################
 
 from financepy.utils.calendar import Calendar, CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes
+from financepy.utils.calendar import JointCalendarType, CalendarJoinTypes
+from financepy.utils.schedule import Schedule
 from financepy.utils.date import set_date_format, DateFormatTypes
-from financepy.utils.date import Date
+from financepy.utils.date import Date, DateArray
+import numpy as np
 import sys
 
 # Between 3rd of January 2020 and 3rd of January 2030
@@ -36,3 +40,97 @@ def test_add_business_day():
 
         assert cal.add_business_days(start, num_days) == end, \
             f"Landed on incorrect business day using {cal_type}"
+
+
+def test_business_days_between():
+    for cal_type in CalendarTypes:
+        num_days = bus_days_in_decade[str(cal_type)]
+        cal = Calendar(cal_type)
+        start = Date(3, 1, 2020)
+        end = Date(3, 1, 2030)
+
+        assert cal.business_days_between(start, end) == num_days
+        assert cal.business_days_between(end, start) == -num_days
+
+
+def test_vectorised_calendar():
+    cal = Calendar(CalendarTypes.UNITED_KINGDOM)
+    dts = [Date(20, 12, 2022).add_days(i) for i in range(0, 500)]
+    dt_array = DateArray(dts)
+
+    assert np.all(cal.is_business_day(dt_array) ==
+                  [cal.is_business_day(dt) for dt in dts])
+
+    assert np.all(cal.is_holiday(dt_array.excel_dt()) ==
+                  [cal.is_holiday(dt) for dt in dts])
+
+    for bd_type in BusDayAdjustTypes:
+        adjusted = cal.adjust(dt_array, bd_type)
+        assert adjusted.to_list() == [cal.adjust(dt, bd_type) for dt in dts]
+
+    for num_days in [-20, -1, 0, 3, 250]:
+        shifted = cal.add_business_days(dt_array, num_days)
+        assert shifted.to_list() == [cal.add_business_days(dt, num_days)
+                                     for dt in dts]
+
+
+def test_adjust_holidays():
+    cal = Calendar(CalendarTypes.UNITED_KINGDOM)
+
+    # Easter weekend 2023 runs from Good Friday to Easter Monday
+    good_friday = Date(7, 4, 2023)
+    assert cal.adjust(good_friday, BusDayAdjustTypes.FOLLOWING) == \
+        Date(11, 4, 2023)
+    assert cal.adjust(good_friday, BusDayAdjustTypes.PRECEDING) == \
+        Date(6, 4, 2023)
+
+    # Month end Saturday rolls back under modified following
+    assert cal.adjust(Date(30, 9, 2023),
+                      BusDayAdjustTypes.MODIFIED_FOLLOWING) == \
+        Date(29, 9, 2023)
+
+
+def test_joint_calendar():
+    us = Calendar(CalendarTypes.UNITED_STATES)
+    uk = Calendar(CalendarTypes.UNITED_KINGDOM)
+    dts = [Date(20, 12, 2022).add_days(i) for i in range(0, 500)]
+
+    union = Calendar(JointCalendarType([CalendarTypes.UNITED_STATES,
+                                        CalendarTypes.UNITED_KINGDOM]))
+    inter = Calendar(JointCalendarType([CalendarTypes.UNITED_KINGDOM,
+                                        CalendarTypes.UNITED_STATES],
+                                       CalendarJoinTypes.INTERSECTION))
+
+    for dt in dts:
+        assert union.is_business_day(dt) == \
+            (us.is_business_day(dt) and uk.is_business_day(dt))
+        assert inter.is_business_day(dt) == \
+            (us.is_business_day(dt) or uk.is_business_day(dt))
+        assert union.is_holiday(dt) == (us.is_holiday(dt) or uk.is_holiday(dt))
+
+    # US Independence Day is not a UK holiday
+    july4 = Date(4, 7, 2023)
+    assert union.adjust(july4, BusDayAdjustTypes.FOLLOWING) == Date(5, 7, 2023)
+    assert inter.adjust(july4, BusDayAdjustTypes.FOLLOWING) == july4
+
+    # The vectorised and scalar paths agree
+    dt_array = DateArray(dts)
+    adjusted = union.adjust(dt_array, BusDayAdjustTypes.MODIFIED_FOLLOWING)
+    assert adjusted.to_list() == \
+        [union.adjust(dt, BusDayAdjustTypes.MODIFIED_FOLLOWING) for dt in dts]
+
+    # Order of the calendars does not matter
+    assert JointCalendarType([CalendarTypes.UNITED_KINGDOM,
+                              CalendarTypes.UNITED_STATES]) == \
+        union._cal_type
+
+
+def test_joint_calendar_schedule():
+    joint_type = JointCalendarType([CalendarTypes.TARGET,
+                                    CalendarTypes.UNITED_STATES])
+    schedule = Schedule(Date(4, 7, 2022), Date(4, 7, 2027),
+                        cal_type=joint_type)
+    joint = Calendar(joint_type)
+
+    for dt in schedule._adjusted_dts[1:]:
+        assert joint.is_business_day(dt)
@@ -0,0 +1,108 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from financepy.utils.global_types import SwapTypes
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ibor_deposit import IborDeposit
+from financepy.products.rates.ibor_future import IborFuture
+from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.curve_solver import CurveSolverTypes
+from financepy.products.rates.curve_risk import quote_jacobian
+from financepy.products.rates.curve_risk import bucketed_delta
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.date import Date
+import numpy as np
+
+value_dt = Date(6, 6, 2018)
+settle_dt = value_dt.add_weekdays(2)
+
+
+def build_instruments():
+
+    depos = [IborDeposit(value_dt, value_dt.add_months(3), 0.0231381,
+                         DayCountTypes.ACT_360)]
+
+    prices = [97.6675, 97.5200, 97.3550, 97.2450]
+    fras = [IborFuture(value_dt, i + 1).to_fra(prices[i], 0.0)
+            for i in range(0, 4)]
+
+    swap_rates = [0.0278, 0.0286, 0.0290, 0.0293, 0.0300, 0.0304, 0.0301]
+    tenors = ["2Y", "3Y", "4Y", "5Y", "10Y", "20Y", "30Y"]
+    swaps = [IborSwap(settle_dt, tenors[i], SwapTypes.PAY, swap_rates[i],
+                      FrequencyTypes.SEMI_ANNUAL, DayCountTypes.THIRTY_E_360)
+             for i in range(0, len(tenors))]
+
+    return depos, fras, swaps
+
+
+def test_quote_jacobian():
+
+    depos, fras, swaps = build_instruments()
+
+    cases = [(InterpTypes.FLAT_FWD_RATES, CurveSolverTypes.GLOBAL_NEWTON),
+             (InterpTypes.NATCUBIC_ZERO_RATES, CurveSolverTypes.GLOBAL_NEWTON),
+             (InterpTypes.NATCUBIC_ZERO_RATES, CurveSolverTypes.BOOTSTRAP),
+             (InterpTypes.FINCUBIC_ZERO_RATES, CurveSolverTypes.BOOTSTRAP)]
+
+    for interp_type, solver_type in cases:
+
+        curve = IborSingleCurve(value_dt, depos, fras, swaps, interp_type,
+                                False, solver_type)
+
+        jac = quote_jacobian(curve)
+        assert jac.shape == (12, 12)
+
+        # Compare each column with a central difference of rebuilt curves.
+        # The bump is large enough to be clear of the bootstrap tolerance.
+        h = 1e-4
+        for j in range(0, 12):
+            q = curve._quotes[j]
+            curve.update_quotes({j: q + h})
+            dfs_up = curve._dfs[1:].copy()
+            curve.update_quotes({j: q - h})
+            dfs_down = curve._dfs[1:].copy()
+            curve.update_quotes({j: q})
+            fd = (dfs_up - dfs_down) / (2.0 * h)
+            assert np.max(np.abs(jac[:, j] - fd)) < 1e-5
+
+        # With flat forwards or a bootstrap a quote does not move the
+        # earlier pillars
+        if interp_type == InterpTypes.FLAT_FWD_RATES or \
+                solver_type == CurveSolverTypes.BOOTSTRAP:
+            assert np.max(np.abs(np.triu(jac, 1))) < 1e-12
+
+
+def test_bucketed_delta():
+
+    depos, fras, swaps = build_instruments()
+
+    trade = IborSwap(settle_dt, "7Y", SwapTypes.PAY, 0.03,
+                     FrequencyTypes.ANNUAL, DayCountTypes.ACT_360)
+
+    def value_fn(curve):
+        return trade.value(value_dt, curve, curve)
+
+    for solver_type in CurveSolverTypes:
+
+        curve = IborSingleCurve(value_dt, depos, fras, swaps,
+                                InterpTypes.FLAT_FWD_RATES, False,
+                                solver_type)
+
+        delta = bucketed_delta(curve, value_fn)
+
+        # Bump and rebuild each quote by half a basis point either side
+        for j in range(0, len(delta)):
+            q = curve._quotes[j]
+            curve.update_quotes({j: q + 0.00005})
+            v_up = value_fn(curve)
+            curve.update_quotes({j: q - 0.00005})
+            v_down = value_fn(curve)
+            curve.update_quotes({j: q})
+            assert abs(delta[j] - (v_up - v_down)) < 1e-3
+
+        # The swaps beyond the trade maturity carry no risk
+        assert abs(delta[-1]) < 1e-6
+        assert abs(delta[8]) > 100.0
@@ -0,0 +1,80 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date, DateArray
+from financepy.utils.helpers import times_from_dates
+from financepy.utils.day_count import DayCountTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.curves.discount_curve_zeros import DiscountCurveZeros
+from financepy.utils.frequency import FrequencyTypes
+
+start_dt = Date(28, 1, 2020)
+dates = [start_dt.add_days(17 * i) for i in range(0, 120)]
+dates += [Date(29, 2, 2020), Date(31, 8, 2021), Date(30, 11, 2023)]
+date_array = DateArray(dates)
+
+
+def test_construction():
+    assert len(date_array) == len(dates)
+    assert date_array[5] == dates[5]
+    assert date_array.to_list() == dates
+    assert isinstance(date_array[2:10], DateArray)
+    assert np.all(date_array.d() == [dt.d() for dt in dates])
+    assert np.all(date_array.m() == [dt.m() for dt in dates])
+    assert np.all(date_array.y() == [dt.y() for dt in dates])
+    assert np.all(date_array.weekday() == [dt.weekday() for dt in dates])
+
+    dmy = DateArray.from_dmy([31, 1], [12, 3], [2019, 2030])
+    assert dmy.to_list() == [Date(31, 12, 2019), Date(1, 3, 2030)]
+
+
+def test_add_tenor_matches_scalar():
+    for tenor in ["ON", "5D", "-3D", "2W", "1M", "-1M", "13M",
+                  "1Y", "4Y", "-4Y", "30Y"]:
+        shifted = date_array.add_tenor(tenor)
+        expected = [dt.add_tenor(tenor) for dt in dates]
+        assert shifted.to_list() == expected, tenor
+
+
+def test_add_months_and_eom():
+    shifted = date_array.add_months(7)
+    assert shifted.to_list() == [dt.add_months(7) for dt in dates]
+
+    months = np.arange(0, len(dates)) % 13 - 6
+    shifted = date_array.add_months(months)
+    expected = [dt.add_months(int(mm)) for dt, mm in zip(dates, months)]
+    assert shifted.to_list() == expected
+
+    assert date_array.eom().to_list() == [dt.eom() for dt in dates]
+    assert np.all(date_array.is_eom() == [dt.is_eom() for dt in dates])
+
+
+def test_comparison_and_subtraction():
+    ref_dt = Date(15, 6, 2022)
+    assert np.all((date_array > ref_dt) == [dt > ref_dt for dt in dates])
+    assert np.all((ref_dt < date_array) == [dt > ref_dt for dt in dates])
+    assert np.all((date_array - ref_dt) == [dt - ref_dt for dt in dates])
+    assert np.all((ref_dt - date_array) == [ref_dt - dt for dt in dates])
+    assert np.all(date_array.add_days(10) - date_array == 10)
+
+
+def test_times_and_discount_factors():
+    value_dt = Date(1, 1, 2020)
+
+    times = times_from_dates(date_array, value_dt)
+    assert np.allclose(times, times_from_dates(dates, value_dt))
+
+    dc_type = DayCountTypes.ACT_ACT_ISDA
+    times = times_from_dates(date_array, value_dt, dc_type)
+    assert np.allclose(times, times_from_dates(dates, value_dt, dc_type))
+
+    curve = DiscountCurveFlat(value_dt, 0.03)
+    assert np.allclose(curve.df(date_array), curve.df(dates))
+
+    zero_dts = [value_dt.add_tenor(t) for t in ["1Y", "2Y", "5Y", "10Y"]]
+    curve = DiscountCurveZeros(value_dt, zero_dts, [0.01, 0.015, 0.02, 0.03],
+                               FrequencyTypes.ANNUAL)
+    assert np.allclose(curve.df(date_array), curve.df(dates))
@@ -4,7 +4,7 @@
 
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.day_count import DayCount, DayCountTypes
-from financepy.utils.date import Date
+from financepy.utils.date import Date, DateArray
 
 
 start = Date(1, 1, 2019)
@@ -90,3 +90,38 @@ def test_year_frace_SIMPLE():
     answer = day_count.year_frac(start, end, end, finFreq)
 
     assert round(answer[0], 4) == 0.3836
+
+
+def test_year_frace_BUS_252():
+    dc_type = DayCountTypes.BUS_252
+    day_count = DayCount(dc_type)
+    answer = day_count.year_frac(start, end)
+
+    assert answer[1] == 100
+    assert round(answer[0], 4) == 0.3968
+
+
+def test_year_fracs_match_year_frac():
+    # Month ends and the end of February exercise the 30/360 rules
+    start_dts = [Date(28, 2, 2019), Date(29, 2, 2020), Date(31, 1, 2020),
+                 Date(30, 6, 2021), Date(15, 11, 2022), Date(31, 12, 2023)]
+    end_dts = [Date(31, 8, 2019), Date(28, 2, 2021), Date(29, 2, 2024),
+               Date(31, 12, 2021), Date(28, 2, 2023), Date(31, 3, 2024)]
+    next_dts = [dt.add_months(6) for dt in end_dts]
+    is_termination = [False, True, False, True, False, False]
+
+    for dc_type in DayCountTypes:
+        day_count = DayCount(dc_type)
+        freq_type = FrequencyTypes.SEMI_ANNUAL
+        (acc_factors, nums, dens) = day_count.year_fracs(DateArray(start_dts),
+                                                         end_dts, next_dts,
+                                                         freq_type,
+                                                         is_termination)
+
+        for i in range(0, len(start_dts)):
+            answer = day_count.year_frac(start_dts[i], end_dts[i],
+                                         next_dts[i], freq_type,
+                                         is_termination[i])
+            assert acc_factors[i] == answer[0]
+            assert nums[i] == answer[1]
+            assert dens[i] == answer[2]
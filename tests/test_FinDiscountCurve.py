@@ -0,0 +1,74 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date, DateArray
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.market.curves.discount_curve import DiscountCurve
+from financepy.market.curves.discount_curve_ns import DiscountCurveNS
+
+
+value_dt = Date(1, 1, 2020)
+df_dts = [value_dt.add_years(y) for y in [0.5, 1, 2, 3, 5, 7, 10, 20]]
+df_values = np.exp(-np.array([0.010, 0.015, 0.020, 0.022,
+                              0.025, 0.028, 0.030, 0.031])
+                   * np.array([0.5, 1, 2, 3, 5, 7, 10, 20]))
+dates = [value_dt.add_days(17 + i * 53) for i in range(0, 100)]
+
+
+def test_fwd_closed_form():
+
+    # One day forward rates are close to the instantaneous forward rate
+    # away from the grid dates
+    dates_plus_one_day = [dt.add_days(1) for dt in dates]
+
+    for interp_type in InterpTypes:
+
+        curve = DiscountCurve(value_dt, df_dts, df_values, interp_type)
+        fwds = curve.fwd(dates)
+
+        dfs1 = curve.df(dates)
+        dfs2 = curve.df(dates_plus_one_day)
+        one_day_fwds = np.log(dfs1 / dfs2) * 365.0
+
+        assert len(fwds) == len(dates)
+        assert np.median(np.abs(fwds - one_day_fwds)) < 1e-4
+        assert curve.fwd(dates[7]) == fwds[7]
+
+    curve = DiscountCurveNS(value_dt, 0.03, -0.02, 0.01, 2.0,
+                            FrequencyTypes.CONTINUOUS)
+
+    # The instantaneous forward of a Nelson-Siegel curve is known
+    t = 3.0
+    e = np.exp(-t / 2.0)
+    fwd = 0.03 - 0.02 * e + 0.01 * (t / 2.0) * e
+    assert abs(curve._fwd(t)[0] - fwd) < 1e-12
+
+
+def test_fwd_rate_batched():
+
+    curve = DiscountCurve(value_dt, df_dts, df_values,
+                          InterpTypes.LINEAR_ZERO_RATES)
+
+    end_dts = [dt.add_tenor("6M") for dt in dates]
+
+    for end_dt in ["3M", Date(1, 1, 2040), end_dts]:
+
+        fwd_rates = curve.fwd_rate(dates, end_dt, DayCountTypes.ACT_365F)
+
+        for i in range(0, len(dates)):
+            if isinstance(end_dt, list):
+                fwd_rate = curve.fwd_rate(dates[i], end_dt[i],
+                                          DayCountTypes.ACT_365F)
+            else:
+                fwd_rate = curve.fwd_rate(dates[i], end_dt,
+                                          DayCountTypes.ACT_365F)
+
+            assert abs(fwd_rates[i] - fwd_rate) < 1e-14
+
+    fwd_rates = curve.fwd_rate(DateArray(dates), DateArray(end_dts))
+    assert np.all(fwd_rates == curve.fwd_rate(dates, end_dts))
@@ -5,7 +5,7 @@
 from financepy.utils.date import Date
 from financepy.products.rates.ibor_deposit import IborDeposit
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
-from financepy.utils.calendar import CalendarTypes
+from financepy.utils.calendar import CalendarTypes, JointCalendarType
 from financepy.utils.day_count import DayCountTypes
 from financepy.products.fx.fx_forward import FXForward
 
@@ -75,3 +75,20 @@ def test_FinFXForward():
     assert fwdValue['not_for'] == 100.0
     assert fwdValue['ccy_dom'] == 'USD'
     assert fwdValue['ccy_for'] == 'EUR'
+
+
+def test_FinFXForward_joint_calendar():
+    # EURUSD spot settles on a day that is open in both TARGET and New York
+    joint_type = JointCalendarType([CalendarTypes.TARGET,
+                                    CalendarTypes.UNITED_STATES])
+
+    # Two business days after 1 July 2021 skip the US Independence Day
+    # holiday which is observed on Monday 5 July
+    expiry_dt = Date(1, 7, 2021)
+    fxForward = FXForward(expiry_dt, 1.20, "EURUSD", 100.0, "EUR",
+                          spot_days=2, cal_type=joint_type)
+    assert fxForward._delivery_dt == Date(6, 7, 2021)
+
+    fxForward = FXForward(expiry_dt, 1.20, "EURUSD", 100.0, "EUR",
+                          spot_days=2)
+    assert fxForward._delivery_dt == Date(5, 7, 2021)
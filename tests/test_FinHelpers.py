@@ -0,0 +1,40 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import pytest
+
+from financepy.utils.date import Date
+from financepy.utils.error import FinError
+from financepy.utils.helpers import check_argument_types
+from financepy.utils.helpers import set_validation_level, get_validation_level
+from financepy.utils.helpers import ValidationTypes
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+
+
+def test_validation_levels():
+    level = get_validation_level()
+    value_dt = Date(1, 1, 2020)
+
+    for validation_type in [ValidationTypes.CACHED, ValidationTypes.STRICT]:
+        set_validation_level(validation_type)
+
+        # Checked twice so that the cached types are used
+        for _ in range(0, 2):
+            DiscountCurveFlat(value_dt, 0.05)
+            with pytest.raises(FinError):
+                DiscountCurveFlat(value_dt, "0.05")
+
+    # Nothing is checked when validation is switched off
+    set_validation_level(ValidationTypes.OFF)
+    DiscountCurveFlat(value_dt, 0.05)
+
+    def f(x: float):
+        check_argument_types(f, locals())
+
+    f("not a float")
+
+    with pytest.raises(FinError):
+        set_validation_level("OFF")
+
+    set_validation_level(level)
@@ -8,6 +8,8 @@ from financepy.models.hw_tree import HWTree
 from financepy.models.bk_tree import BKTree
 from financepy.models.black import Black
 from financepy.products.rates.bermudan_swaption import IborBermudanSwaption
+from financepy.products.rates.bermudan_swaption import \
+    value_bermudan_swaptions
 from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.rates.ibor_swaption import IborSwaption
 from financepy.utils.global_types import FinExerciseTypes
@@ -15,6 +17,7 @@ from financepy.utils.global_types import SwapTypes
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.day_count import DayCountTypes
 from financepy.utils.date import Date
+import numpy as np
 
 
 value_dt = Date(1, 1, 2011)
@@ -308,3 +311,117 @@ def test_hw_bermudan_exercise():
 
     valueRec = bermudan_swaption_rec.value(value_dt, libor_curve, model)
     assert round(valueRec, 4) == 10406.4558
+
+
+def test_tree_cache():
+
+    swaptions = []
+    for fixed_leg_type in [SwapTypes.PAY, SwapTypes.RECEIVE]:
+        for coupon in [0.055, 0.060, 0.065]:
+            swaptions.append(IborBermudanSwaption(settle_dt,
+                                                  exercise_dt,
+                                                  swap_maturity_dt,
+                                                  fixed_leg_type,
+                                                  FinExerciseTypes.BERMUDAN,
+                                                  coupon,
+                                                  swap_fixed_freq_type,
+                                                  swapFixedDayCountType))
+
+    for model_fn in [lambda: HWTree(0.01, 0.01, num_time_steps),
+                     lambda: BKTree(0.2, 0.01, num_time_steps),
+                     lambda: BDTTree(0.2, num_time_steps)]:
+
+        model = model_fn()
+        values = [s.value(value_dt, libor_curve, model) for s in swaptions]
+
+        # All of the trades are valued on one tree
+        model = model_fn()
+        cache = model.cache_trees(max_size=2)
+        cached = [s.value(value_dt, libor_curve, model) for s in swaptions]
+
+        assert cached == values
+        assert cache._num_misses == 1
+        assert cache._num_hits == len(swaptions) - 1
+
+        # A new volatility needs a new tree
+        model._sigma *= 1.1
+        swaptions[0].value(value_dt, libor_curve, model)
+        assert cache._num_misses == 2
+        assert len(cache) == 2
+
+    # A tree built to a later maturity values the shorter trades
+    model = HWTree(0.01, 0.01, num_time_steps)
+    cache = model.cache_trees(tree_maturity=5.0)
+
+    for maturity_dt in [settle_dt.add_years(3), swap_maturity_dt]:
+        swaption = IborBermudanSwaption(settle_dt, exercise_dt, maturity_dt,
+                                        SwapTypes.PAY,
+                                        FinExerciseTypes.BERMUDAN,
+                                        swap_fixed_coupon,
+                                        swap_fixed_freq_type,
+                                        swapFixedDayCountType)
+
+        value = swaption.value(value_dt, libor_curve, model)
+        uncached = swaption.value(value_dt, libor_curve,
+                                  HWTree(0.01, 0.01, num_time_steps))
+
+        # The time steps differ so this is within the tree convergence noise
+        assert abs(value / uncached - 1.0) < 0.03
+
+    assert len(cache) == 1
+    assert cache._num_hits == 1
+
+
+def test_value_bermudan_swaptions():
+
+    swaptions = []
+    for fixed_leg_type in [SwapTypes.PAY, SwapTypes.RECEIVE]:
+        for exercise_type in [FinExerciseTypes.EUROPEAN,
+                              FinExerciseTypes.BERMUDAN]:
+            for years in [1, 2]:
+                expiry_dt = settle_dt.add_years(years)
+                swaptions.append(IborBermudanSwaption(settle_dt,
+                                                      expiry_dt,
+                                                      swap_maturity_dt,
+                                                      fixed_leg_type,
+                                                      exercise_type,
+                                                      swap_fixed_coupon,
+                                                      swap_fixed_freq_type,
+                                                      swapFixedDayCountType))
+
+    for model in [HWTree(0.01, 0.01, num_time_steps),
+                  BKTree(0.2, 0.01, num_time_steps),
+                  BDTTree(0.2, num_time_steps)]:
+
+        values = value_bermudan_swaptions(swaptions, value_dt, libor_curve,
+                                          model)
+
+        for swaption, v in zip(swaptions, values):
+            assert abs(v - swaption.value(value_dt, libor_curve, model)) \
+                < 1e-6
+
+        # Splitting the trades across threads gives the same values
+        threaded = value_bermudan_swaptions(swaptions, value_dt, libor_curve,
+                                            model, num_threads=3)
+        assert np.array_equal(values, threaded)
+
+        # Trades of different maturities valued together on one tree
+        cpn_times = [swaption._tree_flows(value_dt, libor_curve)[2]
+                     for swaption in swaptions[0:2]]
+        cpn_times[1] = cpn_times[1][0:4]
+        cpn_flows = [np.full(len(times), 0.03) for times in cpn_times]
+        t_exps = [times[0] for times in cpn_times]
+        exercise_types = [FinExerciseTypes.BERMUDAN] * 2
+
+        model.build_tree(cpn_times[0][-1], libor_curve._times,
+                         libor_curve._dfs)
+
+        book = model.bermudan_swaptions(t_exps, [1.0, 1.0], [1.0, 1.0],
+                                        cpn_times, cpn_flows, exercise_types)
+
+        for i in range(0, 2):
+            v = model.bermudan_swaption(t_exps[i], cpn_times[i][-1], 1.0,
+                                        1.0, cpn_times[i], cpn_flows[i],
+                                        exercise_types[i])
+            assert abs(book['pay'][i] - v['pay']) < 1e-12
+            assert abs(book['rec'][i] - v['rec']) < 1e-12
@@ -6,6 +6,7 @@ from financepy.products.rates.ois import OIS
 from financepy.products.rates.ois_curve import OISCurve
 from financepy.products.rates.dual_curve import IborDualCurve
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.curve_solver import CurveSolverTypes
 from financepy.utils.global_types import SwapTypes
 from financepy.utils.math import ONE_MILLION
 from financepy.market.curves.interpolator import InterpTypes
@@ -271,3 +272,49 @@ def test_bloombergPricingExample():
         settle_dt, oisCurve), 4) == -55524.5709
     assert round(swaps[0]._float_leg.value(
         settle_dt, oisCurve, liborDualCurve, None), 4) == 55524.5709
+
+
+def test_global_solver():
+
+    value_dt = Date(6, 6, 2018)
+    settle_dt = value_dt.add_weekdays(2)
+    accrual = DayCountTypes.THIRTY_E_360
+    freq = FrequencyTypes.SEMI_ANNUAL
+
+    depos = [IborDeposit(value_dt, value_dt.add_months(3), 0.0231381,
+                         DayCountTypes.ACT_360)]
+
+    prices = [97.6675, 97.5200, 97.3550, 97.2450]
+    fras = [IborFuture(value_dt, i + 1).to_fra(prices[i], 0.0)
+            for i in range(0, 4)]
+
+    swap_rates = [0.0278, 0.0286, 0.0290, 0.0293, 0.0300, 0.0304, 0.0301]
+    tenors = ["2Y", "3Y", "4Y", "5Y", "10Y", "20Y", "30Y"]
+    swaps = [IborSwap(settle_dt, tenors[i], SwapTypes.PAY, swap_rates[i],
+                      freq, accrual) for i in range(0, len(tenors))]
+
+    ois_swaps = [OIS(value_dt, tenors[i], SwapTypes.PAY,
+                     swap_rates[i] - 0.002, freq, accrual)
+                 for i in range(0, len(tenors))]
+
+    ois_curve = OISCurve(value_dt, [], [], ois_swaps,
+                         InterpTypes.FLAT_FWD_RATES, False,
+                         CurveSolverTypes.GLOBAL_NEWTON)
+
+    for swap in ois_swaps:
+        v = swap.value(value_dt, ois_curve) / swap._fixed_leg._notional
+        assert abs(v) < 1e-10
+
+    bootstrap_curve = IborDualCurve(value_dt, ois_curve, depos, fras, swaps,
+                                    InterpTypes.FLAT_FWD_RATES)
+
+    dual_curve = IborDualCurve(value_dt, ois_curve, depos, fras, swaps,
+                               InterpTypes.FLAT_FWD_RATES, True,
+                               CurveSolverTypes.GLOBAL_NEWTON)
+
+    assert np.max(np.abs(dual_curve._dfs - bootstrap_curve._dfs)) < 1e-9
+
+    # The spline curve refits all of the instruments
+    dual_curve = IborDualCurve(value_dt, ois_curve, depos, fras, swaps,
+                               InterpTypes.NATCUBIC_ZERO_RATES, True,
+                               CurveSolverTypes.GLOBAL_NEWTON)
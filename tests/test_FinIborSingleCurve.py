@@ -9,9 +9,11 @@ from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.rates.ibor_deposit import IborDeposit
 from financepy.products.rates.ibor_future import IborFuture
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.curve_solver import CurveSolverTypes
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.day_count import DayCountTypes
 from financepy.utils.date import Date
+import numpy as np
 
 
 def test_bloombergPricingExample():
@@ -137,3 +139,83 @@ def test_bloombergPricingExample():
         settle_dt, libor_curve), 4) == 53714.5507
     assert round(swaps[0]._float_leg.value(
         settle_dt, libor_curve, libor_curve, None), 4) == 53714.5507
+
+
+def test_global_solver():
+
+    value_dt = Date(6, 6, 2018)
+    settle_dt = value_dt.add_weekdays(2)
+    accrual = DayCountTypes.THIRTY_E_360
+    freq = FrequencyTypes.SEMI_ANNUAL
+
+    depos = [IborDeposit(value_dt, value_dt.add_months(3), 0.0231381,
+                         DayCountTypes.ACT_360)]
+
+    prices = [97.6675, 97.5200, 97.3550, 97.2450]
+    fras = [IborFuture(value_dt, i + 1).to_fra(prices[i], 0.0)
+            for i in range(0, 4)]
+
+    swap_rates = [0.0278, 0.0286, 0.0290, 0.0293, 0.0300, 0.0304, 0.0301]
+    tenors = ["2Y", "3Y", "4Y", "5Y", "10Y", "20Y", "30Y"]
+    swaps = [IborSwap(settle_dt, tenors[i], SwapTypes.PAY, swap_rates[i],
+                      freq, accrual) for i in range(0, len(tenors))]
+
+    for interp_type in [InterpTypes.FLAT_FWD_RATES,
+                        InterpTypes.LINEAR_ZERO_RATES,
+                        InterpTypes.NATCUBIC_LOG_DISCOUNT,
+                        InterpTypes.NATCUBIC_ZERO_RATES,
+                        InterpTypes.FINCUBIC_ZERO_RATES]:
+
+        # The check refit flag tests that every instrument is repriced
+        curve = IborSingleCurve(value_dt, depos, fras, swaps, interp_type,
+                                True, CurveSolverTypes.GLOBAL_NEWTON)
+
+        # For local schemes the global and 1d solvers agree
+        if interp_type in [InterpTypes.FLAT_FWD_RATES,
+                           InterpTypes.LINEAR_ZERO_RATES]:
+            bootstrap_curve = IborSingleCurve(value_dt, depos, fras, swaps,
+                                              interp_type)
+            assert np.max(np.abs(curve._dfs - bootstrap_curve._dfs)) < 1e-9
+
+
+def test_update_quotes():
+
+    value_dt = Date(6, 6, 2018)
+    settle_dt = value_dt.add_weekdays(2)
+    accrual = DayCountTypes.THIRTY_E_360
+    freq = FrequencyTypes.SEMI_ANNUAL
+
+    depos = [IborDeposit(value_dt, value_dt.add_months(3), 0.0231381,
+                         DayCountTypes.ACT_360)]
+
+    prices = [97.6675, 97.5200, 97.3550, 97.2450]
+    fras = [IborFuture(value_dt, i + 1).to_fra(prices[i], 0.0)
+            for i in range(0, 4)]
+
+    swap_rates = [0.0278, 0.0286, 0.0290, 0.0293, 0.0300, 0.0304, 0.0301]
+    tenors = ["2Y", "3Y", "4Y", "5Y", "10Y", "20Y", "30Y"]
+    swaps = [IborSwap(settle_dt, tenors[i], SwapTypes.PAY, swap_rates[i],
+                      freq, accrual) for i in range(0, len(tenors))]
+
+    for solver_type in CurveSolverTypes:
+
+        curve = IborSingleCurve(value_dt, depos, fras, swaps,
+                                InterpTypes.FLAT_FWD_RATES, True, solver_type)
+
+        assert len(curve._quotes) == 12
+        assert curve._quotes[7] == 0.0290
+
+        # Move a FRA and a swap and compare with a full rebuild
+        curve.update_quotes({3: curve._quotes[3] + 0.0001, 7: 0.0291})
+
+        assert curve._quotes[7] == 0.0291
+        assert swaps[2]._fixed_leg._cpn == 0.0291
+
+        new_curve = IborSingleCurve(value_dt, depos, fras, swaps,
+                                    InterpTypes.FLAT_FWD_RATES, True,
+                                    solver_type)
+
+        assert np.max(np.abs(curve._dfs - new_curve._dfs)) < 1e-9
+
+        # The instruments are shared so restore them for the next solver
+        curve.update_quotes({7: 0.0290, 3: curve._quotes[3] - 0.0001})
@@ -16,6 +16,7 @@ from financepy.products.rates.ibor_deposit import IborDeposit
 from financepy.products.rates.ibor_fra import IborFRA
 from financepy.products.rates.ibor_swap import IborSwap
 from financepy.products.rates.ibor_single_curve import IborSingleCurve
+from financepy.products.rates.curve_risk import pillar_df_gradient
 from financepy.utils.math import ONE_MILLION
 import numpy as np
 
@@ -112,3 +113,42 @@ def test_dp_example():
 
     # This is essentially zero
     assert round(v * 1000, 4) == 785300.0566
+
+
+def test_value_and_gradient():
+
+    value_dt = Date(30, 11, 2018)
+    settle_dt = value_dt.add_days(2)
+    libor_curve = buildIborSingleCurve(value_dt)
+
+    swap = IborSwap(settle_dt, "12Y", SwapTypes.RECEIVE, 0.03,
+                    FrequencyTypes.ANNUAL, DayCountTypes.THIRTY_E_360)
+
+    fra = IborFRA(settle_dt.add_months(4), settle_dt.add_months(10), 0.02,
+                  DayCountTypes.ACT_360)
+
+    depo = IborDeposit(settle_dt, "6M", 0.025, DayCountTypes.ACT_360)
+
+    def check(value, grad, value_fn):
+        fd = pillar_df_gradient(libor_curve, value_fn)
+        assert abs(value - value_fn(libor_curve)) < 1e-6
+        assert np.max(np.abs(grad - fd)) < 1e-8 * np.max(np.abs(fd))
+
+    v, disc_grad, index_grad = swap.value_and_gradient(settle_dt,
+                                                       libor_curve)
+    check(v, disc_grad + index_grad,
+          lambda curve: swap.value(settle_dt, curve, curve))
+
+    v, disc_grad, index_grad = swap.value_and_gradient(settle_dt,
+                                                       libor_curve,
+                                                       libor_curve, 0.02)
+    check(v, disc_grad + index_grad,
+          lambda curve: swap.value(settle_dt, curve, curve, 0.02))
+
+    v, disc_grad, index_grad = fra.value_and_gradient(settle_dt,
+                                                      libor_curve)
+    check(v, disc_grad + index_grad,
+          lambda curve: fra.value(settle_dt, curve))
+
+    v, grad = depo.value_and_gradient(settle_dt, libor_curve)
+    check(v, grad, lambda curve: depo.value(settle_dt, curve))
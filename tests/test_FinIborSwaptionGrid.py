@@ -0,0 +1,92 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from financepy.models.bachelier import Bachelier
+from financepy.models.sabr_shifted import SABRShifted
+from financepy.models.sabr import SABR
+from financepy.models.black_shifted import BlackShifted
+from financepy.models.black import Black
+from financepy.products.rates.ibor_swaption import SwapTypes
+from financepy.products.rates.ibor_swaption import IborSwaption
+from financepy.products.rates.ibor_swaption_grid import IborSwaptionGrid
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.utils.global_types import OptionTypes
+from financepy.utils.global_vars import gDaysInYear
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.date import Date
+import numpy as np
+
+value_dt = Date(1, 1, 2020)
+exercise_dts = [value_dt.add_tenor(t) for t in ["3M", "1Y", "5Y"]]
+swap_tenors = ["2Y", "10Y"]
+strikes = np.array([0.02, 0.03, 0.045])
+freq_type = FrequencyTypes.SEMI_ANNUAL
+dc_type = DayCountTypes.THIRTY_E_360
+
+
+def test_swaption_grid():
+
+    curve = DiscountCurveFlat(value_dt, 0.03)
+
+    grid = IborSwaptionGrid(value_dt, exercise_dts, swap_tenors,
+                            freq_type, dc_type)
+
+    models = [Black(0.20),
+              BlackShifted(0.20, 0.01),
+              SABR(0.013, 0.5, 0.5, 0.5),
+              SABRShifted(0.013, 0.5, 0.5, 0.5, 0.008)]
+
+    for model in models:
+        for swap_type in [SwapTypes.PAY, SwapTypes.RECEIVE]:
+
+            values = grid.value(value_dt, curve, strikes, model, swap_type)
+            assert values.shape == (3, 2, 3)
+
+            for i, exercise_dt in enumerate(exercise_dts):
+                for j, tenor in enumerate(swap_tenors):
+                    for m, k in enumerate(strikes):
+                        swaption = IborSwaption(value_dt, exercise_dt,
+                                                exercise_dt.add_tenor(tenor),
+                                                swap_type, k, freq_type,
+                                                dc_type)
+                        v = swaption.value(value_dt, curve, model)
+                        assert abs(values[i, j, m] - v) < 1e-6
+
+
+def test_swaption_grid_cube():
+
+    curve = DiscountCurveFlat(value_dt, 0.03)
+
+    grid = IborSwaptionGrid(value_dt, exercise_dts, swap_tenors,
+                            freq_type, dc_type)
+
+    pv01, fwds = grid.fwd_swap_rates(value_dt, curve)
+
+    # Strikes set relative to each forward with a vol for each one
+    offsets = np.array([-0.005, 0.0, 0.005])
+    cube_strikes = fwds[:, :, np.newaxis] + offsets
+    vols = np.array([0.22, 0.20, 0.19])
+
+    values = grid.value(value_dt, curve, cube_strikes, Black(vols))
+    swaption = IborSwaption(value_dt, exercise_dts[1],
+                            exercise_dts[1].add_tenor(swap_tenors[1]),
+                            SwapTypes.PAY, cube_strikes[1, 1, 2],
+                            freq_type, dc_type)
+    v = swaption.value(value_dt, curve, Black(0.19))
+    assert abs(values[1, 1, 2] - v) < 1e-6
+
+    # The Bachelier price at the money is the normal straddle formula
+    sigma = 0.006
+    atm = grid.value(value_dt, curve, cube_strikes, Bachelier(sigma),
+                     SwapTypes.RECEIVE)[:, :, 1]
+    t_exp = np.array([(dt - value_dt) / gDaysInYear for dt in exercise_dts])
+    expected = sigma * np.sqrt(t_exp[:, np.newaxis] / 2.0 / np.pi) * pv01
+    assert np.max(np.abs(atm - expected * 1e6)) < 1e-6
+
+    model = Bachelier(sigma)
+    v = model.value(fwds[2, 0], cube_strikes[2, 0, 0], t_exp[2], 1.0,
+                    OptionTypes.EUROPEAN_CALL) * pv01[2, 0] * 1e6
+    values = grid.value(value_dt, curve, cube_strikes, model)
+    assert abs(values[2, 0, 0] - v) < 1e-6
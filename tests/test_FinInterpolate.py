@@ -232,3 +232,32 @@ def test_PCHIP_LOG_DISCOUNT():
     y_int = interpolator.interpolate(x)
     assert round(x, 4) == 6.8421
     assert round(y_int, 4) == 0.5551
+
+
+def test_spline_kernel_matches_scipy():
+
+    # Include times after the last point to check the end piece
+    x = np.linspace(0.25, 12.0, 48)
+
+    for interp_type in InterpTypes:
+
+        interpolator = Interpolator(interp_type)
+        interpolator.fit(xValues, yValues)
+
+        if interpolator._interp_fn is None:
+            continue
+
+        y_fit = interpolator._interp_fn(x)
+
+        if interp_type in (InterpTypes.PCHIP_LOG_DISCOUNT,
+                           InterpTypes.NATCUBIC_LOG_DISCOUNT):
+            y_scipy = np.exp(y_fit)
+        else:
+            y_scipy = np.exp(-x * y_fit)
+
+        y_vector = interpolator.interpolate(x)
+        assert np.allclose(y_vector, y_scipy, rtol=1e-12, atol=0.0)
+
+        for i in range(0, len(x)):
+            y_scalar = interpolator.interpolate(float(x[i]))
+            assert abs(y_scalar - y_vector[i]) < 1e-14
@@ -0,0 +1,127 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from numba import njit
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.helpers import times_from_dates
+from financepy.market.curves.interpolator import InterpTypes
+from financepy.market.curves.discount_curve import DiscountCurve
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.market.curves.discount_curve_ns import DiscountCurveNS
+from financepy.market.curves.discount_curve_nss import DiscountCurveNSS
+from financepy.market.curves.discount_curve_poly import DiscountCurvePoly
+from financepy.market.curves.discount_curve_pwf import DiscountCurvePWF
+from financepy.market.curves.discount_curve_pwl import DiscountCurvePWL
+from financepy.market.curves.interpolator import _uinterpolate
+from financepy.market.curves.jit_curve import curve_df, curve_fwd
+from financepy.market.curves.jit_curve import flat_fwd_curve
+
+
+value_dt = Date(1, 1, 2020)
+dates = [value_dt.add_days(i * 37) for i in range(0, 100)]
+zero_dts = [value_dt.add_years(y) for y in [0.5, 1, 2, 3, 5, 7, 10, 20]]
+zero_rates = [0.010, 0.015, 0.020, 0.022, 0.025, 0.028, 0.030, 0.031]
+
+
+@njit(cache=True)
+def jit_dfs(curve, times):
+    dfs = np.empty(times.size)
+    for i in range(0, times.size):
+        dfs[i] = curve_df(curve, times[i])
+    return dfs
+
+
+@njit(cache=True)
+def jit_fwds(curve, times, h):
+    """ Forward rates in closed form and by a central difference of the
+    discount factors, both found inside a kernel. """
+    fwds = np.empty((times.size, 2))
+    for i in range(0, times.size):
+        fwds[i, 0] = curve_fwd(curve, times[i])
+        fwds[i, 1] = np.log(curve_df(curve, times[i] - h) /
+                            curve_df(curve, times[i] + h)) / (2.0 * h)
+    return fwds
+
+
+@njit(cache=True)
+def jit_flat_fwd_dfs(times, values, t):
+    return curve_df(flat_fwd_curve(times, values), t)
+
+
+def test_jit_curve_parametric():
+
+    freq_type = FrequencyTypes.SEMI_ANNUAL
+    dc_type = DayCountTypes.THIRTY_E_360
+
+    curves = [DiscountCurveFlat(value_dt, 0.03, freq_type, dc_type),
+              DiscountCurveNS(value_dt, 0.03, -0.02, 0.01, 2.0,
+                              freq_type, dc_type),
+              DiscountCurveNSS(value_dt, 0.03, -0.02, 0.01, 0.005, 2.0, 5.0,
+                               freq_type, dc_type),
+              DiscountCurvePoly(value_dt, [0.02, 0.001, -0.00002],
+                                freq_type, dc_type),
+              DiscountCurvePWF(value_dt, zero_dts, zero_rates,
+                               freq_type, dc_type),
+              DiscountCurvePWL(value_dt, zero_dts, zero_rates,
+                               freq_type, dc_type)]
+
+    times = np.array(times_from_dates(dates, value_dt, dc_type))
+
+    for curve in curves:
+        dfs = np.array(curve.df(dates)).ravel()
+        assert np.max(np.abs(jit_dfs(curve.jit_curve(), times) - dfs)) < 1e-12
+
+
+def test_jit_curve_interpolated():
+
+    times = np.linspace(0.0, 30.0, 121)
+    dfs = np.exp(-0.03 * np.arange(1, 9))
+
+    for interp_type in InterpTypes:
+
+        curve = DiscountCurve(value_dt, zero_dts, dfs, interp_type)
+        jit_curve = curve.jit_curve()
+
+        expected = np.array([curve._df(float(t)) for t in times])
+        assert np.max(np.abs(jit_dfs(jit_curve, times) - expected)) < 1e-12
+
+        # Compare the closed form forward with a finite difference
+        h = 1e-5
+        fwd = np.log(curve_df(jit_curve, 5.5 - h) /
+                     curve_df(jit_curve, 5.5 + h)) / (2.0 * h)
+        assert abs(curve_fwd(jit_curve, 5.5) - fwd) < 1e-8
+
+
+def test_jit_curve_in_kernel():
+
+    freq_type = FrequencyTypes.ANNUAL
+    dc_type = DayCountTypes.ACT_365F
+
+    dfs = np.exp(-0.03 * np.arange(1, 9))
+
+    curves = [DiscountCurveNS(value_dt, 0.03, -0.02, 0.01, 2.0,
+                              freq_type, dc_type),
+              DiscountCurvePoly(value_dt, [0.02, 0.001, -0.00002],
+                                freq_type, dc_type),
+              DiscountCurve(value_dt, zero_dts, dfs,
+                            InterpTypes.NATCUBIC_ZERO_RATES)]
+
+    times = np.linspace(0.5, 25.0, 50)
+
+    for curve in curves:
+        fwds = jit_fwds(curve.jit_curve(), times, 1e-5)
+        assert np.max(np.abs(fwds[:, 0] - fwds[:, 1])) < 1e-8
+
+    # A record made inside a kernel interpolates with flat forward rates
+    pillar_times = np.array([0.0, 1.0, 3.0, 10.0])
+    pillar_dfs = np.array([1.0, 0.97, 0.90, 0.70])
+    method = InterpTypes.FLAT_FWD_RATES.value
+
+    for t in times:
+        df = jit_flat_fwd_dfs(pillar_times, pillar_dfs, t)
+        assert df == _uinterpolate(t, pillar_times, pillar_dfs, method)
@@ -0,0 +1,106 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from financepy.models.hw_tree import HWTree, FinHWEuropeanCalcType
+from financepy.models.bk_tree import BKTree
+from financepy.models.bdt_tree import BDTTree
+from financepy.products.rates.ibor_swaption import SwapTypes
+from financepy.products.rates.ibor_swaption import IborSwaption
+from financepy.products.rates.ibor_cap_floor import IborCapFloor
+from financepy.products.rates.rates_model_calibration import \
+    RatesModelCalibrator
+from financepy.products.rates.rates_model_calibration import _hw_prices
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.utils.global_types import FinCapFloorTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.date import Date
+import numpy as np
+
+value_dt = Date(1, 1, 2020)
+maturity_dt = Date(1, 1, 2030)
+discount_curve = DiscountCurveFlat(value_dt, 0.03)
+jamshidian = FinHWEuropeanCalcType.JAMSHIDIAN
+
+
+def build_instruments():
+
+    swaptions = []
+    for i, tenor in enumerate(["1Y", "2Y", "3Y", "5Y"]):
+        leg_type = SwapTypes.PAY if i % 2 == 0 else SwapTypes.RECEIVE
+        swaptions.append(IborSwaption(value_dt, value_dt.add_tenor(tenor),
+                                      maturity_dt, leg_type, 0.03,
+                                      FrequencyTypes.ANNUAL,
+                                      DayCountTypes.ACT_365F))
+
+    caps = [IborCapFloor(value_dt, "3Y", FinCapFloorTypes.CAP, 0.031),
+            IborCapFloor(value_dt, "4Y", FinCapFloorTypes.FLOOR, 0.029)]
+
+    return swaptions, caps
+
+
+def test_hw_prices_and_calibration():
+
+    swaptions, caps = build_instruments()
+
+    model = HWTree(0.01, 0.05, 100, jamshidian)
+    swaption_prices = [s.value(value_dt, discount_curve, model)
+                       for s in swaptions]
+    cap_prices = [c.value(value_dt, discount_curve, model) for c in caps]
+
+    calibrator = RatesModelCalibrator(value_dt, discount_curve, swaptions,
+                                      swaption_prices, caps, cap_prices)
+
+    # The swaption root search is more precise than the one in IborSwaption
+    prices = calibrator.model_prices(model)
+    assert np.max(np.abs(prices[0:4] / swaption_prices - 1.0)) < 1e-4
+    assert np.max(np.abs(prices[4:] - cap_prices)) < 1e-6
+
+    # The analytic vega against a central difference
+    args = (calibrator._t_exps, calibrator._flow_ptr,
+            calibrator._flow_times, calibrator._flow_amounts,
+            calibrator._is_payer, calibrator._df_times, calibrator._dfs)
+
+    h = 1e-6
+    _, vegas = _hw_prices(0.01, 0.05, *args)
+    up, _ = _hw_prices(0.01 + h, 0.05, *args)
+    down, _ = _hw_prices(0.01 - h, 0.05, *args)
+    assert np.max(np.abs(vegas - (up - down) / (2.0 * h))) < 1e-4
+
+    # The model prices are recovered from a different starting point
+    market = calibrator.model_prices(model)
+    calibrator = RatesModelCalibrator(value_dt, discount_curve, swaptions,
+                                      market[0:4], caps, market[4:])
+
+    result = calibrator.calibrate(HWTree(0.02, 0.05, 100, jamshidian))
+    assert abs(result['sigma'] - 0.01) < 1e-8
+    assert np.max(np.abs(result['errors'])) < 1e-4
+    assert isinstance(result['model'], HWTree)
+
+    result = calibrator.calibrate(HWTree(0.02, 0.1, 100, jamshidian),
+                                  fix_a=False)
+    assert abs(result['sigma'] - 0.01) < 1e-6
+    assert abs(result['a'] - 0.05) < 1e-4
+
+
+def test_tree_calibration():
+
+    swaptions, _ = build_instruments()
+    swaption = swaptions[2]
+
+    for model, guess in [(BKTree(0.2, 0.05, 50), BKTree(0.3, 0.05, 50)),
+                         (BDTTree(0.2, 50), BDTTree(0.3, 50))]:
+
+        price = swaption.value(value_dt, discount_curve, model)
+
+        calibrator = RatesModelCalibrator(value_dt, discount_curve,
+                                          [swaption], [price])
+
+        # The tree runs to the swap maturity as in IborSwaption
+        assert abs(calibrator.model_prices(model)[0] - price) < 1e-6
+
+        result = calibrator.calibrate(guess)
+        assert abs(result['sigma'] - 0.2) < 1e-6
+        assert result['num_fn_evals'] > 0
+        assert isinstance(result['model'], type(model))
@@ -6,6 +6,8 @@ from financepy.utils.date import Date, set_date_format, DateFormatTypes
 from financepy.utils.calendar import CalendarTypes, Calendar
 from financepy.utils.frequency import FrequencyTypes
 from financepy.utils.schedule import Schedule
+from financepy.utils.schedule import schedule_cache_info, clear_schedule_cache
+from financepy.utils.schedule import set_schedule_cache_size
 from financepy.utils.calendar import DateGenRuleTypes
 from financepy.utils.calendar import BusDayAdjustTypes
 
@@ -215,3 +217,43 @@ def test_forward_end_stub():
     adjusted_dts = schedule._adjusted_dts
     assert len(adjusted_dts) == 5
     check_frequency(schedule)
+
+
+def test_schedule_cache():
+    clear_schedule_cache()
+
+    d2 = Date(15, 3, 2030)
+    freq_type = FrequencyTypes.QUARTERLY
+    cal_type = CalendarTypes.TARGET
+    bd_type = BusDayAdjustTypes.MODIFIED_FOLLOWING
+    dg_type = DateGenRuleTypes.BACKWARD
+
+    schedule1 = Schedule(Date(15, 3, 2020), d2, freq_type, cal_type,
+                         bd_type, dg_type)
+    schedule2 = Schedule(Date(20, 7, 2022), d2, freq_type, cal_type,
+                         bd_type, dg_type)
+
+    info = schedule_cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+    # The later effective date shares the coupon dates of the first schedule
+    dates1 = schedule1.schedule_dts()
+    dates2 = schedule2.schedule_dts()
+    assert dates2[0] == Date(20, 7, 2022)
+    assert dates2[1] is dates1[-len(dates2) + 1]
+
+    # Changing a returned list does not change the cached dates
+    dates2[1] = Date(1, 1, 2023)
+    schedule3 = Schedule(Date(20, 7, 2022), d2, freq_type, cal_type,
+                         bd_type, dg_type)
+    assert schedule3.schedule_dts()[1] == Date(15, 9, 2022)
+
+    # With the cache switched off each schedule is generated in full
+    set_schedule_cache_size(0)
+    schedule4 = Schedule(Date(20, 7, 2022), d2, freq_type, cal_type,
+                         bd_type, dg_type)
+    assert schedule4.schedule_dts() == schedule3.schedule_dts()
+    assert schedule_cache_info().curr_size == 0
+
+    set_schedule_cache_size()
@@ -3,6 +3,8 @@
 ###############################################################################
 
 from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.products.credit.cds import CDS
+from financepy.products.credit.cds_curve import CDSCurve
 from financepy.products.rates.swap_float_leg import SwapFloatLeg
 from financepy.products.rates.swap_fixed_leg import SwapFixedLeg
 from financepy.utils.date import Date
@@ -159,3 +161,37 @@ def test_FinFloatOISLeg():
     v = swapFloatLeg.value(effective_dt, libor_curve, libor_curve,
                            firstFixing)
     assert round(v, 4) == -2038364.5665
+
+
+def test_legs_on_cds_curve():
+
+    effective_dt = Date(28, 10, 2020)
+    maturity_dt = Date(28, 10, 2025)
+
+    libor_curve = DiscountCurveFlat(effective_dt, 0.05)
+    cds_contracts = [CDS(effective_dt, effective_dt.add_years(i), 0.01)
+                     for i in range(1, 6)]
+    cds_curve = CDSCurve(effective_dt, cds_contracts, libor_curve, 0.40)
+
+    fixed_leg = SwapFixedLeg(effective_dt, maturity_dt, SwapTypes.PAY,
+                             0.02, FrequencyTypes.ANNUAL,
+                             DayCountTypes.THIRTY_360_BOND, ONE_MILLION)
+
+    # The leg reads discount factors of the Ibor curve of the CDS curve
+    v = fixed_leg.value(effective_dt, cds_curve)
+
+    expected = 0.0
+    for pmnt_dt, payment in zip(fixed_leg._payment_dts,
+                                fixed_leg._payments):
+        expected -= payment * cds_curve.df(pmnt_dt)
+
+    assert abs(v - expected) < 1e-6
+
+    float_leg = SwapFloatLeg(effective_dt, maturity_dt, SwapTypes.RECEIVE,
+                             0.0, FrequencyTypes.ANNUAL,
+                             DayCountTypes.THIRTY_360_BOND, ONE_MILLION)
+
+    # Only the discounting is done on the CDS curve
+    v = float_leg.value(effective_dt, cds_curve, libor_curve, 0.03)
+    v_libor = float_leg.value(effective_dt, libor_curve, libor_curve, 0.03)
+    assert abs(v / v_libor - 1.0) < 1e-3
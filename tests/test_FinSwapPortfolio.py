@@ -0,0 +1,90 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from financepy.utils.global_types import SwapTypes
+from financepy.products.rates.ibor_swap import IborSwap
+from financepy.products.rates.ois import OIS
+from financepy.products.rates.swap_portfolio import SwapPortfolio
+from financepy.market.curves.discount_curve_flat import DiscountCurveFlat
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.date import Date
+from helpers import buildIborSingleCurve
+import numpy as np
+
+value_dt = Date(6, 6, 2018)
+
+
+def build_swaps():
+
+    swaps = []
+    tenors = ["2Y", "5Y", "7Y", "10Y"]
+
+    for i in range(0, 24):
+
+        start_dt = value_dt.add_days(-300 + 37 * i)
+        swap_type = SwapTypes.PAY if i % 2 else SwapTypes.RECEIVE
+        cpn = 0.02 + 0.001 * (i % 7)
+        notional = 1e6 * (1 + i % 5)
+
+        if i % 3 == 0:
+            swap = OIS(start_dt, tenors[i % 4], swap_type, cpn,
+                       FrequencyTypes.ANNUAL, DayCountTypes.ACT_360,
+                       notional=notional)
+        else:
+            swap = IborSwap(start_dt, tenors[i % 4], swap_type, cpn,
+                            FrequencyTypes.SEMI_ANNUAL,
+                            DayCountTypes.THIRTY_E_360,
+                            notional=notional,
+                            float_spread=0.0005 * (i % 4))
+        swaps.append(swap)
+
+    return swaps
+
+
+def test_swap_portfolio():
+
+    libor_curve = buildIborSingleCurve(value_dt)
+    index_curve = DiscountCurveFlat(value_dt, 0.035)
+
+    swaps = build_swaps()
+    portfolio = SwapPortfolio(swaps)
+
+    # Seasoned swaps need their first fixing
+    fixings = np.array([0.03 if s._fixed_leg._effective_dt < value_dt
+                        else np.nan for s in swaps])
+
+    for curve in [None, index_curve]:
+
+        results = portfolio.value(value_dt, libor_curve, curve, fixings)
+
+        for i, swap in enumerate(swaps):
+
+            fixing = None if np.isnan(fixings[i]) else fixings[i]
+
+            if isinstance(swap, OIS):
+                if curve is not None:
+                    continue
+                value = swap.value(value_dt, libor_curve, fixing)
+            else:
+                value = swap.value(value_dt, libor_curve, curve, fixing)
+                pv01 = swap.pv01(value_dt, libor_curve)
+                assert abs(results['pv01'][i] - pv01) < 1e-12
+
+            assert abs(results['pv'][i] - value) < 1e-6
+
+            # At the par rate the swap has zero value
+            sign = 1.0
+            if swap._fixed_leg._leg_type == SwapTypes.PAY:
+                sign = -1.0
+            cpn_pv = (results['par_rate'][i] - swap._fixed_leg._cpn) * \
+                results['pv01'][i] * swap._fixed_leg._notional * sign
+            assert abs(results['pv'][i] + cpn_pv) < 1e-6
+
+        # Splitting the trades across threads gives the same answers
+        threaded = portfolio.value(value_dt, libor_curve, curve, fixings,
+                                   num_threads=3)
+
+        for key in results:
+            assert np.array_equal(results[key], threaded[key])
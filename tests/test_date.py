@@ -6,7 +6,7 @@ import datetime
 import numpy as np
 import time
 
-from financepy.utils.date import Date, date_range
+from financepy.utils.date import Date, date_range, set_date_cache_size
 
 # Not under test
 
@@ -34,6 +34,26 @@ def test_excel_representation():
     assert Date(1, 3, 2020)._excel_dt == 43891
 
 
+def test_fast_path_matches_validated_path():
+    dt = Date(1, 3, 2020)
+    assert not hasattr(dt, "__dict__")
+    assert dt._excel_dt == Date(1, 3, 2020, 0, 0, 0)._excel_dt
+    assert Date(1, 3, 2020, 6)._excel_dt == 43891.25
+    assert Date(31, 12, 2099).add_days(1) == Date(1, 1, 2100)
+    assert Date(1, 1, 2018).add_days(-1000) == Date(7, 4, 2015)
+
+
+def test_intern_cache():
+    set_date_cache_size(10)
+    assert Date(1, 3, 2020) is Date(1, 3, 2020)
+    assert Date(1, 3, 2020, 12) is not Date(1, 3, 2020, 12)
+    for d in range(1, 29):
+        Date(d, 2, 2021)
+    assert Date(1, 3, 2020) == Date(1, 3, 2020)
+    set_date_cache_size(0)
+    assert Date(1, 3, 2020) is not Date(1, 3, 2020)
+
+
 # tests not refactored below
 # - print() should be assert to value
 # - do not need many values, just one call
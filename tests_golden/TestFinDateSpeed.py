@@ -0,0 +1,141 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import time
+import tracemalloc
+
+import sys
+sys.path.append("..")
+
+from FinTestCases import FinTestCases, globalTestCaseMode
+from financepy.utils.date import Date, set_date_cache_size
+from financepy.utils.schedule import Schedule, set_schedule_cache_size
+from financepy.utils.schedule import clear_schedule_cache
+
+test_cases = FinTestCases(__file__, globalTestCaseMode)
+
+###############################################################################
+
+num_dates = 100000
+dmy_list = [(1 + i % 28, 1 + i % 12, 1950 + i % 100)
+            for i in range(0, num_dates)]
+
+###############################################################################
+
+
+def time_construction(hh):
+    """ An intraday hour forces the fully validated construction path. """
+
+    start = time.time()
+    for (d, m, y) in dmy_list:
+        Date(d, m, y, hh)
+    end = time.time()
+    return (end - start) / num_dates * 1e6
+
+
+def memory_per_date(dmy):
+
+    tracemalloc.start()
+    date_list = [Date(d, m, y) for (d, m, y) in dmy]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del date_list
+    return current / len(dmy)
+
+###############################################################################
+
+
+def test_date_construction_speed():
+
+    test_cases.header("LABEL", "TIME")
+
+    test_cases.print("VALIDATED PATH (US PER DATE)", time_construction(1))
+    test_cases.print("FAST PATH (US PER DATE)", time_construction(0))
+
+    set_date_cache_size(100000)
+    time_construction(0)
+    test_cases.print("FAST PATH CACHED (US PER DATE)", time_construction(0))
+    set_date_cache_size(0)
+
+    start_dt = Date(1, 1, 2020)
+    start = time.time()
+    for i in range(0, num_dates):
+        start_dt.add_days(i % 1000)
+    end = time.time()
+    test_cases.print("ADD DAYS (US PER CALL)",
+                     (end - start) / num_dates * 1e6)
+
+###############################################################################
+
+
+def test_date_memory():
+    """ The bytes used per date are a benchmark and not a test result. They
+    are printed to the console and so are not compared with the golden log
+    in which only the TIME columns may change from run to run. """
+
+    print("DATE MEMORY (BYTES PER DATE)")
+
+    print("UNIQUE DATES NO CACHE", memory_per_date(dmy_list))
+
+    # A book of swaps has only a few distinct payment dates
+    repeated = dmy_list[0:1000] * 100
+
+    print("REPEATED DATES NO CACHE", memory_per_date(repeated))
+
+    set_date_cache_size(100000)
+    memory_per_date(repeated)
+    print("REPEATED DATES CACHED", memory_per_date(repeated))
+    set_date_cache_size(0)
+
+###############################################################################
+
+
+def test_schedule_speed():
+
+    test_cases.header("LABEL", "TIME")
+
+    set_schedule_cache_size(0)
+
+    start = time.time()
+    for i in range(0, 1000):
+        effective_dt = Date(1 + i % 28, 1 + i % 12, 2020)
+        Schedule(effective_dt, effective_dt.add_years(10))
+    end = time.time()
+    test_cases.print("1000 10Y SCHEDULES NO CACHE", end - start)
+
+    set_schedule_cache_size()
+    clear_schedule_cache()
+
+    start = time.time()
+    for i in range(0, 1000):
+        effective_dt = Date(1 + i % 28, 1 + i % 12, 2020)
+        Schedule(effective_dt, effective_dt.add_years(10))
+    end = time.time()
+    test_cases.print("1000 10Y SCHEDULES CACHE MISS", end - start)
+
+    start = time.time()
+    for i in range(0, 1000):
+        effective_dt = Date(1 + i % 28, 1 + i % 12, 2020)
+        Schedule(effective_dt, effective_dt.add_years(10))
+    end = time.time()
+    test_cases.print("1000 10Y SCHEDULES CACHE HIT", end - start)
+
+    # Swaps traded on different days that all end on one IMM date
+    termination_dt = Date(20, 3, 2035)
+
+    start = time.time()
+    for i in range(0, 1000):
+        effective_dt = Date(1, 1, 2025).add_days(i)
+        Schedule(effective_dt, termination_dt)
+    end = time.time()
+    test_cases.print("1000 SCHEDULES ONE END DATE", end - start)
+
+###############################################################################
+
+
+test_date_construction_speed()
+test_date_memory()
+test_schedule_speed()
+
+test_cases.compareTestCases()